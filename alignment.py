@@ -0,0 +1,409 @@
+import re
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+from french import expand_word
+
+EQUAL = "equal"
+SUBSTITUTE = "substitute"
+DELETE = "delete"
+INSERT = "insert"
+
+# Taille (mots de référence x mots reconnus) jusqu'à laquelle l'alignement
+# est calculé par programmation dynamique en Python pur; au-delà, par les
+# fronts de coût croissant en numpy (_Fronts), exacts eux aussi
+EXACT_BLOCK_LIMIT = 150
+# Positions de fronts gardées pour remonter le chemin d'édition (4 octets
+# chacune); au-delà, un front sur deux, quatre... est gardé et les autres
+# sont recalculés pendant la remontée
+FRONT_MEMORY_LIMIT = 1 << 24
+# Mots écrits distincts dont la forme préparée est gardée en cache (par processus)
+WORD_CACHE_SIZE = 65536
+
+AlignmentOp = namedtuple("AlignmentOp", "op ref hyp ref_index hyp_index")
+# Texte découpé: mots affichés, mots normalisés et numéro de chaque mot
+# normalisé dans l'ordre de première apparition (table d'alignement)
+Tokens = namedtuple("Tokens", "words keys ids")
+
+# Ligatures et apostrophes typographiques ramenées à leur forme simple
+_FOLDED_CHARS = str.maketrans({"œ": "oe", "æ": "ae", "’": "'", "‘": "'", "ʼ": "'", "`": "'",
+                               "‐": "-", "‑": "-"})
+# Tout ce qui n'est ni lettre, ni chiffre, ni apostrophe ou trait d'union interne
+_PUNCTUATION = re.compile(r"[^\w'-]+|_")
+# Ligne d'une diagonale pas encore atteinte
+_NO_ROW = -(1 << 30)
+
+
+def normalize_word(word):
+    """Forme de comparaison d'un mot: minuscules, sans accents ni ponctuation
+
+    Les accents sont retirés car ils distinguent rarement la prononciation
+    (a/à, ou/où) et manquent souvent dans un texte saisi au clavier.
+    Retourne une chaîne vide pour une ponctuation isolée.
+    """
+    word = unicodedata.normalize("NFKD", word.lower().translate(_FOLDED_CHARS))
+    word = "".join(c for c in word if not unicodedata.combining(c))
+    return _PUNCTUATION.sub("", word).strip("'-")
+
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def _spoken_forms(written):
+    """Paires (mot prononcé, mot normalisé) d'un mot écrit, calculées une fois par mot distinct"""
+    forms = []
+    for word in expand_word(written):
+        key = normalize_word(word)
+        if key:
+            forms.append((word, key))
+    return tuple(forms)
+
+
+def split_words(text):
+    """Retourne (mots prononcés, mots normalisés) en écartant la ponctuation isolée
+
+    Nombres, ordinaux, heures et abréviations sont développés en toutes
+    lettres (« 21 » devient « vingt et un ») des deux côtés de la comparaison.
+    """
+    words, keys = [], []
+    for written in text.split():
+        for word, key in _spoken_forms(written):
+            words.append(word)
+            keys.append(key)
+    return words, keys
+
+
+def prepare_text(text):
+    """Découpe un texte en Tokens prêts à être alignés"""
+    words, keys = split_words(text)
+    vocabulary = {}
+    ids = [vocabulary.setdefault(key, len(vocabulary)) for key in keys]
+    return Tokens(words, keys, ids)
+
+
+def tokenize(text):
+    """Découpe un texte en mots normalisés"""
+    return split_words(text)[1]
+
+
+def _align_block(ref, hyp, ops):
+    """Aligne deux listes courtes par programmation dynamique en Python pur"""
+    k, l = len(ref), len(hyp)
+    # Levenshtein exact: les substitutions sont préférées aux paires omission/insertion
+    cost = [[0] * (l + 1) for _ in range(k + 1)]
+    for i in range(k + 1):
+        cost[i][0] = i
+    for j in range(l + 1):
+        cost[0][j] = j
+    for i in range(1, k + 1):
+        row, prev = cost[i], cost[i - 1]
+        word = ref[i - 1]
+        for j in range(1, l + 1):
+            row[j] = min(prev[j - 1] + (word != hyp[j - 1]), prev[j] + 1, row[j - 1] + 1)
+
+    block = []
+    i, j = k, l
+    while i > 0 or j > 0:
+        if i > 0 and j > 0:
+            same = ref[i - 1] == hyp[j - 1]
+            if cost[i][j] == cost[i - 1][j - 1] + (not same):
+                block.append(AlignmentOp(EQUAL if same else SUBSTITUTE, ref[i - 1], hyp[j - 1], i - 1, j - 1))
+                i -= 1
+                j -= 1
+                continue
+        if i > 0 and cost[i][j] == cost[i - 1][j] + 1:
+            block.append(AlignmentOp(DELETE, ref[i - 1], None, i - 1, None))
+            i -= 1
+        else:
+            block.append(AlignmentOp(INSERT, None, hyp[j - 1], None, j - 1))
+            j -= 1
+    ops.extend(reversed(block))
+
+
+class _Fronts:
+    """Fronts de l'alignement exact de deux suites de numéros de mots (Ukkonen, 1985)
+
+    Le front de coût d donne, pour chaque diagonale k = j - i, la ligne i la
+    plus avancée atteinte avec au plus d erreurs. Chaque front se déduit du
+    précédent en quelques opérations numpy puis glisse sur les mots
+    identiques: le calcul coûte O((n + m) x d) au pire, beaucoup moins sur
+    deux textes proches, au lieu de O(n x m) pour la matrice complète.
+    """
+
+    def __init__(self, a, b):
+        import numpy as np
+        self.n, self.m = len(a), len(b)
+        # Sentinelles différentes en fin de suite: le glissement s'arrête au bord
+        self.a_list = list(a) + [-1]
+        self.b_list = list(b) + [-2]
+        self.a = np.array(self.a_list, dtype=np.int32)
+        self.b = np.array(self.b_list, dtype=np.int32)
+        # Dernière ligne possible sur chaque diagonale, de -n à m
+        self.bound = np.minimum(self.n, self.m - np.arange(-self.n, self.m + 1, dtype=np.int32))
+
+        i = 0
+        while self.a_list[i] == self.b_list[i]:
+            i += 1
+        front = (0, np.array([i], dtype=np.int32))
+        # Fronts gardés pour la remontée: tous, ou un sur step au-delà de FRONT_MEMORY_LIMIT
+        self.stored = {0: front}
+        self.step = 1
+        self.segment = {}
+        size = 1
+        d = 0
+        while self.row(front, self.m - self.n) != self.n:
+            d += 1
+            front = self.next_front(d, front)
+            if d % self.step == 0:
+                self.stored[d] = front
+                size += len(front[1])
+                if size > FRONT_MEMORY_LIMIT:
+                    self.step *= 2
+                    self.stored = {c: f for c, f in self.stored.items() if c % self.step == 0}
+                    size = sum(len(f[1]) for f in self.stored.values())
+        self.stored[d] = front
+        self.distance = d
+
+    def next_front(self, d, front):
+        """Front de coût d à partir de celui de coût d - 1"""
+        import numpy as np
+        n = self.n
+        lo, rows = front
+        new_lo, new_hi = max(-d, -n), min(d, self.m)
+        padded = np.full(new_hi - new_lo + 3, _NO_ROW, dtype=np.int32)
+        start = lo - new_lo + 1
+        padded[start:start + len(rows)] = rows
+        # Substitution (même diagonale), omission (depuis k + 1), insertion (depuis k - 1)
+        new = padded[1:-1] + 1
+        np.maximum(new, padded[2:] + 1, out=new)
+        np.maximum(new, padded[:-2], out=new)
+        np.minimum(new, self.bound[new_lo + n:new_hi + n + 1], out=new)
+
+        # Glissement sur les mots identiques, en numpy tant que beaucoup de diagonales avancent
+        active = np.flatnonzero(new >= 0)
+        while len(active) > 4:
+            i = new[active]
+            active = active[self.a[i] == self.b[i + active + new_lo]]
+            new[active] += 1
+        for t in active.tolist():
+            k, i = new_lo + t, int(new[t])
+            while self.a_list[i] == self.b_list[i + k]:
+                i += 1
+            new[t] = i
+        return new_lo, new
+
+    def front(self, d):
+        """Front de coût d, recalculé depuis le front gardé précédent si besoin"""
+        if d in self.stored:
+            return self.stored[d]
+        if d not in self.segment:
+            base = d - d % self.step
+            front = self.stored[base]
+            self.segment = {}
+            for c in range(base + 1, min(base + self.step, self.distance)):
+                front = self.next_front(c, front)
+                self.segment[c] = front
+        return self.segment[d]
+
+    @staticmethod
+    def row(front, k):
+        lo, rows = front
+        t = k - lo
+        return int(rows[t]) if 0 <= t < len(rows) else _NO_ROW
+
+
+def _align_exact(ref, hyp, a, b, ops):
+    """Aligne ref et hyp (numéros de mots a et b) par les fronts de coût croissant"""
+    fronts = _Fronts(a, b)
+    a_list, b_list = fronts.a_list, fronts.b_list
+    block = []
+    d, k, i = fronts.distance, len(b) - len(a), len(a)
+    while i > 0 or i + k > 0:
+        j = i + k
+        if i > 0 and j > 0 and a_list[i - 1] == b_list[j - 1]:
+            block.append(AlignmentOp(EQUAL, ref[i - 1], hyp[j - 1], i - 1, j - 1))
+            i -= 1
+            continue
+        # Coût le plus bas auquel le point (i, j) est atteint, puis son prédécesseur
+        while d > 0 and fronts.row(fronts.front(d - 1), k) >= i:
+            d -= 1
+        previous = fronts.front(d - 1)
+        d -= 1
+        if i > 0 and j > 0 and fronts.row(previous, k) >= i - 1:
+            block.append(AlignmentOp(SUBSTITUTE, ref[i - 1], hyp[j - 1], i - 1, j - 1))
+            i -= 1
+        elif i > 0 and fronts.row(previous, k + 1) >= i - 1:
+            block.append(AlignmentOp(DELETE, ref[i - 1], None, i - 1, None))
+            i -= 1
+            k += 1
+        else:
+            block.append(AlignmentOp(INSERT, None, hyp[j - 1], None, j - 1))
+            k -= 1
+    ops.extend(reversed(block))
+
+
+def edit_distance(a, b):
+    """Distance de Levenshtein entre deux séquences courtes"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+class Alignment:
+    """Alignement mot à mot entre un texte de référence et une transcription
+
+    ref et hyp sont les mots normalisés comparés; ref_words et hyp_words
+    les mêmes mots tels qu'écrits, pour l'affichage.
+    """
+
+    def __init__(self, ops, ref, hyp, ref_words=None, hyp_words=None):
+        self.ops = ops
+        self.ref = ref
+        self.hyp = hyp
+        self.ref_words = ref_words if ref_words is not None else ref
+        self.hyp_words = hyp_words if hyp_words is not None else hyp
+        self.hits = self.substitutions = self.deletions = self.insertions = 0
+        for op in ops:
+            if op.op == EQUAL:
+                self.hits += 1
+            elif op.op == SUBSTITUTE:
+                self.substitutions += 1
+            elif op.op == DELETE:
+                self.deletions += 1
+            else:
+                self.insertions += 1
+
+    @property
+    def errors(self):
+        return self.substitutions + self.deletions + self.insertions
+
+    @property
+    def wer(self):
+        """Taux d'erreur sur les mots"""
+        if not self.ref:
+            return 0.0 if not self.hyp else 1.0
+        return self.errors / len(self.ref)
+
+    @property
+    def cer(self):
+        """Taux d'erreur sur les caractères, calculé sur l'alignement des mots"""
+        ref_chars = sum(len(word) for word in self.ref)
+        errors = 0
+        for op in self.ops:
+            if op.op == SUBSTITUTE:
+                errors += edit_distance(op.ref, op.hyp)
+            elif op.op == DELETE:
+                errors += len(op.ref)
+            elif op.op == INSERT:
+                errors += len(op.hyp)
+        if not ref_chars:
+            return 0.0 if not errors else 1.0
+        return errors / ref_chars
+
+    @property
+    def accuracy(self):
+        """Score entre 0 et 1 dérivé du WER"""
+        return max(0.0, 1.0 - self.wer)
+
+    def extra_words(self):
+        """Mots prononcés absents de la référence, tels que transcrits"""
+        return [self.hyp_words[op.hyp_index] for op in self.ops if op.op == INSERT]
+
+
+def align_tokens(ref, hyp, ref_ids=None):
+    """Aligne deux listes de mots
+
+    L'alignement est toujours exact (Levenshtein, les substitutions étant
+    préférées aux paires omission/insertion). Les listes courtes passent par
+    la programmation dynamique en Python pur, les autres par les fronts de
+    coût croissant: quelques millisecondes pour 1 000 mots lus avec 15 %
+    d'erreurs. ref_ids est la table de numérotation de ref déjà calculée
+    (Tokens.ids), si elle est connue.
+    """
+    ops = []
+    if len(ref) * len(hyp) <= EXACT_BLOCK_LIMIT:
+        _align_block(ref, hyp, ops)
+        return Alignment(ops, ref, hyp)
+
+    if ref_ids is None:
+        ids = {}
+        ref_ids = [ids.setdefault(word, len(ids)) for word in ref]
+    else:
+        ids = dict(zip(ref, ref_ids))
+    hyp_ids = [ids.setdefault(word, len(ids)) for word in hyp]
+    _align_exact(ref, hyp, ref_ids, hyp_ids, ops)
+    return Alignment(ops, ref, hyp)
+
+
+def align(reference, spoken_text):
+    """Aligne un texte de référence (ou ses Tokens déjà préparés) et une transcription
+
+    Les mots sont comparés normalisés: un homophone (« verre » reconnu
+    pour « vert ») reste une substitution; le mode phonétique (phonetics)
+    mesure à quel point il s'écarte du mot attendu.
+    """
+    ref = reference if isinstance(reference, Tokens) else prepare_text(reference)
+    hyp = prepare_text(spoken_text)
+    ops = align_tokens(ref.keys, hyp.keys, ref.ids).ops
+    return Alignment(ops, ref.keys, hyp.keys, ref.words, hyp.words)
+
+
+def _legacy_compare(written_text, spoken_text):
+    """Ancienne comparaison de highlight_differences (list.remove), pour le banc d'essai"""
+    spoken_words = spoken_text.lower().split()
+    tags = []
+    for word in written_text.lower().split():
+        if word in spoken_words:
+            tags.append("correct")
+            spoken_words.remove(word)
+        else:
+            tags.append("incorrect")
+    return tags, spoken_words
+
+
+def benchmark(sizes=(100, 1000, 5000, 20000), error_rate=0.15, seed=0):
+    """Compare les temps de l'alignement et de l'ancienne comparaison"""
+    import random
+    import time
+
+    # Premier alignement numpy (import du module) hors des mesures
+    align_tokens(["a"] * 21, ["b"] * 21)
+
+    rng = random.Random(seed)
+    vocabulary = [f"mot{i}" for i in range(3000)]
+    print(f"{'mots':>8} {'ancienne (ms)':>14} {'préparation (ms)':>17} {'alignement (ms)':>16} {'WER':>6}")
+    for size in sizes:
+        ref = [rng.choice(vocabulary) for _ in range(size)]
+        hyp = []
+        for word in ref:
+            r = rng.random()
+            if r < error_rate / 3:
+                continue
+            elif r < 2 * error_rate / 3:
+                hyp.append(rng.choice(vocabulary))
+            elif r < error_rate:
+                hyp.extend((word, rng.choice(vocabulary)))
+            else:
+                hyp.append(word)
+        ref_text, hyp_text = " ".join(ref), " ".join(hyp)
+
+        start = time.perf_counter()
+        _legacy_compare(ref_text, hyp_text)
+        legacy = (time.perf_counter() - start) * 1000
+
+        # Préparation des deux textes (normalisation, nombres en lettres) puis alignement
+        start = time.perf_counter()
+        ref_tokens, hyp_tokens = prepare_text(ref_text), prepare_text(hyp_text)
+        middle = time.perf_counter()
+        result = align_tokens(ref_tokens.keys, hyp_tokens.keys, ref_tokens.ids)
+        end = time.perf_counter()
+        print(f"{size:>8} {legacy:>14.1f} {(middle - start) * 1000:>17.1f} {(end - middle) * 1000:>16.1f} "
+              f"{result.wer:>6.2f}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,171 @@
+import numpy as np
+
+# Pas de calcul de l'enveloppe RMS/crête (secondes)
+ENVELOPE_HOP_SECONDS = 0.01
+
+
+def float_to_int16(samples):
+    """Convertit des échantillons float32 [-1, 1] en PCM 16 bits"""
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def _ring_write(ring, pos, values):
+    """Copie des valeurs dans un tampon circulaire à partir de la position absolue pos"""
+    size = len(ring)
+    values = values[-size:]
+    n = len(values)
+    start = pos % size
+    end = start + n
+    if end <= size:
+        ring[start:end] = values
+    else:
+        split = size - start
+        ring[start:] = values[:split]
+        ring[:n - split] = values[split:]
+
+
+def _ring_tail(ring, pos, n):
+    """Retourne une copie des n dernières valeurs d'un tampon circulaire"""
+    size = len(ring)
+    n = min(n, pos, size)
+    if n <= 0:
+        return np.empty(0, dtype=ring.dtype)
+    end = pos % size
+    start = end - n
+    if start >= 0:
+        return ring[start:end].copy()
+    return np.concatenate((ring[start:], ring[:end]))
+
+
+class CaptureEngine:
+    """Moteur de capture audio à mémoire préallouée
+
+    Les échantillons sont stockés en int16 dans des blocs de taille fixe
+    (environ 2 octets par échantillon) et les dernières secondes sont
+    conservées en float32 dans un tampon circulaire pour la visualisation.
+    Une enveloppe RMS/crête par pas de 10 ms est calculée au fil de la
+    capture pour l'indicateur de niveau.
+    Un seul producteur (le callback sounddevice) écrit; les lecteurs ne
+    prennent aucun verrou et copient simplement la fin des tampons.
+    """
+
+    def __init__(self, sample_rate=44100, chunk_seconds=10, ring_seconds=5,
+                 envelope_seconds=10):
+        self.sample_rate = sample_rate
+        self.chunk_size = max(1, int(sample_rate * chunk_seconds))
+        self.ring_size = max(1, int(sample_rate * ring_seconds))
+        self.hop = max(1, int(sample_rate * ENVELOPE_HOP_SECONDS))
+        self.envelope_size = max(1, int(envelope_seconds / ENVELOPE_HOP_SECONDS))
+        self._ring = np.zeros(self.ring_size, dtype=np.float32)
+        self._rms = np.zeros(self.envelope_size, dtype=np.float32)
+        self._peak = np.zeros(self.envelope_size, dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        """Vide le moteur pour une nouvelle prise"""
+        self._chunks = [np.empty(self.chunk_size, dtype=np.int16)]
+        # Bloc de réserve pour ne jamais allouer dans le callback audio
+        self._spare = np.empty(self.chunk_size, dtype=np.int16)
+        self._chunk_pos = 0
+        self._ring_pos = 0
+        self._env_pos = 0
+        self._residual = np.empty(0, dtype=np.float32)
+        self.frames_written = 0
+        self.overflows = 0
+
+    @property
+    def duration(self):
+        """Durée capturée en secondes"""
+        return self.frames_written / self.sample_rate
+
+    def write(self, indata):
+        """Ajoute un bloc du callback et retourne sa version int16"""
+        samples = indata[:, 0] if indata.ndim > 1 else indata
+        n = len(samples)
+        if n == 0:
+            return np.empty(0, dtype=np.int16)
+
+        _ring_write(self._ring, self._ring_pos, samples)
+        # Publication de la nouvelle position après la copie
+        self._ring_pos += n
+        self._write_envelope(samples)
+
+        pcm = float_to_int16(samples)
+        offset = 0
+        while offset < n:
+            chunk = self._chunks[-1]
+            count = min(n - offset, self.chunk_size - self._chunk_pos)
+            chunk[self._chunk_pos:self._chunk_pos + count] = pcm[offset:offset + count]
+            self._chunk_pos += count
+            offset += count
+            if self._chunk_pos == self.chunk_size:
+                spare = self._spare
+                if spare is None:
+                    spare = np.empty(self.chunk_size, dtype=np.int16)
+                self._chunks.append(spare)
+                self._spare = None
+                self._chunk_pos = 0
+
+        self.frames_written += n
+        return pcm
+
+    def _write_envelope(self, samples):
+        """Calcule l'enveloppe RMS/crête des pas complets du bloc"""
+        if len(self._residual):
+            samples = np.concatenate((self._residual, samples))
+        count = len(samples) // self.hop
+        self._residual = samples[count * self.hop:].astype(np.float32)
+        if count == 0:
+            return
+
+        frames = samples[:count * self.hop].reshape(count, self.hop)
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+        peak = np.max(np.abs(frames), axis=1)
+        _ring_write(self._rms, self._env_pos, rms)
+        _ring_write(self._peak, self._env_pos, peak)
+        self._env_pos += count
+
+    def note_status(self, status):
+        """Comptabilise les débordements signalés par le callback audio"""
+        if getattr(status, 'input_overflow', False):
+            self.overflows += 1
+
+    def ensure_spare(self):
+        """Prépare un bloc de réserve hors du callback audio"""
+        if self._spare is None:
+            self._spare = np.empty(self.chunk_size, dtype=np.int16)
+
+    def snapshot_tail(self, n):
+        """Retourne une copie des n derniers échantillons (float32)"""
+        return _ring_tail(self._ring, self._ring_pos, n)
+
+    def snapshot_envelope(self, n):
+        """Retourne les n derniers pas de l'enveloppe sous forme (rms, crête)"""
+        pos = self._env_pos
+        return _ring_tail(self._rms, pos, n), _ring_tail(self._peak, pos, n)
+
+    def current_level(self, seconds=0.1):
+        """Retourne le niveau crête des dernières secondes"""
+        _, peak = self.snapshot_envelope(max(1, int(seconds / ENVELOPE_HOP_SECONDS)))
+        return float(peak.max()) if len(peak) else 0.0
+
+    def read(self, start, stop):
+        """Retourne une copie int16 des échantillons [start, stop) déjà capturés"""
+        stop = min(stop, self.frames_written)
+        parts = []
+        pos = start
+        while pos < stop:
+            index, offset = divmod(pos, self.chunk_size)
+            count = min(stop - pos, self.chunk_size - offset)
+            parts.append(self._chunks[index][offset:offset + count])
+            pos += count
+        if not parts:
+            return np.empty(0, dtype=np.int16)
+        return np.concatenate(parts)
+
+    def finalize(self):
+        """Retourne l'ensemble de la prise sous forme d'un tableau int16 contigu"""
+        if len(self._chunks) == 1:
+            return self._chunks[0][:self._chunk_pos].copy()
+        parts = self._chunks[:-1] + [self._chunks[-1][:self._chunk_pos]]
+        return np.concatenate(parts)
@@ -0,0 +1,172 @@
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from alignment import align
+from recognition import get_backend, AudioClip, UnintelligibleAudio, estimate_word_times, cache_key_id
+from vad import trim_silence
+from transcription_cache import TranscriptionCache
+from scoring import analyze_recording
+from reference_store import ReferenceStore
+from phonetics import phonetic_score
+
+
+class ComparisonResult:
+    """Résultat d'une comparaison entre un texte de référence et une transcription"""
+
+    def __init__(self, reference, transcript, alignment, phonetic=None):
+        self.reference = reference
+        self.transcript = transcript
+        self.alignment = alignment
+        # PhoneticScore en mode de comparaison phonétique
+        self.phonetic = phonetic
+
+    @property
+    def score(self):
+        """Score de similarité en pourcentage"""
+        return int(self.alignment.accuracy * 100)
+
+    def to_dict(self):
+        alignment = self.alignment
+        data = {
+            "transcript": self.transcript,
+            "score": self.score,
+            "wer": round(alignment.wer, 4),
+            "cer": round(alignment.cer, 4),
+            "hits": alignment.hits,
+            "substitutions": alignment.substitutions,
+            "deletions": alignment.deletions,
+            "insertions": alignment.insertions,
+            "alignment": [[op.op, op.ref, op.hyp] for op in alignment.ops],
+        }
+        if self.phonetic is not None:
+            data["phoneme_error_rate"] = round(self.phonetic.error_rate, 4)
+            data["phonetic_distances"] = [round(d, 3) for d in self.phonetic.distances]
+        return data
+
+
+def compare_texts(reference, transcript, references=None, phonetic=False):
+    """Compare un texte de référence et une transcription
+
+    Avec un ReferenceStore, la référence déjà préparée est réutilisée. Avec
+    phonetic, la distance phonétique de chaque mot est aussi calculée.
+    """
+    prepared = references.get(reference) if references is not None else reference
+    alignment = align(prepared, transcript)
+    return ComparisonResult(reference, transcript, alignment, phonetic_score(alignment) if phonetic else None)
+
+
+# Caches et textes de référence ouverts par processus de traitement par lots
+_caches = {}
+_references = {}
+
+
+def transcribe(audio_path, backend, cache=None):
+    """Transcrit un fichier audio sans son silence de début et de fin, via le cache s'il est fourni"""
+    # Fréquence d'origine, silence retiré
+    cache_id = cache_key_id(backend)
+    if cache is not None:
+        result = cache.get(audio_path, cache_id, backend.language)
+        if result is not None:
+            return result
+    audio = backend.load(audio_path)
+    offset = 0.0
+    if isinstance(audio, AudioClip):
+        pcm, offset = trim_silence(audio.pcm, audio.sample_rate)
+        audio = AudioClip(pcm, audio.sample_rate)
+    result = backend.recognize(audio)
+    if isinstance(audio, AudioClip):
+        result = estimate_word_times(result, audio)
+    result = result.shifted(offset)
+    if cache is not None:
+        cache.put(audio_path, cache_id, backend.language, result)
+    return result
+
+
+def read_manifest(path):
+    """Lit un manifeste de paires (audio, texte de référence)
+
+    Formats acceptés: JSONL avec les clés "audio" et "reference" (ou
+    "reference_file"), ou TSV à deux colonnes audio<TAB>référence. Les
+    chemins relatifs sont résolus depuis le dossier du manifeste.
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    def resolve(p):
+        return p if os.path.isabs(p) else os.path.join(base_dir, p)
+
+    items = []
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl') or path.endswith('.json'):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                reference = entry.get("reference")
+                if reference is None:
+                    with open(resolve(entry["reference_file"]), 'r', encoding='utf-8') as rf:
+                        reference = rf.read()
+                items.append((resolve(entry["audio"]), reference.strip()))
+        else:
+            for row in csv.reader(f, delimiter='\t'):
+                if len(row) >= 2:
+                    items.append((resolve(row[0]), row[1].strip()))
+    return items
+
+
+def evaluate(item):
+    """Transcrit et compare une entrée du manifeste (exécuté dans un worker)"""
+    audio_path, reference, backend_name, language, options, cache_path, references_path, phonetic = item
+    record = {"audio": audio_path, "reference": reference}
+    try:
+        backend = get_backend(backend_name, language, **options)
+        cache = None
+        if cache_path:
+            cache = _caches.get(cache_path)
+            if cache is None:
+                cache = _caches[cache_path] = TranscriptionCache(cache_path)
+        references = _references.get(references_path)
+        if references is None:
+            references = _references[references_path] = ReferenceStore(references_path)
+        result = transcribe(audio_path, backend, cache)
+        record.update(compare_texts(reference, result.transcript, references, phonetic).to_dict())
+        record["acoustics"] = analyze_recording(audio_path, result.transcript).to_dict()
+    except UnintelligibleAudio:
+        record["error"] = "Audio incompréhensible"
+    except Exception as e:
+        record["error"] = str(e) or e.__class__.__name__
+    return record
+
+
+def run_batch(manifest, output=None, workers=None, backend="google", language="fr-FR",
+              options=None, use_threads=False, cache_path=None, references_path=None, phonetic=False):
+    """Évalue toutes les entrées d'un manifeste en parallèle et écrit du JSONL
+
+    Les résultats sont écrits dans l'ordre du manifeste au fur et à mesure.
+    Un pool de processus est utilisé par défaut (un moteur chargé par
+    processus); use_threads convient aux moteurs en ligne. Avec cache_path,
+    les transcriptions déjà connues ne sont pas recalculées; avec
+    references_path, les textes de référence préparés sont conservés d'un
+    lancement à l'autre (sinon seulement pendant le traitement). Avec
+    phonetic, chaque ligne contient aussi les distances phonétiques par mot.
+    """
+    items = [(audio, reference, backend, language, options or {}, cache_path, references_path, phonetic)
+             for audio, reference in read_manifest(manifest)]
+    workers = workers or os.cpu_count() or 1
+    executor_class = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+
+    out = open(output, 'w', encoding='utf-8') if output else sys.stdout
+    failures = 0
+    try:
+        with executor_class(max_workers=workers) as executor:
+            for record in executor.map(evaluate, items, chunksize=4):
+                if "error" in record:
+                    failures += 1
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+    finally:
+        if output:
+            out.close()
+    return len(items), failures
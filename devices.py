@@ -0,0 +1,146 @@
+import os
+import threading
+from collections import namedtuple
+
+# Intervalle de surveillance des branchements de périphériques (s)
+HOTPLUG_INTERVAL = 3.0
+
+# id est stable d'un lancement à l'autre (API hôte + nom), contrairement à index
+AudioDevice = namedtuple("AudioDevice", "id index name hostapi channels default_samplerate")
+
+
+def _hotplug_signature():
+    """Empreinte bon marché de la liste des cartes son, ou None si indisponible"""
+    try:
+        with open("/proc/asound/cards", "rb") as f:
+            return f.read()
+    except OSError:
+        pass
+    try:
+        return tuple(sorted(os.listdir("/dev/snd")))
+    except OSError:
+        return None
+
+
+def query_input_devices(reinitialize=False):
+    """Énumère les périphériques d'entrée via PortAudio
+
+    Avec reinitialize, PortAudio est relancé pour voir les périphériques
+    branchés depuis son initialisation (aucun flux ne doit être ouvert).
+    """
+    import sounddevice as sd
+    if reinitialize:
+        sd._terminate()
+        sd._initialize()
+
+    hostapis = sd.query_hostapis()
+    devices = []
+    seen = {}
+    for index, info in enumerate(sd.query_devices()):
+        if info['max_input_channels'] <= 0:
+            continue
+        hostapi = hostapis[info['hostapi']]['name']
+        device_id = f"{hostapi}:{info['name']}"
+        # Des périphériques homonymes sont distingués par leur rang
+        seen[device_id] = seen.get(device_id, 0) + 1
+        if seen[device_id] > 1:
+            device_id += f"#{seen[device_id]}"
+        devices.append(AudioDevice(device_id, index, info['name'], hostapi,
+                                   info['max_input_channels'], info['default_samplerate']))
+    return devices
+
+
+def input_samplerate(index=None, fallback=44100):
+    """Fréquence native d'un périphérique d'entrée (celui du système si index vaut None)"""
+    try:
+        import sounddevice as sd
+        return int(sd.query_devices(index, 'input')['default_samplerate'])
+    except Exception as e:
+        print(f"Fréquence du microphone inconnue, {fallback} Hz utilisés: {e}")
+        return fallback
+
+
+class DeviceRegistry:
+    """Liste des microphones, énumérée en arrière-plan et mise en cache
+
+    refresh() lance l'énumération dans un thread et on_change(registry) est
+    appelé (depuis ce thread) quand la liste a changé. watch() surveille les
+    branchements et relance l'énumération lorsque les cartes son changent,
+    sauf si is_busy() signale qu'un flux audio est ouvert.
+    """
+
+    def __init__(self, on_change=None, is_busy=None):
+        self.on_change = on_change
+        self.is_busy = is_busy or (lambda: False)
+        self.devices = []
+        self.ready = False
+        self.error = None
+        self._by_id = {}
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._pending = False
+        self._pending_reinitialize = False
+        self._watching = False
+        self._stop = threading.Event()
+        self._ready_event = threading.Event()
+
+    def get(self, device_id):
+        """Retourne le périphérique correspondant à un identifiant stable, ou None"""
+        return self._by_id.get(device_id)
+
+    def wait(self, timeout=None):
+        """Attend la fin de la première énumération"""
+        return self._ready_event.wait(timeout)
+
+    def refresh(self, reinitialize=False):
+        """Relance l'énumération en arrière-plan (les demandes simultanées sont regroupées)"""
+        with self._lock:
+            if self._refreshing:
+                self._pending = True
+                self._pending_reinitialize = self._pending_reinitialize or reinitialize
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_worker, args=(reinitialize,), daemon=True).start()
+
+    def _refresh_worker(self, reinitialize):
+        while True:
+            try:
+                devices = query_input_devices(reinitialize and not self.is_busy())
+                error = None
+            except Exception as e:
+                devices, error = self.devices, e
+            changed = devices != self.devices or not self.ready or error != self.error
+            self.devices = devices
+            self._by_id = {device.id: device for device in devices}
+            self.error = error
+            self.ready = True
+            self._ready_event.set()
+            if changed and self.on_change is not None:
+                self.on_change(self)
+            with self._lock:
+                if not self._pending:
+                    self._refreshing = False
+                    return
+                reinitialize = self._pending_reinitialize
+                self._pending = self._pending_reinitialize = False
+
+    def watch(self, interval=HOTPLUG_INTERVAL):
+        """Surveille les branchements de périphériques dans un thread"""
+        if self._watching or _hotplug_signature() is None:
+            return
+        self._watching = True
+        self._stop.clear()
+        threading.Thread(target=self._watch_worker, args=(interval,), daemon=True).start()
+
+    def _watch_worker(self, interval):
+        signature = _hotplug_signature()
+        while not self._stop.wait(interval):
+            current = _hotplug_signature()
+            if current != signature and not self.is_busy():
+                signature = current
+                self.refresh(reinitialize=True)
+
+    def stop(self):
+        """Arrête la surveillance des branchements"""
+        self._watching = False
+        self._stop.set()
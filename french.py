@@ -0,0 +1,123 @@
+import re
+
+_UNITS = ["zéro", "un", "deux", "trois", "quatre", "cinq", "six", "sept", "huit", "neuf", "dix",
+          "onze", "douze", "treize", "quatorze", "quinze", "seize"]
+_TENS = {2: "vingt", 3: "trente", 4: "quarante", 5: "cinquante", 6: "soixante"}
+_SCALES = ((10 ** 9, "milliard"), (10 ** 6, "million"))
+
+# Abréviations courantes, cherchées telles qu'écrites puis en minuscules
+ABBREVIATIONS = {
+    "M.": "monsieur", "MM.": "messieurs", "Mme": "madame", "Mmes": "mesdames",
+    "Mlle": "mademoiselle", "Mlles": "mesdemoiselles", "Dr": "docteur", "Pr": "professeur",
+    "St": "saint", "Ste": "sainte", "etc.": "et cetera", "n°": "numéro", "av.": "avenue",
+    "bd": "boulevard", "km": "kilomètres", "kg": "kilogrammes", "cm": "centimètres",
+    "%": "pour cent", "€": "euros", "$": "dollars", "&": "et", "+": "plus", "=": "égal",
+}
+_SYMBOLS = {"%": "pour cent", "€": "euros", "$": "dollars"}
+
+# Ponctuation retirée autour d'un mot avant de chercher une abréviation
+_EDGE_PUNCTUATION = "«»\"“”()[]{},;:!?…"
+_NUMBER = re.compile(r"^(\d+)(?:[,.](\d+))?(%|€|\$)?$")
+_ORDINAL = re.compile(r"^(\d+)(er|re|ère|e|è|ème|eme|ième|ieme)$")
+_TIME = re.compile(r"^(\d{1,2})[hH](\d{2})?$")
+
+
+def _below_100(n, final=True):
+    if n < 17:
+        return _UNITS[n]
+    if n < 20:
+        return "dix-" + _UNITS[n - 10]
+    if n < 70:
+        tens, unit = divmod(n, 10)
+        if unit == 0:
+            return _TENS[tens]
+        return _TENS[tens] + (" et un" if unit == 1 else "-" + _UNITS[unit])
+    if n < 80:
+        return "soixante et onze" if n == 71 else "soixante-" + _below_100(n - 60)
+    if n == 80:
+        return "quatre-vingts" if final else "quatre-vingt"
+    return "quatre-vingt-" + _below_100(n - 80)
+
+
+def _below_1000(n, final=True):
+    hundreds, rest = divmod(n, 100)
+    if not hundreds:
+        return _below_100(rest, final)
+    words = "cent" if hundreds == 1 else _UNITS[hundreds] + (" cents" if not rest and final else " cent")
+    return words + " " + _below_100(rest, final) if rest else words
+
+
+def number_to_words(n, feminine=False):
+    """Écrit un entier positif en toutes lettres (orthographe traditionnelle)
+
+    feminine accorde un final en « une » (vingt et une heures).
+    """
+    if n == 0:
+        return _UNITS[0]
+    parts = []
+    for scale, name in _SCALES:
+        count, n = divmod(n, scale)
+        if count:
+            parts.append(_below_1000(count) + " " + name + ("s" if count > 1 else ""))
+    thousands, n = divmod(n, 1000)
+    if thousands:
+        # « mille » est invariable et « cent », « vingt » ne prennent pas de s devant lui
+        parts.append("mille" if thousands == 1 else _below_1000(thousands, final=False) + " mille")
+    if n:
+        parts.append(_below_1000(n))
+    words = " ".join(parts)
+    if feminine and (words == "un" or words.endswith((" un", "-un"))):
+        words += "e"
+    return words
+
+
+def ordinal_to_words(n, feminine=False):
+    """Écrit un nombre ordinal en toutes lettres (premier, deuxième, vingt et unième...)"""
+    if n == 1:
+        return "première" if feminine else "premier"
+    words = number_to_words(n)
+    if words.endswith(("cents", "vingts")):
+        words = words[:-1]
+    if words.endswith("cinq"):
+        return words + "uième"
+    if words.endswith("neuf"):
+        return words[:-1] + "vième"
+    if words.endswith("e"):
+        words = words[:-1]
+    return words + "ième"
+
+
+def expand_word(word):
+    """Retourne les mots prononcés pour un mot écrit: nombres, ordinaux, heures et abréviations
+
+    Un mot sans forme développée est retourné seul.
+    """
+    stripped = word.strip(_EDGE_PUNCTUATION)
+    expansion = ABBREVIATIONS.get(stripped) or ABBREVIATIONS.get(stripped.lower())
+    if expansion is None:
+        stripped = stripped.rstrip(".")
+        expansion = _expand_number(stripped)
+    return expansion.split() if expansion else [word]
+
+
+def _expand_number(text):
+    match = _NUMBER.match(text)
+    if match:
+        integer, decimals, symbol = match.groups()
+        words = number_to_words(int(integer))
+        if decimals:
+            # Zéros de tête prononcés: 3,05 « trois virgule zéro cinq »
+            zeros = len(decimals) - len(decimals.lstrip("0"))
+            words += " virgule " + " ".join(["zéro"] * zeros + ([number_to_words(int(decimals))]
+                                                                 if decimals.strip("0") else []))
+        return words + " " + _SYMBOLS[symbol] if symbol else words
+    match = _ORDINAL.match(text)
+    if match:
+        return ordinal_to_words(int(match.group(1)), feminine=match.group(2) in ("re", "ère"))
+    match = _TIME.match(text)
+    if match:
+        hours, minutes = match.groups()
+        # heure et minute sont féminins: « une heure une »
+        words = number_to_words(int(hours), feminine=True) + (" heure" if int(hours) <= 1 else " heures")
+        return words + " " + number_to_words(int(minutes), feminine=True) if minutes and int(minutes) else words
+    return None
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from storage import AUDIO_EXTENSIONS, audio_info
+
+# Index d'un dossier d'enregistrements: autrefois dans le dossier lui-même,
+# désormais dans LIBRARIES_DIRNAME à côté de l'application
+LIBRARY_FILENAME = ".voicecomp_library.sqlite"
+LIBRARIES_DIRNAME = ".voicecomp_libraries"
+
+# Champs indexés sur lesquels la liste peut être triée
+SORT_FIELDS = ("mtime", "name", "duration", "size", "score")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    name TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    duration REAL,
+    sample_rate INTEGER,
+    transcript TEXT,
+    score INTEGER,
+    speech TEXT
+);
+CREATE INDEX IF NOT EXISTS recordings_mtime ON recordings (mtime);
+CREATE INDEX IF NOT EXISTS recordings_duration ON recordings (duration);
+CREATE INDEX IF NOT EXISTS recordings_size ON recordings (size);
+CREATE INDEX IF NOT EXISTS recordings_score ON recordings (score);
+"""
+
+
+class Recording:
+    """Entrée de l'index des enregistrements"""
+
+    __slots__ = ("name", "mtime", "size", "duration", "sample_rate", "transcript", "score", "speech")
+
+    def __init__(self, name, mtime, size, duration=None, sample_rate=None, transcript=None, score=None,
+                 speech=None):
+        self.name = name
+        self.mtime = mtime
+        self.size = size
+        self.duration = duration
+        self.sample_rate = sample_rate
+        self.transcript = transcript
+        self.score = score
+        # Segments de parole détectés [(début, fin), ...] en secondes, si connus
+        self.speech = json.loads(speech) if isinstance(speech, str) else speech
+
+
+def read_audio_info(path):
+    """Retourne (durée en s, fréquence) d'un fichier audio, ou (None, None) s'il est illisible"""
+    try:
+        return audio_info(path)
+    except Exception:
+        # Fichier tronqué, format inconnu ou soundfile absent pour FLAC/Opus
+        return None, None
+
+
+def library_index_path(audio_dir, index_dir=None):
+    """Chemin de l'index d'un dossier d'enregistrements, hors de ce dossier
+
+    Une base placée dans le dossier en changerait la date à chaque écriture
+    (journal SQLite) et scan() devrait toujours le parcourir. index_dir vaut
+    par défaut le dossier de l'application.
+    """
+    index_dir = index_dir or os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha1(os.path.abspath(audio_dir).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(index_dir, LIBRARIES_DIRNAME, digest + ".sqlite")
+
+
+class RecordingLibrary:
+    """Index persistant des enregistrements d'un dossier
+
+    Les métadonnées (durée, fréquence, taille, date, segments de parole,
+    transcription et score connus) sont conservées dans une base SQLite
+    rangée hors du dossier (library_index_path). scan() ne relit que les
+    fichiers ajoutés ou modifiés depuis le dernier passage et ne fait rien
+    si le dossier lui-même n'a pas changé; la vue ne lit qu'une page de
+    résultats à la fois.
+    """
+
+    def __init__(self, audio_dir, index_dir=None):
+        self.audio_dir = audio_dir
+        self._lock = threading.Lock()
+        self._dir_mtime = None
+        try:
+            os.makedirs(audio_dir, exist_ok=True)
+            path = library_index_path(audio_dir, index_dir)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            legacy_path = os.path.join(audio_dir, LIBRARY_FILENAME)
+            if not os.path.exists(path) and os.path.exists(legacy_path):
+                # Index d'une version précédente: transcriptions et scores conservés
+                shutil.move(legacy_path, path)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+            self._db.executescript(_SCHEMA)
+        except (sqlite3.Error, OSError) as e:
+            # Index en mémoire: reconstruit à chaque lancement mais toujours disponible
+            print(f"Index des enregistrements non persistant: {e}")
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+            self._db.executescript(_SCHEMA)
+        # Index créé avant l'ajout des segments de parole
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(recordings)")]
+        if "speech" not in columns:
+            self._db.execute("ALTER TABLE recordings ADD COLUMN speech TEXT")
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def scan(self, force=False):
+        """Met l'index à jour par différence avec le contenu du dossier
+
+        Retourne True si l'index a changé.
+        """
+        try:
+            dir_mtime = os.stat(self.audio_dir).st_mtime
+        except OSError:
+            return False
+        if not force and dir_mtime == self._dir_mtime:
+            return False
+
+        with self._lock:
+            known = {name: (mtime, size) for name, mtime, size in
+                     self._db.execute("SELECT name, mtime, size FROM recordings")}
+
+        changed = []
+        present = set()
+        with os.scandir(self.audio_dir) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(AUDIO_EXTENSIONS) or not entry.is_file():
+                    continue
+                present.add(entry.name)
+                stat = entry.stat()
+                if known.get(entry.name) != (stat.st_mtime, stat.st_size):
+                    duration, rate = read_audio_info(entry.path)
+                    changed.append((entry.name, stat.st_mtime, stat.st_size, duration, rate))
+        removed = [(name,) for name in known if name not in present]
+
+        with self._lock:
+            # Un fichier modifié perd sa transcription et son score
+            self._db.executemany("INSERT OR REPLACE INTO recordings (name, mtime, size, duration, sample_rate)"
+                                 " VALUES (?, ?, ?, ?, ?)", changed)
+            self._db.executemany("DELETE FROM recordings WHERE name = ?", removed)
+            self._db.commit()
+        self._dir_mtime = dir_mtime
+        return bool(changed or removed)
+
+    def add(self, path, speech=None):
+        """Indexe un fichier qui vient d'être écrit, sans parcourir le dossier"""
+        stat = os.stat(path)
+        duration, rate = read_audio_info(path)
+        speech = json.dumps([[round(s, 3), round(e, 3)] for s, e in speech]) if speech is not None else None
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO recordings (name, mtime, size, duration, sample_rate, speech)"
+                             " VALUES (?, ?, ?, ?, ?, ?)",
+                             (os.path.basename(path), stat.st_mtime, stat.st_size, duration, rate, speech))
+            self._db.commit()
+
+    def rename(self, old_path, new_path):
+        """Reporte les métadonnées d'un enregistrement converti sur son nouveau fichier"""
+        stat = os.stat(new_path)
+        duration, rate = read_audio_info(new_path)
+        with self._lock:
+            self._db.execute("DELETE FROM recordings WHERE name = ?", (os.path.basename(new_path),))
+            self._db.execute("UPDATE recordings SET name = ?, mtime = ?, size = ?, duration = ?, sample_rate = ?"
+                             " WHERE name = ?", (os.path.basename(new_path), stat.st_mtime, stat.st_size,
+                                                 duration, rate, os.path.basename(old_path)))
+            self._db.commit()
+
+    def remove(self, path):
+        """Retire un fichier supprimé de l'index"""
+        with self._lock:
+            self._db.execute("DELETE FROM recordings WHERE name = ?", (os.path.basename(path),))
+            self._db.commit()
+
+    def set_result(self, path, transcript, score):
+        """Mémorise la dernière transcription et le score d'un enregistrement"""
+        with self._lock:
+            self._db.execute("UPDATE recordings SET transcript = ?, score = ? WHERE name = ?",
+                             (transcript, score, os.path.basename(path)))
+            self._db.commit()
+
+    @staticmethod
+    def _where(search):
+        if not search:
+            return "", ()
+        pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return (" WHERE name LIKE ? ESCAPE '\\' OR transcript LIKE ? ESCAPE '\\'",
+                (pattern, pattern))
+
+    def count(self, search=""):
+        """Nombre d'enregistrements correspondant à la recherche"""
+        where, params = self._where(search)
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM recordings" + where, params).fetchone()[0]
+
+    def page(self, offset=0, limit=100, search="", sort="mtime", descending=True):
+        """Retourne une page d'enregistrements triés sur un champ indexé"""
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Tri impossible sur {sort}")
+        where, params = self._where(search)
+        order = "DESC" if descending else "ASC"
+        query = (f"SELECT name, mtime, size, duration, sample_rate, transcript, score, speech FROM recordings"
+                 f"{where} ORDER BY {sort} IS NULL, {sort} {order}, name LIMIT ? OFFSET ?")
+        with self._lock:
+            rows = self._db.execute(query, params + (limit, offset)).fetchall()
+        return [Recording(*row) for row in rows]
@@ -1,22 +1,145 @@
+import time
+STARTUP_BEGIN = time.perf_counter()
+
 import tkinter as tk
 from tkinter import scrolledtext, messagebox, ttk, filedialog
-import sounddevice as sd
-import numpy as np
 import threading
+import queue
 import os
-import tempfile
-import wave
-from scipy.io import wavfile
-import speech_recognition as sr
-from difflib import SequenceMatcher
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.animation as animation
-import pyaudio
-import subprocess
 import sys
-import json
+import argparse
+import sqlite3
+from bisect import bisect_right
+from collections import Counter
 from datetime import datetime
+from capture import CaptureEngine
+from visualizer import create_level_meter
+from streaming import StreamingTranscriber
+from alignment import EQUAL, SUBSTITUTE, split_words
+from core import compare_texts, run_batch
+from transcription_cache import TranscriptionCache, CACHE_FILENAME, move_legacy_cache
+from library import RecordingLibrary
+from devices import DeviceRegistry, AudioDevice, input_samplerate
+from resampler import StreamingResampler
+from storage import archive_path, write_flac, converted_path, BackgroundEncoder, migrate_directory, FORMATS
+from vad import VoiceActivityDetector, detect_speech
+from recognition import (RecognitionPipeline, get_backend, PROGRESS_LABELS, CANCELLED, TIMED_OUT,
+                         UnintelligibleAudio, BackendError)
+from wav_writer import StreamingWavWriter, recover_partial_recordings, PARTIAL_SUFFIX
+from playback import PlaybackEngine, PLAYING, STOPPED
+from settings_store import SettingsStore
+from scoring import analyze_recording
+from reference_store import ReferenceStore, REFERENCES_FILENAME
+from phonetics import NEAR_MISS_DISTANCE
+
+# sounddevice, matplotlib, speech_recognition et vosk sont importés à la
+# première utilisation: la fenêtre s'ouvre sans initialiser PortAudio
+IMPORTS_DONE = time.perf_counter()
+# Modules lourds dont --profile-startup indique s'ils ont été chargés
+HEAVY_MODULES = ("numpy", "sounddevice", "pyaudio", "scipy", "matplotlib", "speech_recognition", "vosk")
+
+# Intervalle de traitement des événements des threads audio (ms)
+EVENT_POLL_MS = 50
+# Délai maximal accordé à la reconnaissance vocale (s)
+RECOGNITION_TIMEOUT = 60
+# Nombre de segments insérés par appel Tk lors de l'affichage des résultats
+RENDER_CHUNK_RUNS = 2000
+# Nombre d'enregistrements affichés par page
+RECORDINGS_PAGE_SIZE = 100
+# Délai avant d'appliquer la recherche dans les enregistrements (ms)
+SEARCH_DELAY_MS = 250
+# Fréquences par défaut des fichiers enregistrés et de l'audio transmis au moteur (Hz)
+DEFAULT_STORAGE_RATE = 16000
+DEFAULT_RECOGNITION_RATE = 16000
+RECOGNITION_RATES = (8000, 16000, 22050, 44100, 48000)
+# Marge ajoutée autour d'un mot cliqué dans le résultat avant de le jouer (s)
+WORD_PLAY_PADDING = 0.1
+# Croissance maximale de la mémoire Python tolérée par --stress-views (octets)
+STRESS_MAX_GROWTH = 512 * 1024
+# Widgets présents dans chaque vue: rattachés à l'application quand la vue est affichée
+VIEW_WIDGETS = ("meter", "record_button", "status_var", "play_button", "seek_scale", "seek_var",
+                "playback_time_var")
+# Champs de tri proposés dans la liste des enregistrements
+RECORDINGS_SORT_LABELS = {"Date": "mtime", "Nom": "name", "Durée": "duration",
+                          "Taille": "size", "Score": "score"}
+
+
+def coalesce_runs(runs):
+    """Fusionne les segments (texte, tag) consécutifs portant le même tag"""
+    merged = []
+    for text, tag in runs:
+        if merged and merged[-1][1] == tag:
+            merged[-1][0].append(text)
+        else:
+            merged.append(([text], tag))
+    return [("".join(parts), tag) for parts, tag in merged]
+
+
+def format_recording(entry):
+    """Ligne affichée pour un enregistrement de l'index"""
+    parts = [entry.name]
+    if entry.duration is not None:
+        minutes, seconds = divmod(int(round(entry.duration)), 60)
+        parts.append(f"{minutes}:{seconds:02d}")
+    if entry.score is not None:
+        parts.append(f"{entry.score}%")
+    return "  —  ".join(parts)
+
+
+def report_startup(stages):
+    """Affiche la durée de chaque étape du démarrage et les modules lourds chargés"""
+    previous = STARTUP_BEGIN
+    for label, instant in stages:
+        print(f"{label:<28} {(instant - previous) * 1000:8.1f} ms")
+        previous = instant
+    print(f"{'Total':<28} {(previous - STARTUP_BEGIN) * 1000:8.1f} ms")
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    deferred = [name for name in HEAVY_MODULES if name not in sys.modules]
+    print(f"Modules lourds chargés: {', '.join(loaded) or 'aucun'}")
+    print(f"Modules différés: {', '.join(deferred) or 'aucun'}")
+
+
+def count_widgets(widget):
+    """Nombre de widgets Tk sous un widget (inclus)"""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def stress_views(root, app, switches):
+    """Alterne entre les vues et vérifie que la mémoire et le nombre de widgets restent stables"""
+    import gc
+    import tracemalloc
+    
+    def show(i):
+        if i % 3 == 2:
+            app.open_settings()
+        else:
+            app.switch_to_mode(("recording", "comparison")[i % 3])
+        root.update()
+    
+    # Premier cycle: construction des vues et remplissage des caches de Tk
+    for i in range(3):
+        show(i)
+    gc.collect()
+    widgets = count_widgets(root)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    for i in range(3, 3 + switches):
+        show(i)
+    elapsed = time.perf_counter() - started
+    # Même vue qu'au point de référence pour comparer les widgets
+    while i % 3 != 2:
+        i += 1
+        show(i)
+    gc.collect()
+    growth = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    leaked_widgets = count_widgets(root) - widgets
+    print(f"{switches} changements de vue en {elapsed:.2f} s ({elapsed / switches * 1000:.2f} ms en moyenne)")
+    print(f"Mémoire Python: {growth / 1024:+.1f} Kio, widgets Tk: {leaked_widgets:+d}")
+    root.destroy()
+    return 0 if growth <= STRESS_MAX_GROWTH and leaked_widgets == 0 else 1
+
 
 class SpeechComparisonApp:
     def __init__(self, root):
@@ -25,6 +148,11 @@ class SpeechComparisonApp:
         self.root.geometry("800x700")
         
         self.load_settings()
+        # Textes de référence préparés, conservés à côté des paramètres
+        self.references = ReferenceStore(os.path.join(os.path.dirname(self.settings_file), REFERENCES_FILENAME))
+        
+        for path in recover_partial_recordings(self.settings["audio_dir"]):
+            print(f"Enregistrement interrompu récupéré: {os.path.basename(path)}")
         
         # Appliquer le thème
         self.apply_theme()
@@ -32,106 +160,284 @@ class SpeechComparisonApp:
         self.comparison_frame = None
         self.recording_frame = None
         self.settings_frame = None
+        # Vues des modes, construites au premier affichage puis masquées et réaffichées
+        self.views = {}
+        self.current_view = None
+        self.filename_var = None
         
         # Style
         self.style = ttk.Style()
         self.update_style()
 
-        self.recognizer = sr.Recognizer()
+        # Le moteur (et speech_recognition ou vosk) n'est chargé qu'à la première reconnaissance
+        self.recognition = RecognitionPipeline(
+            backend_factory=self.create_backend, cache=self.open_transcription_cache(),
+            sample_rate=self.settings.get("recognition_sample_rate", DEFAULT_RECOGNITION_RATE),
+            trim=self.settings.get("trim_silence", True))
+        self.recognition_job = None
+        self.live_transcriber = None
+        self.compare_waiting = False
+        self.render_job = None
+        self.acoustics_request = None
         self.audio_file = None
+        # Fichiers lus par une tâche de fond, et WAV compressés à supprimer dès qu'ils sont libres
+        self.files_in_use = Counter()
+        self.converted_sources = {}
         self.recording = False
-        self.duration = 5
-        self.audio_data = []
-        self.ani = None
+        self.record_device = None
+        self.capture = CaptureEngine()
+        self.meter = None
         self.monitoring = False
-        
-        p = pyaudio.PyAudio()
-        self.mic_devices = [(i, p.get_device_info_by_index(i)['name']) 
-                           for i in range(p.get_device_count()) 
-                           if p.get_device_info_by_index(i).get('maxInputChannels') > 0]
-        p.terminate()
+        self.countdown_job = None
+        self.library = RecordingLibrary(self.settings["audio_dir"], os.path.dirname(self.settings_file))
+        self.library_scanning = False
+        self.recordings_page = []
+        self.recordings_offset = 0
+        self.search_job = None
+        for name in VIEW_WIDGETS:
+            setattr(self, name, None)
+        self.seeking = False
+        # Mots de la référence dont le moment est connu: (début, fin, position dans result_area)
+        self.word_spans = []
+        self.word_starts = []
+        
+        self.register_event_handlers()
+        
+        # Lecture dans l'application; le callback audio ne fait que poster des événements
+        self.playback = PlaybackEngine(
+            on_position=lambda position: self.post_event("playback_position", position=position),
+            on_state=lambda state: self.post_event("playback_state", state=state))
+        
+        # Compression des enregistrements terminés (FLAC/Opus) hors du thread Tk
+        self.encoder = BackgroundEncoder(
+            on_done=lambda source, target, error: self.post_event(
+                "recording_encoded", source=source, target=target, error=error))
+        
+        # Les microphones sont énumérés en arrière-plan pour ne pas retarder la fenêtre
+        self.mic_choices = []
+        self.devices = DeviceRegistry(on_change=lambda registry: self.post_event("devices_changed"),
+                                      is_busy=lambda: self.recording or self.monitoring or self.playback.active)
+        self.devices.refresh()
+        self.devices.watch()
         
         self.create_menu()
         
         self.switch_to_mode(self.settings["app_mode"])
         
+        self.root.after(EVENT_POLL_MS, self.process_events)
+        
     def get_selected_mic_index(self):
-        """Retourne l'indice du microphone sélectionné"""
-        if hasattr(self, 'mic_var') and self.mic_var.get():
-            selected_name = self.mic_var.get()
-            for device in self.mic_devices:
-                if device[1] == selected_name:
-                    return device[0]
-        
-        return self.settings["selected_mic"]
-        
-    def update_audio_plot(self, frame):
-        """Met à jour la visualisation audio"""
-        if (self.recording or self.monitoring) and self.audio_data:
-            data = self.audio_data[-100:] if len(self.audio_data) > 100 else self.audio_data
-            self.line.set_data(range(len(data)), data)
-            self.ax.set_xlim(0, len(data))
-        return self.line,
+        """Retourne l'indice PortAudio du microphone choisi, ou None pour celui du système
+
+        Sans attendre l'énumération: tant que le microphone choisi n'est pas
+        dans la dernière liste connue, celui du système est utilisé.
+        """
+        if self.settings_frame is not None and self.mic_choices:
+            choice = self.mic_choices[max(0, self.mic_dropdown.current())]
+            device_id = choice.id if choice is not None else None
+        else:
+            device_id = self.settings.get("selected_mic_id")
+        if device_id is None:
+            return None
+        device = self.devices.get(device_id)
+        return device.index if device is not None else None
+        
+    def on_devices_changed_event(self):
+        """Met à jour la liste des microphones affichée après une énumération"""
+        if self.devices.error is not None:
+            print(f"Impossible d'énumérer les microphones: {self.devices.error}")
+        if self.settings_frame is not None:
+            self.update_mic_choices()
+        # Compte à rebours en cours: le microphone choisi est peut-être maintenant connu
+        if self.countdown_job is not None:
+            device = self.get_selected_mic_index()
+            if device != self.record_device:
+                self.record_device = device
+                self.capture = CaptureEngine(input_samplerate(device))
+            
+    def update_mic_choices(self, selected_id=None):
+        """Remplit la liste déroulante des microphones avec les périphériques connus"""
+        if selected_id is None and self.mic_choices:
+            choice = self.mic_choices[max(0, self.mic_dropdown.current())]
+            selected_id = choice.id if choice is not None else None
+            
+        default_label = "Microphone par défaut du système"
+        if not self.devices.ready:
+            default_label += " (recherche des périphériques...)"
+        self.mic_choices = [None] + list(self.devices.devices)
+        labels = [default_label] + [f"{d.name} ({d.hostapi})" for d in self.devices.devices]
+        
+        position = 0
+        if selected_id is not None:
+            for i, device in enumerate(self.mic_choices[1:], 1):
+                if device.id == selected_id:
+                    position = i
+                    break
+            else:
+                # Périphérique débranché: le choix est conservé
+                self.mic_choices.append(AudioDevice(selected_id, None, selected_id, "", 0, None))
+                labels.append(f"{selected_id} (déconnecté)")
+                position = len(labels) - 1
+                
+        self.mic_dropdown['values'] = labels
+        self.mic_dropdown.current(position)
+        
+    def meter_source(self, n):
+        """Fournit l'enveloppe de la prise en cours à l'indicateur de niveau"""
+        return self.capture.snapshot_envelope(n)
+        
+    def create_meter(self, master, height):
+        """Crée l'indicateur de niveau selon les paramètres de visualisation"""
+        self.meter = create_level_meter(master, self.settings.get("visualizer_renderer", "canvas"),
+                                        self.meter_source, height=height, bg=self.text_bg)
+        return self.meter
+        
+    def start_meter(self):
+        """Démarre l'indicateur de niveau s'il est affiché"""
+        if self.meter is not None:
+            self.meter.start()
+            
+    def stop_meter(self):
+        """Arrête le rafraîchissement de l'indicateur de niveau"""
+        if self.meter is not None:
+            self.meter.stop()
         
     def test_microphone(self):
         """Teste le microphone sélectionné"""
+        if self.recording:
+            messagebox.showwarning("Attention", "Impossible de tester le microphone pendant un enregistrement.")
+            return
         if not self.monitoring:
             self.monitoring = True
-            self.audio_data = []
-            self.ani = animation.FuncAnimation(
-                self.fig, self.update_audio_plot, interval=30, blit=True, cache_frame_data=False)
-            self.canvas.draw()
-            threading.Thread(target=self.monitor_audio).start()
+            mic_index = self.get_selected_mic_index()
+            self.capture = CaptureEngine(input_samplerate(mic_index))
+            self.start_meter()
+            threading.Thread(target=self.monitor_audio, args=(mic_index,), daemon=True).start()
             self.status_var.set("Test du microphone en cours...")
         else:
             self.monitoring = False
+            self.stop_meter()
             self.status_var.set("Test du microphone arrêté")
             
-    def monitor_audio(self):
+    def monitor_audio(self, mic_index):
         """Surveille l'entrée audio pour le test de microphone"""
-        mic_index = self.get_selected_mic_index()
-        sample_rate = 44100
+        capture = self.capture
         
         def callback(indata, frames, time, status):
             if status:
-                print(status)
-            self.audio_data.extend(indata[:, 0])
+                capture.note_status(status)
+            capture.write(indata)
             
-        with sd.InputStream(device=mic_index, channels=1, callback=callback,
-                          samplerate=sample_rate):
-            while self.monitoring:
-                sd.sleep(100)
+        try:
+            import sounddevice as sd
+            with sd.InputStream(device=mic_index, channels=1, callback=callback,
+                              samplerate=capture.sample_rate):
+                while self.monitoring:
+                    capture.ensure_spare()
+                    sd.sleep(100)
+        except Exception as e:
+            self.monitoring = False
+            self.post_event("status", text=f"Erreur du microphone: {e}")
+            
+    def register_event_handlers(self):
+        """Crée la file d'événements: les threads audio ne touchent jamais Tk"""
+        self.events = queue.Queue()
+        self.event_handlers = {
+            "status": self.on_status_event,
+            "progress": self.on_progress_event,
+            "recording_saved": self.on_recording_saved_event,
+            "recording_empty": self.on_recording_empty_event,
+            "recording_failed": self.on_recording_failed_event,
+            "recording_encoded": self.on_recording_encoded_event,
+            "recognition_progress": self.on_recognition_progress_event,
+            "recognition_done": self.on_recognition_done_event,
+            "live_transcription_done": self.on_live_transcription_done_event,
+            "library_scanned": self.on_library_scanned_event,
+            "devices_changed": self.on_devices_changed_event,
+            "playback_position": self.on_playback_position_event,
+            "playback_state": self.on_playback_state_event,
+            "acoustics_ready": self.on_acoustics_ready_event,
+            "file_released": self.on_file_released_event,
+        }
         
+    def post_event(self, kind, **data):
+        """Envoie un événement au thread Tk (appelable depuis n'importe quel thread)"""
+        self.events.put((kind, data))
+        
+    def process_events(self):
+        """Traite les événements en attente sur le thread Tk"""
+        while True:
+            try:
+                kind, data = self.events.get_nowait()
+            except queue.Empty:
+                break
+            handler = self.event_handlers.get(kind)
+            if handler is None:
+                continue
+            try:
+                handler(**data)
+            except Exception as e:
+                print(f"Erreur lors du traitement de l'événement {kind}: {e}")
+                
+        self.root.after(EVENT_POLL_MS, self.process_events)
+        
+    def on_status_event(self, text):
+        """Affiche un message d'état"""
+        self.status_var.set(text)
+        
+    def on_progress_event(self, duration, level):
+        """Met à jour la progression de l'enregistrement"""
+        if self.recording:
+            self.status_var.set(f"Enregistrement en cours... Durée: {duration:.1f}s")
+            
     def start_recording(self):
         if not self.recording:
             self.recording = True
             self.record_button.config(text="Arrêter l'enregistrement")
-            self.duration = self.duration_var.get()
-            self.audio_data = []
+            # Capture à la fréquence native: le périphérique n'a pas à rééchantillonner
+            self.record_device = self.get_selected_mic_index()
+            self.capture = CaptureEngine(input_samplerate(self.record_device))
+            self.start_meter()
+            if self.settings["app_mode"] == "comparison":
+                # Charge le moteur pendant le compte à rebours
+                self.recognition.warm_up()
             
-            self.ani = animation.FuncAnimation(
-                self.fig, self.update_audio_plot, interval=30, blit=True, cache_frame_data=False)
-            self.canvas.draw()
-            
-            threading.Thread(target=self.record_audio_to_file).start()
+            self.status_var.set("Préparation de l'enregistrement...")
+            self.countdown_recording(3)
         else:
             self.recording = False
             self.record_button.config(text="Commencer l'enregistrement")
+            self.stop_meter()
+            if self.countdown_job is not None:
+                self.root.after_cancel(self.countdown_job)
+                self.countdown_job = None
+                self.status_var.set("Enregistrement annulé")
+                
+    def countdown_recording(self, remaining):
+        """Affiche le compte à rebours puis lance la capture sans bloquer l'interface"""
+        if remaining > 0:
+            self.status_var.set(f"L'enregistrement commence dans {remaining}...")
+            self.countdown_job = self.root.after(1000, lambda: self.countdown_recording(remaining - 1))
+            return
             
-    def record_audio_to_file(self):
-        """Enregistre l'audio dans un fichier WAV"""
-        self.status_var.set("Préparation de l'enregistrement...")
-        sample_rate = 44100  # Hz
-        mic_index = self.get_selected_mic_index()
+        self.countdown_job = None
+        filepath = self.next_recording_path()
+        mic_index = self.record_device
+        
+        transcriber = None
+        if self.settings["app_mode"] == "comparison" and self.settings.get("streaming_transcription", True):
+            transcriber = StreamingTranscriber(
+                self.capture, self.recognition, filepath,
+                on_complete=lambda t: self.post_event("live_transcription_done", transcriber=t))
+        self.live_transcriber = transcriber
         
-        for i in range(3, 0, -1):
-            self.status_var.set(f"L'enregistrement commence dans {i}...")
-            self.root.update()
-            self.root.after(1000)
-            
         self.status_var.set("Enregistrement en cours...")
+        threading.Thread(target=self.record_audio_to_file, args=(filepath, mic_index, transcriber),
+                         daemon=True).start()
         
-        filename = self.filename_var.get() if hasattr(self, 'filename_var') else f"Enregistrement_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    def next_recording_path(self):
+        """Retourne un chemin libre pour le prochain enregistrement"""
+        filename = self.filename_var.get() if self.filename_var is not None else f"Enregistrement_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         if not filename.endswith('.wav'):
             filename += '.wav'
             
@@ -139,141 +445,469 @@ class SpeechComparisonApp:
         
         counter = 1
         base_name, ext = os.path.splitext(filepath)
-        while os.path.exists(filepath):
+        # Le nom doit rester libre une fois le fichier compressé
+        while (os.path.exists(filepath + PARTIAL_SUFFIX)
+               or any(os.path.exists(converted_path(filepath, fmt)) for fmt in FORMATS)):
             filepath = f"{base_name}_{counter}{ext}"
             counter += 1
+        return filepath
+            
+    def record_audio_to_file(self, filepath, mic_index, transcriber=None):
+        """Enregistre l'audio dans un fichier WAV (thread audio, sans accès à Tk)"""
+        capture = self.capture
+        sample_rate = capture.sample_rate
+        storage_rate = self.settings.get("storage_sample_rate", DEFAULT_STORAGE_RATE) or sample_rate
+        
+        try:
+            resampler = None
+            if storage_rate != sample_rate:
+                resampler = StreamingResampler(sample_rate, storage_rate)
+            writer = StreamingWavWriter(filepath, storage_rate, resampler=resampler).start()
+        except OSError as e:
+            self.post_event("recording_failed", error=str(e))
+            return
         
         def callback(indata, frames, time, status):
             if status:
-                print(status)
-            self.audio_data.extend(indata[:, 0])
-        
-        with sd.InputStream(device=mic_index, channels=1, callback=callback,
-                          samplerate=sample_rate):
-            while self.recording:
-                self.status_var.set(f"Enregistrement en cours... Durée: {len(self.audio_data)/sample_rate:.1f}s")
-                self.root.update()
-                sd.sleep(100)
-        
-        if len(self.audio_data) > 0:
-            audio_array = np.array(self.audio_data)
-            with wave.open(filepath, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)  # 16-bit
-                wf.setframerate(sample_rate)
-                wf.writeframes((audio_array * 32767).astype(np.int16).tobytes())
-            
-            self.audio_file = filepath
-            messagebox.showinfo("Enregistrement", f"Enregistrement terminé avec succès.\nSauvegardé sous: {os.path.basename(filepath)}")
-            
-            if self.settings["app_mode"] == "recording":
-                self.refresh_recordings_list()
-                
-            if hasattr(self, 'filename_var'):
-                self.filename_var.set(f"Enregistrement_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-        else:
-            messagebox.showwarning("Avertissement", "Aucune donnée audio enregistrée.")
+                capture.note_status(status)
+            writer.push(capture.write(indata))
+        
+        # Arrêt automatique: durée maximale et/ou silence prolongé après la parole
+        max_duration = self.settings.get("max_recording_seconds", 0)
+        silence_stop = self.settings.get("auto_stop_silence", 0)
+        detector = VoiceActivityDetector(sample_rate) if silence_stop else None
+        analysed = 0
+        stop_reason = None
+        
+        try:
+            import sounddevice as sd
+            with sd.InputStream(device=mic_index, channels=1, callback=callback,
+                              samplerate=sample_rate):
+                while self.recording:
+                    capture.ensure_spare()
+                    self.post_event("progress", duration=capture.duration, level=capture.current_level())
+                    if transcriber is not None:
+                        transcriber.poll()
+                    if detector is not None:
+                        written = capture.frames_written
+                        detector.feed(capture.read(analysed, written))
+                        analysed = written
+                        if detector.speech_seen and detector.trailing_silence >= silence_stop:
+                            stop_reason = f"arrêt après {silence_stop:g} s de silence"
+                            break
+                    if max_duration and capture.duration >= max_duration:
+                        stop_reason = f"durée maximale de {max_duration} s atteinte"
+                        break
+                    sd.sleep(100)
+        except Exception as e:
+            writer.discard()
+            if transcriber is not None:
+                transcriber.cancel()
+            self.post_event("recording_failed", error=str(e))
+            return
         
+        if capture.frames_written > 0:
+            if transcriber is not None:
+                transcriber.finish()
+            try:
+                writer.close()
+            except OSError as e:
+                if transcriber is not None:
+                    transcriber.cancel()
+                self.post_event("recording_failed", error=str(e))
+                return
+            pcm = capture.finalize()
+            self.post_event("recording_saved", filepath=filepath, overflows=capture.overflows,
+                            speech=detect_speech(pcm, sample_rate), stop_reason=stop_reason)
+            if self.settings.get("flac_archive", False):
+                try:
+                    write_flac(archive_path(filepath), pcm, sample_rate)
+                except Exception as e:
+                    print(f"Impossible d'archiver {filepath} en FLAC: {e}")
+        else:
+            writer.discard()
+            if transcriber is not None:
+                transcriber.cancel()
+            self.post_event("recording_empty")
+            
+    def finish_recording(self, status):
+        """Remet l'interface dans l'état de repos après un enregistrement"""
         self.recording = False
+        self.stop_meter()
         self.record_button.config(text="Commencer l'enregistrement")
-        self.status_var.set("Enregistrement terminé")
+        self.status_var.set(status)
+        
+    def on_recording_saved_event(self, filepath, overflows, speech=None, stop_reason=None):
+        """Termine un enregistrement sauvegardé"""
+        self.audio_file = filepath
+        self.remember_live_transcription()
+        try:
+            self.library.add(filepath, speech=speech)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Impossible d'indexer {filepath}: {e}")
+        
+        status = "Enregistrement terminé"
+        if stop_reason:
+            status += f" ({stop_reason})"
+        if overflows:
+            status += f" ({overflows} débordement(s) d'entrée détecté(s))"
+        
+        storage_format = self.settings.get("storage_format", "wav")
+        if storage_format != "wav":
+            self.encoder.submit(filepath, storage_format)
+        self.finish_recording(status)
+        
+        messagebox.showinfo("Enregistrement", f"Enregistrement terminé avec succès.\nSauvegardé sous: {os.path.basename(filepath)}")
+        
+        if self.settings["app_mode"] == "recording":
+            self.refresh_recordings_list()
+            
+        if self.filename_var is not None:
+            self.filename_var.set(f"Enregistrement_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            
+    def on_recording_encoded_event(self, source, target, error):
+        """Remplace un enregistrement WAV par sa version compressée"""
+        if error is not None:
+            print(f"Impossible de compresser {source}: {error}")
+            self.status_var.set(f"Compression impossible, enregistrement conservé en WAV: {error}")
+            return
+            
+        if self.playback.path == source:
+            self.playback.close()
+        try:
+            self.library.rename(source, target)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Impossible d'indexer {target}: {e}")
+        if self.audio_file == source:
+            self.audio_file = target
+        if self.live_transcriber is not None and self.live_transcriber.audio_path == source:
+            self.live_transcriber.audio_path = target
+        self.converted_sources[source] = target
+        self.retire_if_unused(source)
+        if self.settings["app_mode"] == "recording" and self.recording_frame is not None:
+            self.refresh_recordings_list()
+            
+    def use_file(self, path):
+        """Signale qu'une tâche de fond va lire un fichier"""
+        self.files_in_use[path] += 1
+        
+    def on_file_released_event(self, path):
+        """Une tâche de fond a fini de lire un fichier"""
+        self.files_in_use[path] -= 1
+        if self.files_in_use[path] <= 0:
+            del self.files_in_use[path]
+            self.retire_if_unused(path)
+            
+    def retire_if_unused(self, source):
+        """Supprime le WAV d'un enregistrement compressé quand plus aucune tâche ne le lit"""
+        target = self.converted_sources.get(source)
+        if target is not None and not self.files_in_use[source]:
+            del self.converted_sources[source]
+            self.encoder.retire(source, target, self.recognition.cache)
+            
+    def on_recording_empty_event(self):
+        """Signale un enregistrement vide"""
+        self.finish_recording("Enregistrement terminé")
+        messagebox.showwarning("Avertissement", "Aucune donnée audio enregistrée.")
+        
+    def on_recording_failed_event(self, error):
+        """Signale un échec de l'enregistrement"""
+        self.finish_recording("Erreur lors de l'enregistrement")
+        messagebox.showerror("Erreur", f"Impossible d'enregistrer l'audio: {error}")
+        
+    def on_live_transcription_done_event(self, transcriber):
+        """Reçoit la transcription faite pendant l'enregistrement"""
+        if transcriber is not self.live_transcriber:
+            return
+        self.remember_live_transcription()
+        if not self.compare_waiting:
+            if transcriber.error is None:
+                self.status_var.set("Transcription prête")
+            return
+            
+        self.compare_waiting = False
+        self.compare_button.config(text="Comparer le texte")
+        if transcriber.error is None:
+            self.show_comparison(transcriber.result)
+        else:
+            # Repli sur la reconnaissance du fichier complet
+            self.live_transcriber = None
+            self.compare_text()
+            
+    def open_transcription_cache(self):
+        """Ouvre le cache des transcriptions, rangé à côté des paramètres et non dans le dossier d'enregistrements"""
+        path = os.path.join(os.path.dirname(self.settings_file), CACHE_FILENAME)
+        try:
+            move_legacy_cache(self.settings["audio_dir"], path)
+            return TranscriptionCache(path)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Cache des transcriptions indisponible: {e}")
+            return None
+            
+    def remember_live_transcription(self):
+        """Met en cache la transcription faite pendant l'enregistrement une fois le fichier écrit"""
+        live = self.live_transcriber
+        if (live is not None and live.done and live.error is None and not live.remembered
+                and live.audio_path == self.audio_file):
+            live.remembered = True
+            path = live.audio_path
+            future = self.recognition.remember(path, live.result, live.backend)
+            if future is not None:
+                self.use_file(path)
+                future.add_done_callback(lambda f: self.post_event("file_released", path=path))
+            
+    def create_backend(self):
+        """Retourne le moteur de reconnaissance choisi dans les paramètres"""
+        name = self.settings.get("recognition_backend", "google")
+        language = self.settings.get("recognition_language", "fr-FR")
+        if name == "vosk":
+            return get_backend(name, language, model_path=self.settings.get("vosk_model_path", ""))
+        return get_backend(name, language)
         
     def compare_text(self):
-        """Compare le texte écrit avec le texte parlé"""
+        """Lance la reconnaissance en arrière-plan, ou l'annule si elle est en cours"""
+        if self.recognition_job is not None:
+            self.recognition_job.cancel()
+            return
+            
+        if self.compare_waiting:
+            self.compare_waiting = False
+            self.compare_button.config(text="Comparer le texte")
+            self.status_var.set(PROGRESS_LABELS[CANCELLED])
+            return
+            
         if self.audio_file is None:
             messagebox.showwarning("Attention", "Aucun audio enregistré.")
             return
             
-        try:
-            self.status_var.set("Analyse de l'audio...")
+        live = self.live_transcriber
+        if live is not None and live.audio_path == self.audio_file:
+            if not live.done:
+                self.compare_waiting = True
+                self.compare_button.config(text="Annuler l'analyse")
+                self.status_var.set("Finalisation de la transcription...")
+                return
+            if live.error is None:
+                self.show_comparison(live.result)
+                return
             
-            with sr.AudioFile(self.audio_file) as source:
-                audio_data = self.recognizer.record(source)
-                
-            text = self.recognizer.recognize_google(audio_data, language="fr-FR")
+        self.status_var.set("Analyse de l'audio...")
+        self.compare_button.config(text="Annuler l'analyse")
+        self.use_file(self.audio_file)
+        self.recognition_job = self.recognition.submit(
+            self.audio_file,
+            callback=lambda job: self.post_event("recognition_done", job=job),
+            on_progress=lambda job: self.post_event("recognition_progress", job=job),
+            timeout=RECOGNITION_TIMEOUT)
+        
+    def on_recognition_progress_event(self, job):
+        """Affiche l'avancement de la reconnaissance"""
+        if job is self.recognition_job and not job.done:
+            self.status_var.set(PROGRESS_LABELS[job.state])
+            
+    def on_recognition_done_event(self, job):
+        """Reçoit le résultat de la reconnaissance sur le thread Tk"""
+        self.on_file_released_event(job.source)
+        if job is not self.recognition_job:
+            return
+        self.recognition_job = None
+        self.compare_button.config(text="Comparer le texte")
+        
+        if job.state == CANCELLED:
+            self.status_var.set(PROGRESS_LABELS[CANCELLED])
+        elif job.state == TIMED_OUT:
+            messagebox.showerror("Erreur", "La reconnaissance vocale n'a pas répondu à temps")
+            self.status_var.set(PROGRESS_LABELS[TIMED_OUT])
+        elif job.error is not None:
+            self.show_recognition_error(job.error)
+        else:
+            self.show_comparison(job.result)
             
+    def show_recognition_error(self, error):
+        """Affiche une erreur de reconnaissance"""
+        if isinstance(error, UnintelligibleAudio):
+            messagebox.showerror("Erreur", "Impossible de comprendre l'audio")
+            self.status_var.set("Erreur: Audio incompréhensible")
+        elif isinstance(error, BackendError):
+            messagebox.showerror("Erreur", f"Erreur de service de reconnaissance vocale; {error}")
+            self.status_var.set("Erreur de service")
+        else:
+            messagebox.showerror("Erreur", f"Une erreur s'est produite: {error}")
+            self.status_var.set("Erreur lors de la comparaison")
+            
+    def show_comparison(self, result):
+        """Affiche la comparaison entre le texte écrit et la transcription"""
+        text = result.transcript
+        try:
             written_text = self.text_area.get(1.0, tk.END).strip()
             
-            self.result_area.delete(1.0, tk.END)
-            self.result_area.insert(tk.INSERT, f"Texte prononcé: {text}\n\n")
-            self.result_area.insert(tk.INSERT, "Comparaison:\n")
+            comparison = compare_texts(written_text, text, self.references,
+                                       phonetic=self.settings["comparison_mode"] == "phonetic")
+            alignment = comparison.alignment
+            score = comparison.score
             
-            self.highlight_differences(written_text, text)
+            runs = [(f"Texte prononcé: {text}\n\n", ""), ("Comparaison:\n", "")]
+            word_runs = self.word_runs(comparison)
+            self.word_spans = self.timed_word_spans(alignment, result.words, sum(len(t) for t, _ in runs),
+                                                    word_runs)
+            self.word_starts = [span[0] for span in self.word_spans]
+            runs += self.highlight_differences(alignment, word_runs)
+            runs.append((f"\n\nScore de similarité: {score}%", ""))
+            runs.append((f"\nTaux d'erreur sur les mots (WER): {alignment.wer:.0%}"
+                         f" - sur les caractères (CER): {alignment.cer:.0%}", ""))
+            if comparison.phonetic is not None:
+                near = sum(1 for run in word_runs if run[1] == "near")
+                runs.append((f"\nTaux d'erreur phonétique: {comparison.phonetic.error_rate:.0%}"
+                             f" - {near} mot(s) presque correct(s)", ""))
             
-            similarity = SequenceMatcher(None, written_text.lower(), text.lower()).ratio()
-            score = int(similarity * 100)
+            self.render_results(runs)
             
-            self.result_area.insert(tk.END, f"\n\nScore de similarité: {score}%")
+            if self.audio_file:
+                self.analyze_acoustics(self.audio_file, text)
+                self.library.set_result(self.audio_file, text, score)
             
             self.status_var.set(f"Comparaison terminée. Score: {score}%")
             
-        except sr.UnknownValueError:
-            messagebox.showerror("Erreur", "Impossible de comprendre l'audio")
-            self.status_var.set("Erreur: Audio incompréhensible")
-        except sr.RequestError as e:
-            messagebox.showerror("Erreur", f"Erreur de service de reconnaissance vocale; {e}")
-            self.status_var.set("Erreur de service")
         except Exception as e:
             messagebox.showerror("Erreur", f"Une erreur s'est produite: {e}")
             self.status_var.set("Erreur lors de la comparaison")
             
-    def highlight_differences(self, written_text, spoken_text):
-        """Met en évidence les différences entre les textes"""
+    def analyze_acoustics(self, path, transcript):
+        """Analyse la prise dans un thread; le résultat s'ajoute sous la comparaison"""
+        request = self.acoustics_request = object()
+        self.use_file(path)
+        
+        def worker():
+            try:
+                lines = analyze_recording(path, transcript).describe()
+            except (OSError, ValueError) as e:
+                print(f"Analyse acoustique impossible: {e}")
+                lines = None
+            self.post_event("acoustics_ready", request=request, path=path, lines=lines)
+            
+        threading.Thread(target=worker, daemon=True).start()
+        
+    def on_acoustics_ready_event(self, request, path, lines):
+        """Ajoute l'analyse acoustique si sa comparaison est toujours affichée"""
+        if path is not None:
+            self.on_file_released_event(path)
+        if lines is None or request is not self.acoustics_request or self.result_area is None:
+            return
+        if self.render_job is not None:
+            # La comparaison est encore en cours d'affichage: l'analyse vient après
+            self.root.after(EVENT_POLL_MS, lambda: self.on_acoustics_ready_event(request, None, lines))
+            return
+        self.acoustics_request = None
+        self.result_area.insert(tk.END, "\n\nAnalyse acoustique:\n" + "\n".join(lines))
+        
+    def render_results(self, runs):
+        """Affiche des segments (texte, tag) dans result_area par insertions groupées
+
+        Les segments de même tag sont fusionnés et insérés par lots de
+        RENDER_CHUNK_RUNS en un seul appel Tk; au-delà du premier lot, la
+        suite est ajoutée progressivement sans bloquer l'interface.
+        """
+        if self.render_job is not None:
+            self.root.after_cancel(self.render_job)
+            self.render_job = None
+        self.acoustics_request = None
+        self.result_area.delete(1.0, tk.END)
+        self.insert_runs(coalesce_runs(runs), 0)
+        
+    def insert_runs(self, runs, start):
+        """Insère un lot de segments puis programme le lot suivant"""
+        self.render_job = None
+        chunk = runs[start:start + RENDER_CHUNK_RUNS]
+        if not chunk:
+            return
+        args = []
+        for text, tag in chunk:
+            args.extend((text, tag))
+        self.result_area.insert(tk.END, *args)
+        if start + RENDER_CHUNK_RUNS < len(runs):
+            self.render_job = self.root.after(1, lambda: self.insert_runs(runs, start + RENDER_CHUNK_RUNS))
+            
+    def word_runs(self, comparison):
+        """Segments (texte, tag) des mots de la référence
+
+        En mode phonétique, un mot mal reconnu est suivi du mot entendu et de
+        sa distance phonétique; il est marqué presque correct (« near ») si
+        elle ne dépasse pas NEAR_MISS_DISTANCE.
+        """
+        alignment, phonetic = comparison.alignment, comparison.phonetic
+        runs = []
+        for index, op in enumerate(alignment.ops):
+            if op.ref is None:
+                continue
+            text = alignment.ref_words[op.ref_index]
+            tag = "correct" if op.op == EQUAL else "incorrect"
+            if phonetic is not None and op.op == SUBSTITUTE:
+                distance = phonetic.distances[index]
+                text += f" ({alignment.hyp_words[op.hyp_index]}, {distance:.2f})"
+                if distance <= NEAR_MISS_DISTANCE:
+                    tag = "near"
+            runs.append((text + " ", tag))
+        return runs
+        
+    def timed_word_spans(self, alignment, words, offset, word_runs):
+        """Associe aux mots de la référence le moment où le mot aligné a été prononcé
+
+        offset est la position (en caractères) du premier mot dans result_area
+        et word_runs les segments affichés pour chaque mot (word_runs()).
+        Un mot reconnu développé en plusieurs mots comparés (« 21 » en
+        « vingt et un ») donne son temps à chacun d'eux.
+        Retourne [(début, fin, premier caractère, dernier caractère), ...] trié.
+        """
+        hyp_words = []
+        for word in words:
+            hyp_words.extend([word] * len(split_words(word.word)[1]))
+        timed = len(hyp_words) == len(alignment.hyp)
+        spans = []
+        ref_ops = [op for op in alignment.ops if op.ref is not None]
+        for op, (text, _) in zip(ref_ops, word_runs):
+            if timed and op.hyp_index is not None:
+                word = hyp_words[op.hyp_index]
+                if word.start is not None and word.end is not None:
+                    spans.append((word.start, word.end, offset, offset + len(text) - 1))
+            offset += len(text)
+        return sorted(spans)
+        
+    def highlight_differences(self, alignment, word_runs):
+        """Retourne les segments (texte, tag) mettant en évidence les différences"""
         if self.settings["theme"] == "light" or (self.settings["theme"] == "auto" and 6 <= datetime.now().hour < 20):
             self.result_area.tag_configure("correct", foreground="green", font=("Arial", 11, "bold"))
             self.result_area.tag_configure("incorrect", foreground="red", font=("Arial", 11, "bold"))
+            self.result_area.tag_configure("near", foreground="#d35400", font=("Arial", 11, "bold"))
             self.result_area.tag_configure("missing", foreground="blue", font=("Arial", 11, "italic"))
+            self.result_area.tag_configure("playing", background="#ffe599")
         else:
             self.result_area.tag_configure("correct", foreground="#00ff00", font=("Arial", 11, "bold"))
             self.result_area.tag_configure("incorrect", foreground="#ff6666", font=("Arial", 11, "bold"))
+            self.result_area.tag_configure("near", foreground="#ffb347", font=("Arial", 11, "bold"))
             self.result_area.tag_configure("missing", foreground="#66b3ff", font=("Arial", 11, "italic"))
+            self.result_area.tag_configure("playing", background="#6b5b00")
         
-        written_words = written_text.lower().split()
-        spoken_words = spoken_text.lower().split()
-        
-        for word in written_words:
-            if word in spoken_words:
-                self.result_area.insert(tk.END, word + " ", "correct")
-                spoken_words.remove(word)
-            else:
-                self.result_area.insert(tk.END, word + " ", "incorrect")
+        runs = list(word_runs)
                 
+        spoken_words = alignment.extra_words()
         if spoken_words:
-            self.result_area.insert(tk.END, "\n\nMots supplémentaires détectés: ", "missing")
-            for word in spoken_words:
-                self.result_area.insert(tk.END, word + " ", "missing")
+            runs.append(("\n\nMots supplémentaires détectés: ", "missing"))
+            runs.extend((word + " ", "missing") for word in spoken_words)
+        return runs
 
     def load_settings(self):
-        """Charge les paramètres ou crée le fichier s'il n'existe pas"""
-        default_settings = {
-            "theme": "light",
-            "audio_dir": os.path.join(os.path.expanduser("~"), "Documents", "AudioRecordings"),
-            "app_mode": "comparison",
-            "selected_mic": 0,
-            "visualizer_size": "small"
-        }
-        
+        """Charge les paramètres (valeurs par défaut complétées, ancien format migré)"""
         self.settings_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.json")
-        
+        self.settings_store = SettingsStore(self.settings_file)
+        self.settings = self.settings_store.data
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    self.settings = json.load(f)
-            else:
-                self.settings = default_settings
-                os.makedirs(self.settings["audio_dir"], exist_ok=True)
-                self.save_settings()
-        except Exception as e:
-            print(f"Erreur lors du chargement des paramètres: {e}")
-            self.settings = default_settings
+            os.makedirs(self.settings["audio_dir"], exist_ok=True)
+        except OSError as e:
+            print(f"Dossier d'enregistrement inaccessible: {e}")
             
     def save_settings(self):
-        """Sauvegarde les paramètres dans un fichier JSON"""
-        try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=4)
-        except Exception as e:
-            print(f"Erreur lors de la sauvegarde des paramètres: {e}")
+        """Programme la sauvegarde des paramètres (écrite en arrière-plan)"""
+        self.settings_store.save()
             
     def apply_theme(self):
         """Applique le thème selon les paramètres"""
@@ -324,35 +958,98 @@ class SpeechComparisonApp:
         self.root.config(menu=menubar)
         
     def switch_to_mode(self, mode):
-        """Change le mode de l'application"""
-        self.settings["app_mode"] = mode
-        self.save_settings()
-        
-        self.clear_interface()
+        """Affiche la vue d'un mode; elle n'est construite qu'au premier affichage"""
+        if self.settings["app_mode"] != mode:
+            self.settings["app_mode"] = mode
+            self.save_settings()
+        
+        self.hide_current_view()
+        
+        view = self.views.get(mode)
+        if view is None:
+            for name in VIEW_WIDGETS:
+                setattr(self, name, None)
+            if mode == "comparison":
+                self.create_comparison_interface()
+                frame = self.comparison_frame
+            else:
+                self.create_recording_interface()
+                frame = self.recording_frame
+            view = self.views[mode] = {name: getattr(self, name) for name in VIEW_WIDGETS}
+            view["frame"] = frame
+        else:
+            for name in VIEW_WIDGETS:
+                setattr(self, name, view[name])
+            view["frame"].pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+            if mode == "recording":
+                self.refresh_recordings_list()
+                self.scan_recordings()
+        self.current_view = mode
         
-        if mode == "comparison":
-            self.create_comparison_interface()
-        elif mode == "recording":
-            self.create_recording_interface()
-            
-    def clear_interface(self):
-        """Efface l'interface actuelle"""
-        for widget in self.root.winfo_children():
-            if isinstance(widget, tk.Menu):
-                continue
-            widget.destroy()
+        # La prise en cours continue d'une vue à l'autre
+        if self.recording:
+            self.record_button.config(text="Arrêter l'enregistrement")
+            self.start_meter()
+        else:
+            self.record_button.config(text="Commencer l'enregistrement")
             
+    def hide_current_view(self):
+        """Masque la vue affichée en arrêtant ses animations et la lecture"""
+        if self.current_view is None:
+            return
+        self.stop_meter()
+        self.playback.stop()
+        if self.play_button is not None:
+            self.play_button.config(text="▶ Écouter")
+        if self.current_view == "settings":
+            # La page des paramètres est reconstruite à chaque ouverture
+            self.monitoring = False
+            if self.meter is not None:
+                self.meter.destroy()
+            self.settings_frame.destroy()
+            self.settings_frame = None
+        else:
+            self.views[self.current_view]["frame"].pack_forget()
+        self.current_view = None
+        
+    def destroy_views(self):
+        """Détruit les vues des modes (changement de thème ou de visualisation)"""
+        if self.recognition_job is not None:
+            self.recognition_job.cancel()
+            self.recognition_job = None
+        self.compare_waiting = False
+        self.acoustics_request = None
+        if self.render_job is not None:
+            self.root.after_cancel(self.render_job)
+            self.render_job = None
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+            self.search_job = None
+        for view in self.views.values():
+            if view["meter"] is not None:
+                view["meter"].destroy()
+            view["frame"].destroy()
+        self.views.clear()
         self.comparison_frame = None
         self.recording_frame = None
-        self.settings_frame = None
+        self.filename_var = None
+        self.word_spans = []
+        self.word_starts = []
         
     def open_settings(self):
         """Ouvre la page des paramètres"""
+        if self.current_view == "settings":
+            return
         previous_mode = self.settings["app_mode"]
         
-        self.clear_interface()
+        self.hide_current_view()
+        # Les widgets de la vue masquée restent rattachés: une prise en cours
+        # peut se terminer (arrêt automatique) pendant que les paramètres sont
+        # ouverts. Seul l'indicateur de niveau est celui de la page.
+        self.meter = None
         
         self.create_settings_interface(previous_mode)
+        self.current_view = "settings"
 
     def create_settings_interface(self, previous_mode):
         """Crée l'interface des paramètres"""
@@ -416,23 +1113,14 @@ class SpeechComparisonApp:
         
         ttk.Label(mic_select_frame, text="Sélectionner un microphone:").pack(anchor=tk.W, padx=5, pady=5)
         
-        p = pyaudio.PyAudio()
-        self.mic_devices = [(i, p.get_device_info_by_index(i)['name']) 
-                           for i in range(p.get_device_count()) 
-                           if p.get_device_info_by_index(i).get('maxInputChannels') > 0]
-        p.terminate()
-        
         self.mic_var = tk.StringVar()
-        if self.mic_devices:
-            selected_index = self.settings["selected_mic"]
-            if 0 <= selected_index < len(self.mic_devices):
-                self.mic_var.set(self.mic_devices[selected_index][1])
-            else:
-                self.mic_var.set(self.mic_devices[0][1])
+        self.mic_dropdown = ttk.Combobox(mic_select_frame, textvariable=self.mic_var, state="readonly")
+        self.mic_dropdown.pack(anchor=tk.W, padx=5, pady=5, fill=tk.X)
+        self.mic_choices = []
+        self.update_mic_choices(self.settings.get("selected_mic_id"))
         
-        mic_dropdown = ttk.Combobox(mic_select_frame, textvariable=self.mic_var, state="readonly")
-        mic_dropdown['values'] = [device[1] for device in self.mic_devices]
-        mic_dropdown.pack(anchor=tk.W, padx=5, pady=5, fill=tk.X)
+        ttk.Button(mic_select_frame, text="Actualiser la liste",
+                   command=lambda: self.devices.refresh(reinitialize=True)).pack(anchor=tk.W, padx=5, pady=5)
         
         visualizer_frame = ttk.LabelFrame(audio_tab, text="Taille de la visualisation audio")
         visualizer_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -446,27 +1134,121 @@ class SpeechComparisonApp:
         ttk.Radiobutton(visualizer_frame, text="Grande", variable=self.visualizer_var, 
                        value="large").pack(anchor=tk.W, padx=20, pady=5)
         
+        ttk.Label(visualizer_frame, text="Rendu:").pack(anchor=tk.W, padx=20, pady=(10, 0))
+        
+        self.renderer_var = tk.StringVar(value=self.settings.get("visualizer_renderer", "canvas"))
+        
+        ttk.Radiobutton(visualizer_frame, text="Canvas Tk (léger)", variable=self.renderer_var, 
+                       value="canvas").pack(anchor=tk.W, padx=20, pady=5)
+        ttk.Radiobutton(visualizer_frame, text="Matplotlib (blitting)", variable=self.renderer_var, 
+                       value="matplotlib").pack(anchor=tk.W, padx=20, pady=5)
+        
+        format_frame = ttk.LabelFrame(audio_tab, text="Format des enregistrements")
+        format_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        self.storage_rate_var = tk.IntVar(value=self.settings.get("storage_sample_rate", DEFAULT_STORAGE_RATE))
+        
+        ttk.Radiobutton(format_frame, text="16 kHz (recommandé pour la reconnaissance)", 
+                       variable=self.storage_rate_var, value=16000).pack(anchor=tk.W, padx=20, pady=5)
+        ttk.Radiobutton(format_frame, text="44,1 kHz", variable=self.storage_rate_var, 
+                       value=44100).pack(anchor=tk.W, padx=20, pady=5)
+        ttk.Radiobutton(format_frame, text="Fréquence native du microphone", variable=self.storage_rate_var, 
+                       value=0).pack(anchor=tk.W, padx=20, pady=5)
+        
+        ttk.Label(format_frame, text="Compression:").pack(anchor=tk.W, padx=20, pady=(10, 0))
+        
+        self.storage_format_var = tk.StringVar(value=self.settings.get("storage_format", "wav"))
+        
+        ttk.Radiobutton(format_frame, text="WAV (non compressé)", variable=self.storage_format_var, 
+                       value="wav").pack(anchor=tk.W, padx=20, pady=5)
+        ttk.Radiobutton(format_frame, text="FLAC (sans perte)", variable=self.storage_format_var, 
+                       value="flac").pack(anchor=tk.W, padx=20, pady=5)
+        ttk.Radiobutton(format_frame, text="Opus (très compact)", variable=self.storage_format_var, 
+                       value="opus").pack(anchor=tk.W, padx=20, pady=5)
+        
+        self.flac_archive_var = tk.BooleanVar(value=self.settings.get("flac_archive", False))
+        ttk.Checkbutton(format_frame, text="Archiver une copie FLAC à la fréquence native", 
+                       variable=self.flac_archive_var).pack(anchor=tk.W, padx=20, pady=5)
+        
+        stop_frame = ttk.LabelFrame(audio_tab, text="Arrêt automatique")
+        stop_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        duration_row = ttk.Frame(stop_frame)
+        duration_row.pack(fill=tk.X, padx=20, pady=5)
+        ttk.Label(duration_row, text="Durée maximale (s, 0 = illimitée):").pack(side=tk.LEFT)
+        self.duration_var = tk.IntVar(value=self.settings.get("max_recording_seconds", 0))
+        ttk.Spinbox(duration_row, from_=0, to=3600, increment=5, width=6,
+                    textvariable=self.duration_var).pack(side=tk.LEFT, padx=5)
+        
+        silence_row = ttk.Frame(stop_frame)
+        silence_row.pack(fill=tk.X, padx=20, pady=5)
+        ttk.Label(silence_row, text="Arrêt après un silence de (s, 0 = désactivé):").pack(side=tk.LEFT)
+        self.silence_stop_var = tk.DoubleVar(value=self.settings.get("auto_stop_silence", 0))
+        ttk.Spinbox(silence_row, from_=0, to=30, increment=0.5, width=6,
+                    textvariable=self.silence_stop_var).pack(side=tk.LEFT, padx=5)
+        
         test_frame = ttk.LabelFrame(audio_tab, text="Test du microphone")
         test_frame.pack(fill=tk.X, padx=10, pady=10)
         
-        fig_size = (4, 1)
-        self.fig = plt.Figure(figsize=fig_size, dpi=100)
-        self.ax = self.fig.add_subplot(1, 1, 1)
-        self.canvas = FigureCanvasTkAgg(self.fig, master=test_frame)
-        self.canvas.get_tk_widget().pack(padx=10, pady=5, fill=tk.X)
-        
-        self.line, = self.ax.plot([], [], lw=2)
-        self.ax.set_ylim(-1, 1)
-        self.ax.set_xlim(0, 100)
-        self.ax.set_title('Niveau audio')
-        self.ax.set_yticks([])
-        self.ax.set_xticks([])
-        self.fig.tight_layout()
+        self.create_meter(test_frame, height=100).widget.pack(padx=10, pady=5, fill=tk.X)
         
         test_mic_button = ttk.Button(test_frame, text="Tester le microphone", 
                                    command=self.test_microphone)
         test_mic_button.pack(pady=5)
         
+        recognition_tab = ttk.Frame(notebook)
+        notebook.add(recognition_tab, text="Reconnaissance")
+        
+        backend_frame = ttk.LabelFrame(recognition_tab, text="Moteur de reconnaissance vocale")
+        backend_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        self.backend_var = tk.StringVar(value=self.settings.get("recognition_backend", "google"))
+        
+        ttk.Radiobutton(backend_frame, text="Google (en ligne)", variable=self.backend_var, 
+                       value="google").pack(anchor=tk.W, padx=20, pady=5)
+        ttk.Radiobutton(backend_frame, text="Vosk (hors ligne)", variable=self.backend_var, 
+                       value="vosk").pack(anchor=tk.W, padx=20, pady=5)
+        
+        self.streaming_var = tk.BooleanVar(value=self.settings.get("streaming_transcription", True))
+        ttk.Checkbutton(backend_frame, text="Transcrire pendant l'enregistrement", 
+                       variable=self.streaming_var).pack(anchor=tk.W, padx=20, pady=5)
+        
+        self.trim_var = tk.BooleanVar(value=self.settings.get("trim_silence", True))
+        ttk.Checkbutton(backend_frame, text="Retirer le silence avant la reconnaissance", 
+                       variable=self.trim_var).pack(anchor=tk.W, padx=20, pady=5)
+        
+        comparison_mode_frame = ttk.LabelFrame(recognition_tab, text="Comparaison")
+        comparison_mode_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        self.comparison_mode_var = tk.StringVar(value=self.settings["comparison_mode"])
+        
+        ttk.Radiobutton(comparison_mode_frame, text="Orthographique (mot correct ou incorrect)",
+                       variable=self.comparison_mode_var, value="words").pack(anchor=tk.W, padx=20, pady=5)
+        ttk.Radiobutton(comparison_mode_frame, text="Phonétique (distance de prononciation de chaque mot)",
+                       variable=self.comparison_mode_var, value="phonetic").pack(anchor=tk.W, padx=20, pady=5)
+        
+        rate_frame = ttk.Frame(backend_frame)
+        rate_frame.pack(anchor=tk.W, padx=20, pady=5)
+        
+        ttk.Label(rate_frame, text="Fréquence transmise au moteur (Hz):").pack(side=tk.LEFT)
+        self.recognition_rate_var = tk.StringVar(
+            value=str(self.settings.get("recognition_sample_rate", DEFAULT_RECOGNITION_RATE)))
+        ttk.Combobox(rate_frame, textvariable=self.recognition_rate_var, state="readonly", width=8,
+                     values=[str(rate) for rate in RECOGNITION_RATES]).pack(side=tk.LEFT, padx=5)
+        
+        model_frame = ttk.LabelFrame(recognition_tab, text="Dossier du modèle Vosk")
+        model_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        model_entry_frame = ttk.Frame(model_frame)
+        model_entry_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.vosk_model_var = tk.StringVar(value=self.settings.get("vosk_model_path", ""))
+        model_entry = ttk.Entry(model_entry_frame, textvariable=self.vosk_model_var, width=50)
+        model_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        ttk.Button(model_entry_frame, text="Parcourir", 
+                  command=self.browse_vosk_model).pack(side=tk.LEFT, padx=5)
+        
         button_frame = ttk.Frame(self.settings_frame)
         button_frame.pack(pady=20)
         
@@ -489,25 +1271,61 @@ class SpeechComparisonApp:
         if folder:
             self.folder_var.set(folder)
             
+    def browse_vosk_model(self):
+        """Ouvre une boîte de dialogue pour sélectionner le modèle Vosk"""
+        folder = filedialog.askdirectory(initialdir=self.vosk_model_var.get() or None)
+        if folder:
+            self.vosk_model_var.set(folder)
+            
     def save_settings_and_return(self, previous_mode):
         """Sauvegarde les paramètres et retourne au mode précédent"""
+        look = (self.settings["theme"], self.settings["visualizer_size"], self.settings.get("visualizer_renderer"))
         self.settings["theme"] = self.theme_var.get()
         self.settings["app_mode"] = self.mode_var.get()
         self.settings["audio_dir"] = self.folder_var.get()
         self.settings["visualizer_size"] = self.visualizer_var.get()
+        self.settings["visualizer_renderer"] = self.renderer_var.get()
+        self.settings["recognition_backend"] = self.backend_var.get()
+        self.settings["vosk_model_path"] = self.vosk_model_var.get()
+        self.settings["streaming_transcription"] = self.streaming_var.get()
+        self.settings["storage_sample_rate"] = self.storage_rate_var.get()
+        self.settings["flac_archive"] = self.flac_archive_var.get()
+        self.settings["storage_format"] = self.storage_format_var.get()
+        self.settings["recognition_sample_rate"] = int(self.recognition_rate_var.get())
+        self.settings["trim_silence"] = self.trim_var.get()
+        self.settings["comparison_mode"] = self.comparison_mode_var.get()
+        try:
+            self.settings["max_recording_seconds"] = max(0, self.duration_var.get())
+            self.settings["auto_stop_silence"] = max(0.0, self.silence_stop_var.get())
+        except tk.TclError:
+            messagebox.showwarning("Avertissement", "Durées d'arrêt automatique invalides, valeurs précédentes conservées")
         
-        selected_name = self.mic_var.get()
-        for idx, device in enumerate(self.mic_devices):
-            if device[1] == selected_name:
-                self.settings["selected_mic"] = idx
-                break
+        choice = self.mic_choices[max(0, self.mic_dropdown.current())]
+        self.settings["selected_mic_id"] = choice.id if choice is not None else None
+        
+        previous_dir = self.library.audio_dir
         
         os.makedirs(self.settings["audio_dir"], exist_ok=True)
         
         self.save_settings()
         
+        if previous_dir != self.settings["audio_dir"]:
+            if self.recognition.cache is not None:
+                self.recognition.cache.close()
+            self.recognition.cache = self.open_transcription_cache()
+            self.library.close()
+            self.library = RecordingLibrary(self.settings["audio_dir"], os.path.dirname(self.settings_file))
+            self.recordings_offset = 0
+        self.recognition.backend = None
+        self.recognition.sample_rate = self.settings["recognition_sample_rate"]
+        self.recognition.trim = self.settings["trim_silence"]
+        self.recognition.warm_up()
+        
         self.apply_theme()
         self.update_style()
+        # Les vues gardent les couleurs et la taille de visualisation de leur construction
+        if look != (self.settings["theme"], self.settings["visualizer_size"], self.settings["visualizer_renderer"]):
+            self.destroy_views()
         
         self.switch_to_mode(previous_mode)
         
@@ -535,24 +1353,13 @@ class SpeechComparisonApp:
         mic_frame.pack(fill=tk.X, pady=10)
         
         if self.settings["visualizer_size"] == "small":
-            fig_size = (6, 1)
+            meter_height = 100
         elif self.settings["visualizer_size"] == "medium":
-            fig_size = (6, 1.5)
+            meter_height = 150
         else:  # large
-            fig_size = (6, 2)
+            meter_height = 200
             
-        self.fig = plt.Figure(figsize=fig_size, dpi=100)
-        self.ax = self.fig.add_subplot(1, 1, 1)
-        self.canvas = FigureCanvasTkAgg(self.fig, master=mic_frame)
-        self.canvas.get_tk_widget().pack(padx=10, pady=5, fill=tk.X)
-        
-        self.line, = self.ax.plot([], [], lw=2)
-        self.ax.set_ylim(-1, 1)
-        self.ax.set_xlim(0, 100)
-        self.ax.set_title('Niveau audio')
-        self.ax.set_yticks([])
-        self.ax.set_xticks([])
-        self.fig.tight_layout()
+        self.create_meter(mic_frame, meter_height).widget.pack(padx=10, pady=5, fill=tk.X)
         
         button_frame = ttk.Frame(main_frame, style="TFrame")
         button_frame.pack(pady=10)
@@ -565,12 +1372,19 @@ class SpeechComparisonApp:
                                        command=self.compare_text)
         self.compare_button.pack(side=tk.LEFT, padx=10)
         
+        self.create_playback_controls(main_frame).pack(fill=tk.X, pady=5)
+        
         result_frame = ttk.LabelFrame(main_frame, text="Résultat de la comparaison")
         result_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
         self.result_area = scrolledtext.ScrolledText(result_frame, wrap=tk.WORD, width=70, height=8,
                                                    font=("Arial", 11), bg=self.text_bg, fg=self.fg_color)
         self.result_area.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        # Un clic sur un mot de la référence joue le passage correspondant
+        for tag in ("correct", "near", "incorrect"):
+            self.result_area.tag_bind(tag, "<Button-1>", self.on_result_word_click)
+            self.result_area.tag_bind(tag, "<Enter>", lambda e: self.result_area.config(cursor="hand2"))
+            self.result_area.tag_bind(tag, "<Leave>", lambda e: self.result_area.config(cursor=""))
         
         self.status_var = tk.StringVar()
         self.status_var.set("Prêt")
@@ -597,24 +1411,13 @@ class SpeechComparisonApp:
         mic_frame.pack(fill=tk.X, expand=True, pady=10)
         
         if self.settings["visualizer_size"] == "small":
-            fig_size = (6, 1.5)
+            meter_height = 150
         elif self.settings["visualizer_size"] == "medium":
-            fig_size = (6, 2.5)
+            meter_height = 250
         else:  # large
-            fig_size = (6, 3.5)
+            meter_height = 350
             
-        self.fig = plt.Figure(figsize=fig_size, dpi=100)
-        self.ax = self.fig.add_subplot(1, 1, 1)
-        self.canvas = FigureCanvasTkAgg(self.fig, master=mic_frame)
-        self.canvas.get_tk_widget().pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
-        
-        self.line, = self.ax.plot([], [], lw=2)
-        self.ax.set_ylim(-1, 1)
-        self.ax.set_xlim(0, 100)
-        self.ax.set_title('Niveau audio')
-        self.ax.set_yticks([])
-        self.ax.set_xticks([])
-        self.fig.tight_layout()
+        self.create_meter(mic_frame, meter_height).widget.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
         
         button_frame = ttk.Frame(main_frame, style="TFrame")
         button_frame.pack(pady=20)
@@ -635,6 +1438,32 @@ class SpeechComparisonApp:
         recordings_frame = ttk.LabelFrame(main_frame, text="Enregistrements récents")
         recordings_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
+        search_frame = ttk.Frame(recordings_frame)
+        search_frame.pack(fill=tk.X, padx=10, pady=(10, 0))
+        
+        ttk.Label(search_frame, text="Rechercher:").pack(side=tk.LEFT, padx=5)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self.on_recordings_search)
+        ttk.Entry(search_frame, textvariable=self.search_var, width=25).pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        ttk.Label(search_frame, text="Trier par:").pack(side=tk.LEFT, padx=5)
+        self.sort_var = tk.StringVar(value="Date")
+        sort_combo = ttk.Combobox(search_frame, textvariable=self.sort_var, state="readonly", width=8,
+                                  values=list(RECORDINGS_SORT_LABELS))
+        sort_combo.pack(side=tk.LEFT, padx=5)
+        sort_combo.bind("<<ComboboxSelected>>", lambda e: self.change_recordings_page(None))
+        self.sort_desc_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(search_frame, text="Décroissant", variable=self.sort_desc_var,
+                        command=lambda: self.change_recordings_page(None)).pack(side=tk.LEFT, padx=5)
+        
+        pager_frame = ttk.Frame(recordings_frame)
+        pager_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 10))
+        
+        ttk.Button(pager_frame, text="◀", width=3, command=lambda: self.change_recordings_page(-1)).pack(side=tk.LEFT)
+        self.page_var = tk.StringVar()
+        ttk.Label(pager_frame, textvariable=self.page_var).pack(side=tk.LEFT, padx=10)
+        ttk.Button(pager_frame, text="▶", width=3, command=lambda: self.change_recordings_page(1)).pack(side=tk.LEFT)
+        
         self.recordings_listbox = tk.Listbox(recordings_frame, bg=self.text_bg, fg=self.fg_color,
                                           font=("Arial", 10), height=10)
         self.recordings_listbox.pack(side=tk.LEFT, padx=10, pady=10, fill=tk.BOTH, expand=True)
@@ -642,13 +1471,15 @@ class SpeechComparisonApp:
         scrollbar = ttk.Scrollbar(recordings_frame, orient=tk.VERTICAL, command=self.recordings_listbox.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
         self.recordings_listbox.config(yscrollcommand=scrollbar.set)
+        self.recordings_listbox.bind("<<ListboxSelect>>", self.on_recording_selected)
         
         rec_buttons_frame = ttk.Frame(main_frame)
         rec_buttons_frame.pack(fill=tk.X, pady=5)
         
-        ttk.Button(rec_buttons_frame, text="Écouter", command=self.play_recording).pack(side=tk.LEFT, padx=5)
+        self.create_playback_controls(rec_buttons_frame, self.play_recording).pack(side=tk.LEFT, fill=tk.X, expand=True)
         ttk.Button(rec_buttons_frame, text="Supprimer", command=self.delete_recording).pack(side=tk.LEFT, padx=5)
-        ttk.Button(rec_buttons_frame, text="Actualiser", command=self.refresh_recordings_list).pack(side=tk.LEFT, padx=5)
+        ttk.Button(rec_buttons_frame, text="Actualiser",
+                   command=lambda: self.scan_recordings(force=True)).pack(side=tk.LEFT, padx=5)
         
         self.status_var = tk.StringVar()
         self.status_var.set("Prêt")
@@ -658,73 +1489,284 @@ class SpeechComparisonApp:
         
         self.recording_frame = main_frame
         
+        # Affiche l'index connu tout de suite, puis le met à jour en arrière-plan
+        self.refresh_recordings_list()
+        self.scan_recordings()
+        
+    def scan_recordings(self, force=False):
+        """Met à jour l'index des enregistrements dans un thread"""
+        if self.library_scanning:
+            return
+        self.library_scanning = True
+        library = self.library
+        
+        def worker():
+            try:
+                changed = library.scan(force)
+            except (sqlite3.Error, OSError) as e:
+                print(f"Erreur lors de l'indexation des enregistrements: {e}")
+                changed = False
+            self.post_event("library_scanned", library=library, changed=changed or force)
+            
+        threading.Thread(target=worker, daemon=True).start()
+        
+    def on_library_scanned_event(self, library, changed):
+        """Affiche l'index mis à jour"""
+        self.library_scanning = False
+        if library is self.library and changed and self.recording_frame is not None:
+            self.refresh_recordings_list()
+            
+    def on_recordings_search(self, *args):
+        """Relance la recherche quand l'utilisateur a fini de taper"""
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(SEARCH_DELAY_MS, self.apply_recordings_search)
+        
+    def apply_recordings_search(self):
+        self.search_job = None
+        self.change_recordings_page(None)
+        
+    def change_recordings_page(self, step):
+        """Change de page, ou revient à la première page si step vaut None"""
+        if step is None:
+            self.recordings_offset = 0
+        else:
+            offset = self.recordings_offset + step * RECORDINGS_PAGE_SIZE
+            if offset < 0 or offset >= self.library.count(self.search_var.get().strip()):
+                return
+            self.recordings_offset = offset
         self.refresh_recordings_list()
         
     def refresh_recordings_list(self):
-        """Actualise la liste des enregistrements"""
+        """Affiche la page courante des enregistrements"""
+        search = self.search_var.get().strip()
+        total = self.library.count(search)
+        if self.recordings_offset >= total:
+            self.recordings_offset = max(0, (total - 1) // RECORDINGS_PAGE_SIZE * RECORDINGS_PAGE_SIZE)
+            
+        self.recordings_page = self.library.page(self.recordings_offset, RECORDINGS_PAGE_SIZE, search,
+                                                 RECORDINGS_SORT_LABELS[self.sort_var.get()],
+                                                 self.sort_desc_var.get())
+        
         self.recordings_listbox.delete(0, tk.END)
+        if self.recordings_page:
+            self.recordings_listbox.insert(tk.END, *[format_recording(e) for e in self.recordings_page])
+            
+        pages = max(1, -(-total // RECORDINGS_PAGE_SIZE))
+        self.page_var.set(f"Page {self.recordings_offset // RECORDINGS_PAGE_SIZE + 1}/{pages}"
+                          f" - {total} enregistrement(s)")
         
-        audio_dir = self.settings["audio_dir"]
-        if not os.path.exists(audio_dir):
+    def selected_recording(self):
+        """Retourne l'entrée sélectionnée dans la liste, ou None"""
+        selection = self.recordings_listbox.curselection()
+        if not selection:
+            messagebox.showinfo("Information", "Veuillez sélectionner un enregistrement")
+            return None
+        return self.recordings_page[selection[0]]
+        
+    def create_playback_controls(self, master, command=None):
+        """Crée le bouton de lecture, la barre de position et la durée"""
+        frame = ttk.Frame(master)
+        self.play_button = ttk.Button(frame, text="▶ Écouter", command=command or self.toggle_playback)
+        self.play_button.pack(side=tk.LEFT, padx=5)
+        
+        self.seek_var = tk.DoubleVar(value=0.0)
+        self.seek_scale = ttk.Scale(frame, from_=0.0, to=1.0, variable=self.seek_var, orient=tk.HORIZONTAL)
+        self.seek_scale.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        # La position n'est appliquée qu'au relâchement, pour ne pas saccader la lecture
+        self.seek_scale.bind("<ButtonPress-1>", lambda e: setattr(self, "seeking", True))
+        self.seek_scale.bind("<ButtonRelease-1>", self.on_seek_released)
+        
+        self.playback_time_var = tk.StringVar(value="0.0 s")
+        ttk.Label(frame, textvariable=self.playback_time_var, width=14).pack(side=tk.LEFT, padx=5)
+        return frame
+        
+    def load_playback(self, filepath):
+        """Charge un enregistrement dans le moteur de lecture et règle la barre de position"""
+        duration = self.playback.load(filepath)
+        if self.seek_scale is not None:
+            self.seek_scale.config(to=max(duration, 0.01))
+            self.seek_var.set(self.playback.position)
+            self.playback_time_var.set(f"{self.playback.position:.1f} / {duration:.1f} s")
+        return duration
+        
+    def toggle_playback(self, filepath=None, start=None, stop=None):
+        """Lit un enregistrement (par défaut le dernier enregistré), ou met la lecture en pause"""
+        filepath = filepath or self.audio_file
+        if filepath is None:
+            messagebox.showwarning("Attention", "Aucun audio enregistré.")
             return
+        if filepath == self.playback.path and self.playback.state == PLAYING and start is None:
+            self.playback.pause()
+            return
+        try:
+            self.load_playback(filepath)
+            self.playback.play(start, stop)
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Lecture impossible: {e}")
             
-        files = [f for f in os.listdir(audio_dir) if f.endswith('.wav')]
-        files.sort(key=lambda x: os.path.getmtime(os.path.join(audio_dir, x)), reverse=True)
-        
-        for file in files:
-            self.recordings_listbox.insert(tk.END, file)
+    def on_seek_released(self, event):
+        """Applique la position choisie sur la barre de lecture"""
+        self.seeking = False
+        if self.playback.path is not None:
+            self.playback.seek(self.seek_var.get())
+            
+    def on_playback_position_event(self, position):
+        """Suit la position de lecture: barre, durée et mot prononcé"""
+        if self.seek_scale is not None and not self.seeking:
+            self.seek_var.set(position)
+            self.playback_time_var.set(f"{position:.1f} / {self.playback.duration:.1f} s")
+        self.highlight_playing_word(position)
+        
+    def on_playback_state_event(self, state):
+        """Met à jour le bouton de lecture"""
+        if self.play_button is not None:
+            self.play_button.config(text="⏸ Pause" if state == PLAYING else "▶ Écouter")
+        if state == STOPPED:
+            self.highlight_playing_word(None)
             
+    def highlight_playing_word(self, position):
+        """Surligne dans result_area le mot de la référence en cours de lecture"""
+        if self.current_view != "comparison" or not self.word_spans:
+            return
+        self.result_area.tag_remove("playing", 1.0, tk.END)
+        if position is None:
+            return
+        i = bisect_right(self.word_starts, position) - 1
+        if i >= 0 and position < self.word_spans[i][1]:
+            _, _, first, last = self.word_spans[i]
+            self.result_area.tag_add("playing", f"1.0 + {first} chars", f"1.0 + {last} chars")
+            self.result_area.tag_raise("playing")
+            
+    def on_result_word_click(self, event):
+        """Joue le passage de l'enregistrement où le mot cliqué a été prononcé"""
+        if not self.word_spans or self.audio_file is None:
+            return
+        index = self.result_area.index(f"@{event.x},{event.y}")
+        offset = (self.result_area.count("1.0", index, "chars") or (0,))[0]
+        for start, end, first, last in self.word_spans:
+            if first <= offset < last:
+                self.toggle_playback(self.audio_file, max(0.0, start - WORD_PLAY_PADDING),
+                                     end + WORD_PLAY_PADDING)
+                return
+                
     def play_recording(self):
         """Joue l'enregistrement sélectionné"""
-        selection = self.recordings_listbox.curselection()
-        if not selection:
-            messagebox.showinfo("Information", "Veuillez sélectionner un enregistrement")
+        entry = self.selected_recording()
+        if entry is None:
             return
             
-        filename = self.recordings_listbox.get(selection[0])
-        filepath = os.path.join(self.settings["audio_dir"], filename)
+        self.toggle_playback(os.path.join(self.settings["audio_dir"], entry.name))
         
-        if sys.platform == "win32":
-            os.startfile(filepath)
-        elif sys.platform == "darwin":  # macOS
-            subprocess.call(["open", filepath])
-        else:  # linux
-            subprocess.call(["xdg-open", filepath])
+    def on_recording_selected(self, event):
+        """Prépare la lecture de l'enregistrement sélectionné pour qu'elle démarre sans délai"""
+        selection = self.recordings_listbox.curselection()
+        if not selection or self.recording:
+            return
+        filepath = os.path.join(self.settings["audio_dir"], self.recordings_page[selection[0]].name)
+        try:
+            self.load_playback(filepath)
+        except Exception as e:
+            print(f"Impossible de préparer la lecture de {filepath}: {e}")
             
+
     def delete_recording(self):
         """Supprime l'enregistrement sélectionné"""
-        selection = self.recordings_listbox.curselection()
-        if not selection:
-            messagebox.showinfo("Information", "Veuillez sélectionner un enregistrement")
+        entry = self.selected_recording()
+        if entry is None:
             return
             
-        filename = self.recordings_listbox.get(selection[0])
+        filename = entry.name
         filepath = os.path.join(self.settings["audio_dir"], filename)
         
         if messagebox.askyesno("Confirmation", f"Voulez-vous vraiment supprimer {filename} ?"):
             try:
+                if self.playback.path == filepath:
+                    # Le fichier projeté en mémoire ne peut pas être supprimé sous Windows
+                    self.playback.close()
                 os.remove(filepath)
+                if self.recognition.cache is not None:
+                    self.recognition.cache.invalidate_path(filepath)
+                self.library.remove(filepath)
                 self.refresh_recordings_list()
                 self.status_var.set(f"Fichier {filename} supprimé")
             except Exception as e:
                 messagebox.showerror("Erreur", f"Impossible de supprimer le fichier: {e}")
                 
-    def start_recording(self):
-        if not self.recording:
-            self.recording = True
-            self.record_button.config(text="Arrêter l'enregistrement")
-            self.audio_data = []
-            
-            self.ani = animation.FuncAnimation(
-                self.fig, self.update_audio_plot, interval=30, blit=True, cache_frame_data=False)
-            self.canvas.draw()
+def main(argv=None):
+    """Point d'entrée: interface graphique, ou traitement par lots sans interface"""
+    parser = argparse.ArgumentParser(description="Application de comparaison de parole")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    batch_parser = subparsers.add_parser("batch", help="Évalue un manifeste d'enregistrements sans interface graphique")
+    batch_parser.add_argument("manifest", help="Fichier JSONL (audio, reference) ou TSV audio<TAB>référence")
+    batch_parser.add_argument("-o", "--output", help="Fichier JSONL de sortie (sortie standard par défaut)")
+    batch_parser.add_argument("-j", "--workers", type=int, help="Nombre de workers (nombre de cœurs par défaut)")
+    batch_parser.add_argument("--backend", default="google", choices=["google", "vosk"])
+    batch_parser.add_argument("--language", default="fr-FR")
+    batch_parser.add_argument("--vosk-model", default="", help="Dossier du modèle Vosk")
+    batch_parser.add_argument("--threads", action="store_true",
+                              help="Utilise des threads plutôt que des processus (moteurs en ligne)")
+    batch_parser.add_argument("--cache", help="Base SQLite du cache des transcriptions à utiliser")
+    batch_parser.add_argument("--references", help="Base SQLite des textes de référence préparés à utiliser")
+    batch_parser.add_argument("--phonetic", action="store_true",
+                              help="Ajoute la distance phonétique de chaque mot et le taux d'erreur phonétique")
+    
+    migrate_parser = subparsers.add_parser("migrate", help="Compresse les enregistrements WAV existants d'un dossier")
+    migrate_parser.add_argument("audio_dir", help="Dossier des enregistrements")
+    migrate_parser.add_argument("--format", default="flac", choices=["flac", "opus"])
+    migrate_parser.add_argument("--keep", action="store_true", help="Conserve les fichiers WAV d'origine")
+    migrate_parser.add_argument("-j", "--workers", type=int, help="Nombre d'encodeurs en parallèle")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Affiche la durée des étapes du démarrage jusqu'à la première fenêtre")
+    parser.add_argument("--stress-views", type=int, metavar="N",
+                        help="Change N fois de vue puis vérifie que la mémoire est restée stable")
+    
+    args = parser.parse_args(argv)
+    
+    if args.command == "batch":
+        options = {"model_path": args.vosk_model} if args.backend == "vosk" else {}
+        total, failures = run_batch(args.manifest, args.output, args.workers, args.backend,
+                                    args.language, options, use_threads=args.threads,
+                                    cache_path=args.cache, references_path=args.references,
+                                    phonetic=args.phonetic)
+        print(f"{total} enregistrement(s) traité(s), {failures} échec(s)", file=sys.stderr)
+        return 1 if failures else 0
+    
+    if args.command == "migrate":
+        library = RecordingLibrary(args.audio_dir)
+        
+        def on_converted(source, target, error):
+            if error is not None:
+                print(f"Échec: {os.path.basename(source)}: {error}", file=sys.stderr)
+                return
+            print(f"{os.path.basename(source)} -> {os.path.basename(target)}")
+            if not args.keep:
+                library.rename(source, target)
             
-            threading.Thread(target=self.record_audio_to_file).start()
-        else:
-            self.recording = False
-            self.record_button.config(text="Commencer l'enregistrement")
-
-if __name__ == "__main__":
+        converted, failures = migrate_directory(args.audio_dir, args.format, args.keep,
+                                                args.workers, on_converted)
+        if args.keep:
+            library.scan(force=True)
+        library.close()
+        print(f"{converted} enregistrement(s) converti(s), {failures} échec(s)", file=sys.stderr)
+        return 1 if failures else 0
+    
+    stages = [("Imports", IMPORTS_DONE)]
     root = tk.Tk()
+    stages.append(("Initialisation de Tk", time.perf_counter()))
     app = SpeechComparisonApp(root)
+    stages.append(("Construction de l'interface", time.perf_counter()))
+    if args.profile_startup:
+        root.update()
+        stages.append(("Première fenêtre affichée", time.perf_counter()))
+        report_startup(stages)
+    if args.stress_views:
+        return stress_views(root, app, args.stress_views)
     root.mainloop()
+    # Dernières modifications des paramètres écrites avant de quitter
+    app.settings_store.flush()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+from alignment import EQUAL, SUBSTITUTE, DELETE
+
+# Distance par mot en dessous de laquelle une substitution est un quasi-succès
+NEAR_MISS_DISTANCE = 0.35
+# Mots transcrits gardés en cache (par processus)
+G2P_CACHE_SIZE = 65536
+
+PhoneticScore = namedtuple("PhoneticScore", "distances error_rate")
+
+VOWELS = frozenset(("a", "e", "ɛ", "i", "o", "ɔ", "u", "y", "ø", "œ", "ə", "ɑ̃", "ɛ̃", "ɔ̃", "œ̃"))
+
+# Paires de phonèmes voisins et coût de leur confusion (1 pour deux phonèmes sans rapport)
+_CLOSE_PAIRS = {
+    0.2: (("e", "ɛ"), ("o", "ɔ"), ("ø", "œ"), ("ø", "ə"), ("œ", "ə"), ("ɛ̃", "œ̃")),
+    0.3: (("i", "j"), ("u", "w"), ("y", "ɥ")),
+    0.4: (("p", "b"), ("t", "d"), ("k", "g"), ("f", "v"), ("s", "z"), ("ʃ", "ʒ"), ("m", "n"), ("n", "ɲ"),
+          ("ɑ̃", "ɔ̃"), ("ɑ̃", "ɛ̃"), ("s", "ʃ"), ("z", "ʒ")),
+    0.5: (("a", "ɑ̃"), ("ɔ", "ɔ̃"), ("o", "ɔ̃"), ("ɛ", "ɛ̃"), ("œ", "œ̃"), ("e", "ə"), ("i", "y"), ("y", "u")),
+}
+_PAIR_COST = {frozenset(pair): cost for cost, pairs in _CLOSE_PAIRS.items() for pair in pairs}
+VOWEL_COST = 0.7
+CONSONANT_COST = 0.8
+# Un e muet prononcé ou avalé est une erreur légère
+SCHWA_COST = 0.5
+
+# Mots fréquents que les règles ne transcrivent pas correctement
+EXCEPTIONS = {
+    "le": "l ə", "de": "d ə", "je": "ʒ ə", "me": "m ə", "te": "t ə", "se": "s ə", "ce": "s ə",
+    "ne": "n ə", "que": "k ə", "les": "l e", "des": "d e", "mes": "m e", "tes": "t e", "ses": "s e",
+    "ces": "s e", "et": "e", "est": "ɛ", "es": "ɛ", "un": "œ̃", "une": "y n", "à": "a", "y": "i",
+    "mer": "m ɛ ʁ", "fer": "f ɛ ʁ", "hier": "j ɛ ʁ", "cher": "ʃ ɛ ʁ", "ver": "v ɛ ʁ", "vers": "v ɛ ʁ",
+    "ville": "v i l", "mille": "m i l", "tranquille": "t ʁ ɑ̃ k i l", "femme": "f a m", "fils": "f i s",
+    "monsieur": "m ə s j ø", "messieurs": "m e s j ø", "second": "s ə g ɔ̃", "seconde": "s ə g ɔ̃ d",
+    "sept": "s ɛ t", "huit": "ɥ i t", "six": "s i s", "dix": "d i s", "plus": "p l y", "os": "ɔ s",
+    "fille": "f i j", "eu": "y", "eus": "y", "eut": "y", "oignon": "ɔ ɲ ɔ̃", "pays": "p e i",
+    "cet": "s ɛ t", "aiment": "ɛ m",
+    # Noms, adjectifs et adverbes en -ent, que la règle des verbes rendrait muet
+    "souvent": "s u v ɑ̃", "parent": "p a ʁ ɑ̃", "content": "k ɔ̃ t ɑ̃", "argent": "a ʁ ʒ ɑ̃",
+    "accident": "a k s i d ɑ̃", "président": "p ʁ e z i d ɑ̃", "talent": "t a l ɑ̃", "urgent": "y ʁ ʒ ɑ̃",
+    "différent": "d i f e ʁ ɑ̃", "évident": "e v i d ɑ̃", "absent": "a b s ɑ̃", "présent": "p ʁ e z ɑ̃",
+    "récent": "ʁ e s ɑ̃", "excellent": "ɛ k s ɛ l ɑ̃", "intelligent": "ɛ̃ t ɛ l i ʒ ɑ̃", "agent": "a ʒ ɑ̃",
+    "prudent": "p ʁ y d ɑ̃", "violent": "v j ɔ l ɑ̃", "innocent": "i n ɔ s ɑ̃",
+}
+
+_V = "aàâäeéèêëiîïoôöuùûüyœ"
+_C = "bcçdfghjklmnpqrstvwxz"
+# Règles essayées dans l'ordre à chaque position: (graphème avec contexte, phonèmes);
+# None: la lettre se prononce telle quelle
+_RULES = [(re.compile(pattern), tuple(phonemes.split()) if phonemes is not None else None)
+          for pattern, phonemes in (
+    (r"(?<=\w\w)er$", "e"),
+    (r"e[zd]$", "e"),
+    (r"et$", "ɛ"),
+    # Terminaison verbale -ent muette (parlent, jouent) après au moins une
+    # syllabe; -ment (moment, lentement) et les monosyllabes (vent) gardent ɑ̃
+    (rf"(?:(?<=[{_V}][{_C}])|(?<=[{_V}][{_C}]{{2}})|(?<=[{_V}]u))(?<!m)ent$", ""),
+    (r"es$", ""),
+    (r"e$", ""),
+    (r"[stdxzpg]+$", ""),
+    (r"eau", "o"),
+    (r"au", "o"),
+    (rf"(?:ain|aim|ein)(?![{_V}nm])", "ɛ̃"),
+    (r"aill", "a j"),
+    (r"ail$", "a j"),
+    (r"eill?", "ɛ j"),
+    (r"ai|ei|ay", "ɛ"),
+    (rf"oin(?![{_V}n])", "w ɛ̃"),
+    (r"oy", "w a j"),
+    (r"oi", "w a"),
+    (r"ouill?", "u j"),
+    (r"o[uùû]", "u"),
+    (r"(?:œ|e)uill?", "œ j"),
+    (r"œu|eu|œ", "ø"),
+    (rf"ien(?![{_V}nm])", "j ɛ̃"),
+    (rf"[ae][nm](?![{_V}nmh])", "ɑ̃"),
+    (rf"[iy][nm](?![{_V}nmh])", "ɛ̃"),
+    (rf"o[nm](?![{_V}nmh])", "ɔ̃"),
+    (rf"u[nm](?![{_V}nmh])", "œ̃"),
+    (rf"(?<=[{_C}])ill", "i j"),
+    (r"ui", "ɥ i"),
+    (r"(?<!s)tion", "s j ɔ̃"),
+    (r"tion", "t j ɔ̃"),
+    (r"s?ch", "ʃ"),
+    (r"ph", "f"),
+    (r"th", "t"),
+    (r"gn", "ɲ"),
+    (r"qu", "k"),
+    (r"gu(?=[eéèêiy])", "g"),
+    (r"ge(?=[aoâôu])", "ʒ"),
+    (r"g(?=[eéèêiïy])", "ʒ"),
+    (r"cc(?=[eéèêiy])", "k s"),
+    (r"sc(?=[eéèêiy])", "s"),
+    (r"c(?=[eéèêiïy])|ç", "s"),
+    (r"ck|c|q", "k"),
+    (r"x", "k s"),
+    (r"h", ""),
+    (r"j", "ʒ"),
+    (r"ll", "l"),
+    (r"rr?", "ʁ"),
+    (rf"(?<=[{_V}])s(?=[{_V}])", "z"),
+    (r"ss", "s"),
+    (r"é", "e"),
+    (r"[èêë]", "ɛ"),
+    (r"e(?=[cfklr]$|x)", "ɛ"),
+    (rf"e(?=[{_C}][{_C}])(?!(?:[bcdfgkpt][lr]|ch|ph|th|gn))", "ɛ"),
+    (r"e", "ə"),
+    (r"o(?=[stxzdp]*$)|ô", "o"),
+    (r"o", "ɔ"),
+    (r"[aàâä]", "a"),
+    (rf"i(?=[{_V}])", "j"),
+    (r"[iîïy]", "i"),
+    (r"ù", "u"),
+    (r"[uûü]", "y"),
+    (r"w", "w"),
+    (r"([bdfgkmnptvz])\1", None),
+    (r"[bdfgklmnptvsz]", None),
+)]
+
+_CLEAN = re.compile(rf"[^a-z{_V}ç]")
+
+
+@lru_cache(maxsize=G2P_CACHE_SIZE)
+def g2p(word):
+    """Transcrit un mot français en suite de phonèmes (API) par règles
+
+    Transcription approchée, sans dictionnaire: suffisante pour mesurer à
+    quel point un mot reconnu s'écarte du mot attendu. Le résultat est
+    mis en cache par mot.
+    """
+    word = _CLEAN.sub("", word.lower())
+    if word in EXCEPTIONS:
+        return tuple(EXCEPTIONS[word].split())
+    if not word:
+        return ()
+    # Mots d'une syllabe en e (ne, que): le e final est prononcé
+    if word.endswith("e") and not any(c in _V for c in word[:-1]):
+        return g2p(word[:-1]) + ("ə",) if len(word) > 1 else ("ə",)
+    phonemes = []
+    position = 0
+    while position < len(word):
+        for pattern, output in _RULES:
+            match = pattern.match(word, position)
+            if match and match.end() > position:
+                phonemes.extend(output if output is not None else (match.group()[0],))
+                position = match.end()
+                break
+        else:
+            position += 1
+    return tuple(phonemes)
+
+
+def substitution_cost(a, b):
+    """Coût de la confusion de deux phonèmes entre 0 et 1"""
+    if a == b:
+        return 0.0
+    cost = _PAIR_COST.get(frozenset((a, b)))
+    if cost is not None:
+        return cost
+    if (a in VOWELS) != (b in VOWELS):
+        return 1.0
+    return VOWEL_COST if a in VOWELS else CONSONANT_COST
+
+
+def _indel_cost(phoneme):
+    return SCHWA_COST if phoneme == "ə" else 1.0
+
+
+def phoneme_distance(a, b):
+    """Distance d'édition pondérée entre deux suites de phonèmes"""
+    previous = [0.0]
+    for phoneme in b:
+        previous.append(previous[-1] + _indel_cost(phoneme))
+    for x in a:
+        deletion = _indel_cost(x)
+        current = [previous[0] + deletion]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + deletion, current[j - 1] + _indel_cost(y),
+                               previous[j - 1] + substitution_cost(x, y)))
+        previous = current
+    return previous[-1]
+
+
+@lru_cache(maxsize=G2P_CACHE_SIZE)
+def word_distance(reference, spoken):
+    """Distance phonétique entre deux mots, de 0 (même prononciation) à 1"""
+    a, b = g2p(reference), g2p(spoken)
+    if not a and not b:
+        return 0.0
+    return min(1.0, phoneme_distance(a, b) / max(len(a), len(b)))
+
+
+def phonetic_score(alignment):
+    """Distance phonétique de chaque opération d'un alignement et taux d'erreur phonétique
+
+    Les mots déjà appariés par l'alignement sont comparés un à un: le coût
+    reste linéaire en nombre de mots, même pour de longs textes. distances
+    contient une valeur par opération (0 pour un mot correct, 1 pour un mot
+    omis ou ajouté); error_rate rapporte le coût pondéré de toutes les
+    modifications au nombre de phonèmes de la référence.
+    """
+    distances = []
+    cost = 0.0
+    phonemes = 0
+    for op in alignment.ops:
+        reference = alignment.ref_words[op.ref_index] if op.ref_index is not None else None
+        spoken = alignment.hyp_words[op.hyp_index] if op.hyp_index is not None else None
+        if reference is not None:
+            phonemes += len(g2p(reference))
+        if op.op == EQUAL:
+            distance = 0.0
+        elif op.op == SUBSTITUTE:
+            distance = word_distance(reference, spoken)
+            cost += phoneme_distance(g2p(reference), g2p(spoken))
+        elif op.op == DELETE:
+            distance = 1.0
+            cost += len(g2p(reference))
+        else:
+            distance = 1.0
+            cost += len(g2p(spoken))
+        distances.append(distance)
+    if not phonemes:
+        return PhoneticScore(distances, 0.0 if not cost else 1.0)
+    return PhoneticScore(distances, cost / phonemes)
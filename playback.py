@@ -0,0 +1,200 @@
+import numpy as np
+from reader import RecordingReader
+
+STOPPED = "stopped"
+PLAYING = "playing"
+PAUSED = "paused"
+
+# Blocs courts et latence basse: la lecture démarre en quelques millisecondes
+PLAYBACK_BLOCKSIZE = 256
+# Intervalle minimal entre deux notifications de position (s)
+POSITION_INTERVAL = 0.05
+# Durée d'inactivité après laquelle le flux de sortie est arrêté (s)
+IDLE_SECONDS = 30.0
+# Données lues à l'avance au démarrage et après un déplacement (s)
+PREFETCH_SECONDS = 0.5
+
+
+class PlaybackEngine:
+    """Lecture des enregistrements dans l'application via sd.OutputStream
+
+    Le callback audio copie directement les échantillons du fichier projeté
+    en mémoire (RecordingReader) dans le tampon de sortie. Le flux reste
+    ouvert entre deux lectures et produit du silence en pause: play() ne
+    fait que lever un drapeau, sans ouvrir de périphérique. Il est arrêté
+    après IDLE_SECONDS d'inactivité et relancé à la lecture suivante.
+
+    on_position(secondes) et on_state(état) sont appelés depuis le thread
+    audio et ne doivent rien faire d'autre que transmettre l'information.
+    """
+
+    def __init__(self, on_position=None, on_state=None, device=None):
+        self.on_position = on_position
+        self.on_state = on_state
+        self.device = device
+        self.path = None
+        self.state = STOPPED
+        self._reader = None
+        self._stream = None
+        self._pcm = None
+        self._position = 0
+        self._stop_frame = None
+        self._seek_to = None
+        self._idle_frames = 0
+        self._reported = 0
+        self._rate = None
+
+    @property
+    def sample_rate(self):
+        return self._reader.sample_rate if self._reader is not None else None
+
+    @property
+    def duration(self):
+        return self._reader.duration if self._reader is not None else 0.0
+
+    @property
+    def position(self):
+        """Position de lecture en secondes"""
+        if self._reader is None:
+            return 0.0
+        return self._position / self._reader.sample_rate
+
+    @property
+    def active(self):
+        """Vrai tant que le flux de sortie est ouvert et actif"""
+        return self._stream is not None and self._stream.active
+
+    def load(self, path):
+        """Prépare un enregistrement et le flux de sortie; retourne sa durée"""
+        if path == self.path and self._reader is not None:
+            return self.duration
+        self.stop()
+        reader = RecordingReader(path)
+        previous = self._reader
+        self._reader = reader
+        self._pcm = reader.pcm
+        self._rate = reader.sample_rate
+        self._position = 0
+        self.path = path
+        if previous is not None:
+            previous.close()
+        # Le flux ouvert est réutilisé tant que le format de sortie ne change pas
+        if previous is None or (previous.sample_rate, previous.channels) != (reader.sample_rate, reader.channels):
+            self._open_stream()
+        return reader.duration
+
+    def _open_stream(self):
+        import sounddevice as sd
+        self._close_stream()
+        self._stream = sd.OutputStream(samplerate=self._reader.sample_rate, channels=self._reader.channels,
+                                       dtype='int16', device=self.device, latency='low',
+                                       blocksize=PLAYBACK_BLOCKSIZE, callback=self._callback)
+        self._idle_frames = 0
+        self._stream.start()
+
+    def _close_stream(self):
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except Exception as e:
+                print(f"Erreur à la fermeture du flux de lecture: {e}")
+            self._stream = None
+
+    def _prefetch(self, frame):
+        """Lit à l'avance les pages du fichier que le callback va parcourir"""
+        count = int(PREFETCH_SECONDS * self._reader.sample_rate)
+        np.add.reduce(self._pcm[frame:frame + count, 0], dtype=np.int64)
+
+    def play(self, start=None, stop=None):
+        """Lance la lecture, éventuellement limitée à l'intervalle [start, stop) en secondes"""
+        if self._reader is None:
+            raise ValueError("Aucun enregistrement chargé")
+        rate = self._reader.sample_rate
+        if start is not None:
+            self._position = min(self._reader.frames, max(0, int(start * rate)))
+            self._seek_to = None
+        elif self._position >= self._reader.frames:
+            self._position = 0
+        self._stop_frame = int(stop * rate) if stop is not None else None
+        self._prefetch(self._position)
+        if self._stream is None:
+            self._open_stream()
+        elif not self._stream.active:
+            # Flux arrêté après inactivité
+            self._idle_frames = 0
+            self._stream.stop()
+            self._stream.start()
+        self._set_state(PLAYING)
+
+    def pause(self):
+        if self.state == PLAYING:
+            self._set_state(PAUSED)
+
+    def toggle(self):
+        """Alterne lecture et pause"""
+        if self.state == PLAYING:
+            self.pause()
+        else:
+            self.play()
+
+    def seek(self, seconds):
+        """Déplace la lecture (pris en compte au prochain bloc audio)"""
+        if self._reader is None:
+            return
+        frame = min(self._reader.frames, max(0, int(seconds * self._reader.sample_rate)))
+        self._prefetch(frame)
+        if self.state == PLAYING:
+            self._seek_to = frame
+        else:
+            self._position = frame
+        self._stop_frame = None
+
+    def stop(self):
+        """Arrête la lecture et revient au début"""
+        if self.state != STOPPED:
+            self._set_state(STOPPED)
+        self._position = 0
+        self._seek_to = None
+
+    def close(self):
+        """Ferme le flux de sortie et l'enregistrement"""
+        self.state = STOPPED
+        self._close_stream()
+        if self._reader is not None:
+            self._reader.close()
+        self._reader = self._pcm = self.path = None
+        self._rate = None
+
+    def _set_state(self, state):
+        self.state = state
+        if self.on_state is not None:
+            self.on_state(state)
+
+    def _callback(self, outdata, frames, time, status):
+        pcm, rate = self._pcm, self._rate
+        if self.state != PLAYING or pcm is None:
+            outdata.fill(0)
+            self._idle_frames += frames
+            if rate is None or self._idle_frames >= IDLE_SECONDS * rate:
+                import sounddevice as sd
+                raise sd.CallbackStop()
+            return
+        self._idle_frames = 0
+
+        seek_to = self._seek_to
+        if seek_to is not None:
+            self._seek_to = None
+            self._position = seek_to
+        position = self._position
+        end = len(pcm) if self._stop_frame is None else min(len(pcm), self._stop_frame)
+        count = max(0, min(frames, end - position))
+        outdata[:count] = pcm[position:position + count]
+        outdata[count:].fill(0)
+        self._position = position + count
+
+        if self.on_position is not None and abs(self._position - self._reported) >= POSITION_INTERVAL * rate:
+            self._reported = self._position
+            self.on_position(self._position / rate)
+        if count < frames:
+            self._stop_frame = None
+            self._set_state(STOPPED)
@@ -0,0 +1,117 @@
+import os
+import struct
+import numpy as np
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def parse_wav_header(path):
+    """Retourne (canaux, fréquence, position des données, nombre de trames) d'un WAV 16 bits
+
+    Les blocs RIFF sont parcourus sans lire les données: la taille annoncée
+    du bloc data est bornée par celle du fichier (enregistrement interrompu).
+    """
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:] != b'WAVE':
+            raise ValueError(f"{os.path.basename(path)} n'est pas un fichier WAV")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{os.path.basename(path)}: bloc de données introuvable")
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                body = f.read(chunk_size + (chunk_size & 1))
+                if len(body) < 16:
+                    raise ValueError(f"{os.path.basename(path)}: bloc fmt tronqué")
+                tag, channels, sample_rate, _, block_align, bits = struct.unpack('<HHIIHH', body[:16])
+                if tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    tag = struct.unpack('<H', body[24:26])[0]
+                fmt = (tag, channels, sample_rate, block_align, bits)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"{os.path.basename(path)}: bloc fmt manquant")
+                tag, channels, sample_rate, block_align, bits = fmt
+                if tag != WAVE_FORMAT_PCM or bits != 16:
+                    raise ValueError("Seuls les fichiers WAV 16 bits sont pris en charge")
+                offset = f.tell()
+                size = min(chunk_size, file_size - offset)
+                return channels, sample_rate, offset, size // block_align
+            else:
+                f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+
+class RecordingReader:
+    """Accès aux échantillons d'un enregistrement sans le charger en mémoire
+
+    Les données d'un WAV sont projetées en mémoire (np.memmap): pcm, channel()
+    et slice() retournent des vues, le système ne lit que les pages
+    réellement parcourues, ce qui permet d'analyser ou de jouer des fichiers
+    de plusieurs heures. Les formats compressés (FLAC, Opus) ne peuvent pas
+    être projetés: ils sont décodés en entier, et blocks() les lit au fil de
+    l'eau.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.mapped = path.lower().endswith(".wav")
+        if self.mapped:
+            self.channels, self.sample_rate, offset, self.frames = parse_wav_header(path)
+            if self.frames:
+                self._pcm = np.memmap(path, dtype='<i2', mode='r', offset=offset,
+                                      shape=(self.frames, self.channels))
+            else:
+                self._pcm = np.empty((0, self.channels), dtype='<i2')
+        else:
+            import soundfile
+            info = soundfile.info(path)
+            self.channels, self.sample_rate, self.frames = info.channels, info.samplerate, info.frames
+            self._pcm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def pcm(self):
+        """Échantillons entrelacés (trames, canaux) en int16"""
+        if self._pcm is None:
+            # Formats compressés: décodés au premier accès seulement
+            import soundfile
+            self._pcm, _ = soundfile.read(self.path, dtype='int16', always_2d=True)
+            self.frames = len(self._pcm)
+        return self._pcm
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    def channel(self, index=0):
+        """Vue sur un canal (sans copie pour un WAV)"""
+        return self.pcm[:, index]
+
+    def slice(self, start, stop=None, channel=0):
+        """Vue sur l'intervalle [start, stop) exprimé en secondes"""
+        first = max(0, int(start * self.sample_rate))
+        last = self.frames if stop is None else min(self.frames, int(np.ceil(stop * self.sample_rate)))
+        return self.pcm[first:max(first, last), channel]
+
+    def blocks(self, block_frames=65536, start_frame=0):
+        """Parcourt les échantillons entrelacés par blocs (trames, canaux)"""
+        if self._pcm is not None:
+            for first in range(start_frame, self.frames, block_frames):
+                yield self.pcm[first:first + block_frames]
+            return
+        import soundfile
+        yield from soundfile.blocks(self.path, blocksize=block_frames, start=start_frame,
+                                    dtype='int16', always_2d=True)
+
+    def close(self):
+        """Libère la projection (les vues déjà retournées restent valides)"""
+        self._pcm = None
+        self.frames = 0
@@ -0,0 +1,465 @@
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from resampler import resample, preload_resampler
+from vad import trim_silence
+from timing import activity_features, align_words
+from storage import read_audio
+
+# États d'une tâche de reconnaissance
+QUEUED = "queued"
+LOADING = "loading"
+RECOGNIZING = "recognizing"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed_out"
+
+FINAL_STATES = (DONE, FAILED, CANCELLED, TIMED_OUT)
+
+PROGRESS_LABELS = {
+    QUEUED: "Analyse en attente...",
+    LOADING: "Chargement de l'audio...",
+    RECOGNIZING: "Reconnaissance vocale en cours...",
+    DONE: "Reconnaissance terminée",
+    FAILED: "Erreur lors de la reconnaissance",
+    CANCELLED: "Analyse annulée",
+    TIMED_OUT: "Délai de reconnaissance dépassé",
+}
+
+
+class UnintelligibleAudio(Exception):
+    """Le moteur n'a reconnu aucune parole dans l'audio"""
+
+
+class BackendError(Exception):
+    """Le moteur de reconnaissance est indisponible ou a échoué"""
+
+
+RecognizedWord = namedtuple("RecognizedWord", "word start end confidence")
+AudioClip = namedtuple("AudioClip", "pcm sample_rate")
+
+
+class RecognitionResult:
+    """Transcription avec, si le moteur les fournit, les temps et confiances par mot"""
+
+    def __init__(self, transcript, words=None, confidence=None, backend=None):
+        self.transcript = transcript
+        self.words = words or []
+        self.confidence = confidence
+        self.backend = backend
+
+    def __str__(self):
+        return self.transcript
+
+    @property
+    def has_word_times(self):
+        """Vrai si chaque mot a un début et une fin"""
+        return bool(self.words) and all(w.start is not None and w.end is not None for w in self.words)
+
+    def with_word_times(self, times):
+        """Retourne le résultat avec les temps (début, fin) donnés pour chaque mot"""
+        words = [RecognizedWord(w.word, start, end, w.confidence) for w, (start, end) in zip(self.words, times)]
+        return RecognitionResult(self.transcript, words, self.confidence, self.backend)
+
+    def shifted(self, offset):
+        """Retourne le résultat avec les temps des mots décalés de offset secondes"""
+        if not offset:
+            return self
+        words = [RecognizedWord(w.word,
+                                w.start + offset if w.start is not None else None,
+                                w.end + offset if w.end is not None else None,
+                                w.confidence) for w in self.words]
+        return RecognitionResult(self.transcript, words, self.confidence, self.backend)
+
+    def to_dict(self):
+        return {
+            "transcript": self.transcript,
+            "words": [list(w) for w in self.words],
+            "confidence": self.confidence,
+            "backend": self.backend,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["transcript"], [RecognizedWord(*w) for w in data.get("words", [])],
+                   data.get("confidence"), data.get("backend"))
+
+
+def load_audio_clip(audio_path):
+    """Lit un enregistrement (WAV 16 bits, FLAC ou Opus) en AudioClip mono"""
+    try:
+        return AudioClip(*read_audio(audio_path))
+    except ValueError as e:
+        raise BackendError(str(e))
+
+
+def estimate_word_times(result, clip, activity=None):
+    """Complète les temps des mots que le moteur ne fournit pas (Google)
+
+    Les mots sont alignés par DTW sur l'activité vocale du clip: les temps
+    sont approximatifs mais suffisent à retrouver un mot dans l'audio.
+    """
+    if result.has_word_times or not result.words:
+        return result
+    if activity is None:
+        activity = activity_features(clip.pcm, clip.sample_rate)
+    return result.with_word_times(align_words([w.word for w in result.words], activity))
+
+
+class RecognitionBackend:
+    """Interface commune des moteurs de reconnaissance
+
+    load() prépare l'audio (par défaut un AudioClip lu depuis le fichier) et
+    recognize() retourne un RecognitionResult. Les deux sont appelés depuis
+    un thread du pipeline.
+    """
+
+    name = None
+
+    def __init__(self, language="fr-FR"):
+        self.language = language
+
+    def load(self, audio_path):
+        """Charge un fichier audio pour la reconnaissance"""
+        return load_audio_clip(audio_path)
+
+    def recognize(self, clip):
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Charge les ressources coûteuses du moteur à l'avance"""
+
+    def cache_id(self):
+        """Identifie le moteur et sa configuration dans le cache des transcriptions"""
+        return self.name
+
+
+class GoogleBackend(RecognitionBackend):
+    """Reconnaissance en ligne via l'API Google de SpeechRecognition"""
+
+    name = "google"
+
+    def __init__(self, language="fr-FR"):
+        super().__init__(language)
+        import speech_recognition as sr
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, clip):
+        audio = self.sr.AudioData(clip.pcm.tobytes(), clip.sample_rate, 2)
+        try:
+            response = self.recognizer.recognize_google(audio, language=self.language, show_all=True)
+        except self.sr.RequestError as e:
+            raise BackendError(e)
+        if not response or not response.get("alternative"):
+            raise UnintelligibleAudio()
+        best = response["alternative"][0]
+        words = [RecognizedWord(word, None, None, best.get("confidence"))
+                 for word in best["transcript"].split()]
+        return RecognitionResult(best["transcript"], words, best.get("confidence"), self.name)
+
+
+# Modèles Vosk chargés, partagés entre les instances (chargement à chaud)
+_vosk_models = {}
+_vosk_lock = threading.Lock()
+
+
+class VoskBackend(RecognitionBackend):
+    """Reconnaissance hors ligne avec un modèle Vosk local"""
+
+    name = "vosk"
+
+    def __init__(self, language="fr-FR", model_path=""):
+        super().__init__(language)
+        self.model_path = model_path
+
+    def _model(self):
+        """Retourne le modèle Vosk, chargé une seule fois par chemin"""
+        if not self.model_path or not os.path.isdir(self.model_path):
+            raise BackendError("Aucun modèle Vosk valide n'est configuré")
+        with _vosk_lock:
+            model = _vosk_models.get(self.model_path)
+            if model is None:
+                try:
+                    import vosk
+                except ImportError:
+                    raise BackendError("Le module vosk n'est pas installé")
+                vosk.SetLogLevel(-1)
+                model = vosk.Model(self.model_path)
+                _vosk_models[self.model_path] = model
+            return model
+
+    def warm_up(self):
+        self._model()
+
+    def cache_id(self):
+        return f"{self.name}:{os.path.basename(os.path.normpath(self.model_path))}"
+
+    def recognize(self, clip):
+        import vosk
+        recognizer = vosk.KaldiRecognizer(self._model(), clip.sample_rate)
+        recognizer.SetWords(True)
+
+        # Envoi par tranches de 0.5 s: un fichier projeté n'est jamais copié en entier
+        step = clip.sample_rate // 2
+        segments = []
+        for offset in range(0, len(clip.pcm), step):
+            if recognizer.AcceptWaveform(clip.pcm[offset:offset + step].tobytes()):
+                segments.append(json.loads(recognizer.Result()))
+        segments.append(json.loads(recognizer.FinalResult()))
+
+        words = [RecognizedWord(w["word"], w["start"], w["end"], w.get("conf", 1.0))
+                 for segment in segments for w in segment.get("result", [])]
+        transcript = " ".join(segment["text"] for segment in segments if segment.get("text"))
+        if not transcript:
+            raise UnintelligibleAudio()
+        confidence = float(np.mean([w.confidence for w in words])) if words else None
+        return RecognitionResult(transcript, words, confidence, self.name)
+
+
+class FakeBackend(RecognitionBackend):
+    """Moteur de substitution local et déterministe (tests, mode hors ligne)
+
+    Retourne toujours la même transcription, avec un mot toutes les
+    `word_duration` secondes, sans lire le fichier audio.
+    """
+
+    name = "fake"
+
+    def __init__(self, transcript="", delay=0.0, word_duration=0.4, language="fr-FR"):
+        super().__init__(language)
+        self.transcript = transcript
+        self.delay = delay
+        self.word_duration = word_duration
+
+    def load(self, audio_path):
+        return audio_path
+
+    def recognize(self, clip):
+        if self.delay:
+            time.sleep(self.delay)
+        if not self.transcript:
+            raise UnintelligibleAudio()
+        words = [RecognizedWord(word, i * self.word_duration, (i + 1) * self.word_duration, 1.0)
+                 for i, word in enumerate(self.transcript.split())]
+        return RecognitionResult(self.transcript, words, 1.0, self.name)
+
+
+BACKENDS = {
+    GoogleBackend.name: GoogleBackend,
+    VoskBackend.name: VoskBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+_backend_cache = {}
+
+
+def get_backend(name, language="fr-FR", **options):
+    """Retourne une instance partagée du moteur demandé (créée au premier appel)"""
+    key = (name, language, tuple(sorted(options.items())))
+    backend = _backend_cache.get(key)
+    if backend is None:
+        if name not in BACKENDS:
+            raise BackendError(f"Moteur de reconnaissance inconnu: {name}")
+        backend = BACKENDS[name](language=language, **options)
+        _backend_cache[key] = backend
+    return backend
+
+
+def cache_key_id(backend, sample_rate=None, trim=True):
+    """Identifie dans le cache le moteur et la préparation de l'audio (fréquence, silence retiré)"""
+    return f"{backend.cache_id()}|{sample_rate or 'natif'}|{'trim' if trim else 'full'}"
+
+
+class RecognitionJob:
+    """Tâche de reconnaissance soumise au pipeline
+
+    Les callbacks sont appelés depuis un thread du pipeline; l'application
+    les relaie vers le thread Tk par sa file d'événements.
+    """
+
+    def __init__(self, source, callback=None, on_progress=None):
+        self.source = source
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self._callback = callback
+        self._on_progress = on_progress
+        self._lock = threading.Lock()
+        self._timer = None
+        self._future = None
+
+    @property
+    def done(self):
+        return self.state in FINAL_STATES
+
+    def cancel(self):
+        """Annule la tâche; un résultat arrivant plus tard est ignoré"""
+        if self._future is not None:
+            self._future.cancel()
+        self._finish(CANCELLED)
+
+    def _set_state(self, state):
+        with self._lock:
+            if self.done:
+                return False
+            self.state = state
+        if self._on_progress is not None:
+            self._on_progress(self)
+        return True
+
+    def _finish(self, state, result=None, error=None):
+        """Termine la tâche une seule fois et notifie le demandeur"""
+        with self._lock:
+            if self.done:
+                return
+            self.state = state
+            self.result = result
+            self.error = error
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._callback is not None:
+            self._callback(self)
+
+
+class RecognitionPipeline:
+    """Exécute la reconnaissance vocale sur un pool de threads
+
+    Chaque soumission retourne une RecognitionJob annulable, avec un délai
+    maximal au-delà duquel la tâche est terminée en TIMED_OUT sans attendre
+    la réponse du moteur. Avec sample_rate, l'audio est rééchantillonné à
+    cette fréquence avant la reconnaissance; avec trim, le silence de début
+    et de fin est retiré (les temps des mots restent relatifs à la source).
+    Avec backend_factory, le moteur n'est créé (et son module importé) qu'à
+    la première demande, puis après chaque remise à None de backend.
+    """
+
+    def __init__(self, backend=None, max_workers=2, cache=None, sample_rate=None, trim=True,
+                 backend_factory=None):
+        self._backend = backend
+        self._backend_lock = threading.Lock()
+        self.backend_factory = backend_factory
+        self.cache = cache
+        self.sample_rate = sample_rate
+        self.trim = trim
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="recognition")
+
+    @property
+    def backend(self):
+        """Moteur par défaut du pipeline"""
+        with self._backend_lock:
+            if self._backend is None and self.backend_factory is not None:
+                self._backend = self.backend_factory()
+            return self._backend
+
+    @backend.setter
+    def backend(self, backend):
+        with self._backend_lock:
+            self._backend = backend
+
+    def submit(self, source, callback=None, on_progress=None, timeout=None, backend=None):
+        """Soumet un fichier audio (chemin) ou un AudioClip déjà en mémoire"""
+        job = RecognitionJob(source, callback, on_progress)
+        if timeout:
+            job._timer = threading.Timer(timeout, job._finish, args=(TIMED_OUT,))
+            job._timer.daemon = True
+            job._timer.start()
+        job._future = self._executor.submit(self._run, job, backend)
+        return job
+
+    def _run(self, job, backend):
+        """Exécute une tâche dans un thread du pool"""
+        try:
+            if not job._set_state(LOADING):
+                return
+            backend = backend or self.backend
+            cache = self.cache if not isinstance(job.source, AudioClip) else None
+            if cache is not None:
+                result = self._cached(cache, job.source, backend)
+                if result is not None:
+                    job._finish(DONE, result=result)
+                    return
+            if isinstance(job.source, AudioClip):
+                audio = job.source
+            else:
+                audio = backend.load(job.source)
+            if (self.sample_rate and isinstance(audio, AudioClip)
+                    and audio.sample_rate != self.sample_rate):
+                audio = AudioClip(resample(audio.pcm, audio.sample_rate, self.sample_rate),
+                                  self.sample_rate)
+            offset = 0.0
+            if self.trim and isinstance(audio, AudioClip):
+                pcm, offset = trim_silence(audio.pcm, audio.sample_rate)
+                audio = AudioClip(pcm, audio.sample_rate)
+            if not job._set_state(RECOGNIZING):
+                return
+            result = backend.recognize(audio)
+            if isinstance(audio, AudioClip) and not result.has_word_times:
+                result = estimate_word_times(result, audio, self._activity(cache, job.source, audio))
+            result = result.shifted(offset)
+        except Exception as e:
+            job._finish(FAILED, error=e)
+            return
+        if cache is not None:
+            self._store(cache, job.source, backend, result)
+        job._finish(DONE, result=result)
+
+    def _cache_id(self, backend):
+        return cache_key_id(backend, self.sample_rate, self.trim)
+
+    def _cached(self, cache, audio_path, backend):
+        try:
+            return cache.get(audio_path, self._cache_id(backend), backend.language)
+        except Exception as e:
+            print(f"Cache des transcriptions indisponible: {e}")
+            return None
+
+    def _activity(self, cache, audio_path, clip):
+        """Activité vocale du clip, conservée dans le cache pour chaque enregistrement"""
+        if cache is None:
+            return None
+        kind = f"activity:{clip.sample_rate}:{'trim' if self.trim else 'full'}"
+        try:
+            activity = cache.get_features(audio_path, kind)
+            if activity is None:
+                activity = activity_features(clip.pcm, clip.sample_rate)
+                cache.put_features(audio_path, kind, activity)
+            return activity
+        except Exception as e:
+            print(f"Cache des caractéristiques indisponible: {e}")
+            return None
+
+    def _store(self, cache, audio_path, backend, result):
+        try:
+            backend = backend or self.backend
+            cache.put(audio_path, self._cache_id(backend), backend.language, result)
+        except Exception as e:
+            print(f"Impossible de mettre en cache la transcription: {e}")
+
+    def remember(self, audio_path, result, backend=None):
+        """Met en cache, en arrière-plan, une transcription obtenue autrement (flux)
+
+        Retourne le Future de l'écriture, ou None sans cache.
+        """
+        if self.cache is None:
+            return None
+        return self._executor.submit(self._store, self.cache, audio_path, backend, result)
+
+    def warm_up(self, backend=None):
+        """Charge le moteur en arrière-plan pour que la première analyse soit rapide"""
+        return self._executor.submit(self._warm_up, backend)
+
+    def _warm_up(self, backend):
+        if self.sample_rate:
+            preload_resampler()
+        (backend or self.backend).warm_up()
+
+    def shutdown(self):
+        """Arrête le pool sans attendre les tâches en cours"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from alignment import Tokens, prepare_text
+
+REFERENCES_FILENAME = ".voicecomp_references.sqlite"
+# À augmenter à chaque changement de la normalisation: les entrées préparées
+# par une version précédente ne sont plus utilisées
+NORMALIZATION_VERSION = 4
+DEFAULT_MAX_ENTRIES = 5000
+# Textes préparés gardés en mémoire
+MEMORY_ENTRIES = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS references_texts (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS references_last_used ON references_texts (last_used);
+"""
+
+
+def text_key(text):
+    """Clé d'un texte de référence: empreinte du texte et de la version de normalisation"""
+    return hashlib.sha256(f"{NORMALIZATION_VERSION}\0{text}".encode("utf-8")).hexdigest()
+
+
+class ReferenceStore:
+    """Textes de référence découpés, normalisés et prêts à être alignés
+
+    Les mêmes passages servent à des milliers de tentatives: le découpage,
+    le développement des nombres et abréviations et la table de
+    numérotation des mots sont calculés une fois par texte puis
+    conservés en mémoire et, si path est donné, dans une base SQLite.
+    """
+
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._db = None
+        if path is not None:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+                self._db.executescript(_SCHEMA)
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Textes de référence non persistants: {e}")
+                self._db = None
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get(self, text):
+        """Retourne les Tokens du texte, préparés au besoin"""
+        key = text_key(text)
+        with self._lock:
+            tokens = self._memory.get(key)
+            if tokens is not None:
+                self._memory.move_to_end(key)
+                return tokens
+            tokens = self._load(key)
+        if tokens is None:
+            tokens = prepare_text(text)
+            self._save(key, tokens)
+        with self._lock:
+            self._memory[key] = tokens
+            while len(self._memory) > MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+        return tokens
+
+    def _load(self, key):
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute("SELECT data FROM references_texts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE references_texts SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Lecture d'un texte de référence impossible: {e}")
+            return None
+        return Tokens(*json.loads(row[0]))
+
+    def _save(self, key, tokens):
+        if self._db is None:
+            return
+        data = json.dumps(list(tokens), ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            try:
+                self._db.execute("INSERT OR REPLACE INTO references_texts (key, data, last_used) VALUES (?, ?, ?)",
+                                 (key, data, time.time()))
+                count = self._db.execute("SELECT COUNT(*) FROM references_texts").fetchone()[0]
+                if count > self.max_entries:
+                    self._db.execute("DELETE FROM references_texts WHERE key IN (SELECT key FROM references_texts"
+                                     " ORDER BY last_used LIMIT ?)", (count - self.max_entries,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Sauvegarde d'un texte de référence impossible: {e}")
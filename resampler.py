@@ -0,0 +1,123 @@
+from math import gcd
+import numpy as np
+
+# Demi-longueur du filtre anti-repliement, en nombre de périodes (comme resample_poly)
+HALF_LENGTH_FACTOR = 10
+# Nombre maximal de sorties calculées par lot (borne la mémoire temporaire)
+BATCH_OUTPUTS = 8192
+
+
+def design_filter(up, down):
+    """Filtre passe-bas de resample_poly pour un facteur up/down"""
+    from scipy.signal import firwin
+    max_rate = max(up, down)
+    half_length = HALF_LENGTH_FACTOR * max_rate
+    return firwin(2 * half_length + 1, 1.0 / max_rate, window=('kaiser', 5.0)) * up
+
+
+def preload_resampler():
+    """Importe scipy.signal à l'avance (près d'une seconde au premier import)"""
+    import scipy.signal
+    return scipy.signal
+
+
+def resample(pcm, in_rate, out_rate):
+    """Rééchantillonne un signal complet (int16 ou float) et conserve son type"""
+    if in_rate == out_rate or len(pcm) == 0:
+        return pcm
+    from scipy.signal import resample_poly
+    divisor = gcd(int(in_rate), int(out_rate))
+    out = resample_poly(pcm.astype(np.float32), int(out_rate) // divisor, int(in_rate) // divisor)
+    if pcm.dtype == np.int16:
+        return np.clip(np.round(out), -32768, 32767).astype(np.int16)
+    return out.astype(pcm.dtype)
+
+
+class StreamingResampler:
+    """Rééchantillonneur polyphase pour un flux découpé en blocs
+
+    Donne le même résultat que scipy.signal.resample_poly sur le signal
+    entier, quelle que soit la taille des blocs. Chaque sortie
+    combine une phase du filtre avec les derniers échantillons d'entrée: le
+    calcul est vectorisé par lot, sans boucle par échantillon.
+    """
+
+    def __init__(self, in_rate, out_rate):
+        divisor = gcd(int(in_rate), int(out_rate))
+        self.in_rate = int(in_rate)
+        self.out_rate = int(out_rate)
+        self.up = self.out_rate // divisor
+        self.down = self.in_rate // divisor
+        self.passthrough = self.up == self.down
+
+        h = design_filter(self.up, self.down)
+        self.delay = (len(h) - 1) // 2
+        self.taps = -(-len(h) // self.up)
+        padded = np.zeros(self.taps * self.up, dtype=np.float64)
+        padded[:len(h)] = h
+        # phases[p, t] = h[p + t * up]
+        self.phases = padded.reshape(self.taps, self.up).T.astype(np.float32)
+        self.reset()
+
+    def reset(self):
+        """Prépare le rééchantillonneur pour un nouveau flux"""
+        # Historique initialisé à zéro, comme le bord gauche de resample_poly
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._consumed = 0       # échantillons d'entrée reçus
+        self._produced = 0       # échantillons de sortie émis
+
+    def _available(self, total):
+        """Nombre de sorties calculables avec total échantillons d'entrée"""
+        # La sortie n lit l'entrée jusqu'à floor((n * down + delay) / up)
+        last = (total * self.up - 1 - self.delay) // self.down
+        return max(0, last + 1)
+
+    def process(self, block):
+        """Rééchantillonne un bloc et retourne les sorties disponibles (même type)"""
+        if self.passthrough:
+            return block
+        dtype = block.dtype
+        total = self._consumed + len(block)
+        buffer = np.concatenate((self._history, block.astype(np.float32)))
+        # buffer[0] correspond à l'entrée absolue start
+        start = self._consumed - len(self._history)
+        out = self._compute(buffer, start, self._produced, self._available(total))
+
+        self._consumed = total
+        keep = self.taps - 1
+        self._history = buffer[-keep:] if keep else buffer[:0]
+        return self._convert(out, dtype)
+
+    def flush(self, dtype=np.int16):
+        """Termine le flux: émet les dernières sorties (bord droit à zéro)"""
+        if self.passthrough:
+            return np.empty(0, dtype=dtype)
+        expected = -(-self._consumed * self.up // self.down)
+        pad = np.zeros(self.delay // self.up + 1, dtype=np.float32)
+        buffer = np.concatenate((self._history, pad))
+        start = self._consumed - len(self._history)
+        out = self._compute(buffer, start, self._produced, expected)
+        return self._convert(out, dtype)
+
+    def _compute(self, buffer, start, first, stop):
+        """Calcule les sorties [first, stop) à partir de buffer"""
+        if stop <= first:
+            return np.empty(0, dtype=np.float32)
+        parts = []
+        taps = np.arange(self.taps)
+        for batch in range(first, stop, BATCH_OUTPUTS):
+            n = np.arange(batch, min(stop, batch + BATCH_OUTPUTS))
+            position = n * self.down + self.delay
+            base = position // self.up - start
+            phase = position % self.up
+            # L'historique couvre toujours les taps - 1 entrées précédant base
+            values = buffer[base[:, None] - taps[None, :]]
+            parts.append(np.einsum('ij,ij->i', values, self.phases[phase]))
+        self._produced = stop
+        return np.concatenate(parts)
+
+    @staticmethod
+    def _convert(out, dtype):
+        if dtype == np.int16:
+            return np.clip(np.round(out), -32768, 32767).astype(np.int16)
+        return out.astype(dtype)
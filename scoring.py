@@ -0,0 +1,153 @@
+import re
+import numpy as np
+from alignment import tokenize
+from storage import read_audio
+from vad import FRAME_SECONDS, speech_mask
+
+# Silence plus court: articulation (occlusive, respiration), pas une pause
+MIN_PAUSE_SECONDS = 0.2
+# Pause marquée (hésitation, fin de phrase)
+LONG_PAUSE_SECONDS = 1.0
+# Fenêtre sur laquelle le volume est mesuré: lisse les variations entre sons
+LOUDNESS_WINDOW_SECONDS = 0.25
+
+_VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+# Terminaisons muettes en français (table, tables, parlent)
+_SILENT_ENDINGS = ("e", "es", "ent")
+
+
+def count_syllables(words):
+    """Estime le nombre de syllabes prononcées de mots normalisés (groupes de voyelles)"""
+    total = 0
+    for word in words:
+        groups = len(_VOWEL_GROUPS.findall(word))
+        if groups > 1 and word.endswith(_SILENT_ENDINGS):
+            groups -= 1
+        total += max(1, groups)
+    return total
+
+
+def _silent_runs(speech):
+    """Longueurs (en trames) des plages de silence d'un masque parole/silence"""
+    padded = np.concatenate(([False], ~speech, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[1::2] - edges[0::2]
+
+
+class AcousticMetrics:
+    """Mesures de débit, de pauses et de régularité du volume d'une prise"""
+
+    def __init__(self, duration, speaking_time=0.0, phonation_time=0.0, words=0, syllables=0,
+                 pauses=None, levels=None):
+        self.duration = duration
+        # Du début de la première syllabe à la fin de la dernière
+        self.speaking_time = speaking_time
+        # Temps de parole effective, pauses exclues
+        self.phonation_time = phonation_time
+        self.words = words
+        self.syllables = syllables
+        self.pauses = pauses if pauses is not None else np.empty(0)
+        # Volume de chaque fenêtre de parole en dBFS
+        self.levels = levels if levels is not None else np.empty(0)
+
+    @property
+    def words_per_minute(self):
+        return self.words / self.speaking_time * 60.0 if self.speaking_time else 0.0
+
+    @property
+    def articulation_rate(self):
+        """Syllabes par seconde de parole effective"""
+        return self.syllables / self.phonation_time if self.phonation_time else 0.0
+
+    @property
+    def pause_ratio(self):
+        """Part du temps de parole passée en pause"""
+        return float(self.pauses.sum()) / self.speaking_time if self.speaking_time else 0.0
+
+    @property
+    def long_pauses(self):
+        return int(np.count_nonzero(self.pauses >= LONG_PAUSE_SECONDS))
+
+    @property
+    def loudness(self):
+        """Volume médian de la parole en dBFS"""
+        return float(np.median(self.levels)) if len(self.levels) else None
+
+    @property
+    def loudness_spread(self):
+        """Écart-type du volume en dB: plus il est faible, plus la voix est régulière"""
+        return float(np.std(self.levels)) if len(self.levels) else None
+
+    def to_dict(self):
+        pauses = self.pauses
+        return {
+            "duration": round(self.duration, 3),
+            "speaking_time": round(self.speaking_time, 3),
+            "phonation_time": round(self.phonation_time, 3),
+            "words_per_minute": round(self.words_per_minute, 1),
+            "articulation_rate": round(self.articulation_rate, 2),
+            "pauses": len(pauses),
+            "long_pauses": self.long_pauses,
+            "pause_median": round(float(np.median(pauses)), 3) if len(pauses) else None,
+            "pause_max": round(float(pauses.max()), 3) if len(pauses) else None,
+            "pause_ratio": round(self.pause_ratio, 4),
+            "loudness": round(self.loudness, 1) if self.loudness is not None else None,
+            "loudness_spread": round(self.loudness_spread, 2) if self.loudness_spread is not None else None,
+        }
+
+    def describe(self):
+        """Lignes de résumé affichées sous la comparaison"""
+        if not self.speaking_time:
+            return ["Aucune parole détectée dans l'enregistrement"]
+        lines = [f"Durée de parole: {self.speaking_time:.1f} s sur {self.duration:.1f} s",
+                 f"Débit: {self.words_per_minute:.0f} mots/min"
+                 f" - articulation: {self.articulation_rate:.1f} syllabes/s"]
+        pauses = self.pauses
+        if len(pauses):
+            lines.append(f"Pauses: {len(pauses)} (médiane {np.median(pauses):.2f} s, max {pauses.max():.2f} s,"
+                         f" {self.long_pauses} de plus de {LONG_PAUSE_SECONDS:.0f} s)"
+                         f" - {self.pause_ratio:.0%} du temps de parole")
+        else:
+            lines.append("Pauses: aucune")
+        if self.loudness is not None:
+            lines.append(f"Volume: médiane {self.loudness:.0f} dBFS, écart-type {self.loudness_spread:.1f} dB")
+        return lines
+
+
+def analyze_pcm(pcm, sample_rate, transcript=""):
+    """Mesures acoustiques d'un signal int16 mono et de sa transcription
+
+    Tout est calculé sur les trames de la détection de parole (vad): les
+    pauses sont les silences d'au moins MIN_PAUSE_SECONDS entre la première
+    et la dernière trame de parole, le volume est mesuré par fenêtres de
+    LOUDNESS_WINDOW_SECONDS majoritairement parlées.
+    """
+    words = tokenize(transcript)
+    duration = len(pcm) / float(sample_rate) if sample_rate else 0.0
+    rms, speech = speech_mask(pcm, sample_rate)
+    voiced = np.flatnonzero(speech)
+    if len(voiced) == 0:
+        return AcousticMetrics(duration, words=len(words), syllables=count_syllables(words))
+
+    first, last = voiced[0], voiced[-1] + 1
+    rms, speech = rms[first:last], speech[first:last]
+    pauses = _silent_runs(speech) * FRAME_SECONDS
+    pauses = pauses[pauses >= MIN_PAUSE_SECONDS]
+    speaking_time = float(last - first) * FRAME_SECONDS
+
+    window = max(1, int(round(LOUDNESS_WINDOW_SECONDS / FRAME_SECONDS)))
+    count = len(rms) // window
+    energy = (np.square(rms[:count * window], dtype=np.float64) * speech[:count * window])
+    energy = energy.reshape(count, window).sum(axis=1)
+    frames = speech[:count * window].reshape(count, window).sum(axis=1)
+    spoken = frames * 2 >= window
+    levels = 10.0 * np.log10(energy[spoken] / frames[spoken] / 32768.0 ** 2 + 1e-12)
+
+    return AcousticMetrics(duration, speaking_time, speaking_time - float(pauses.sum()),
+                           len(words), count_syllables(words), pauses, levels)
+
+
+def analyze_recording(path, transcript=""):
+    """Mesures acoustiques d'un enregistrement (lu par projection en mémoire pour un WAV)"""
+    pcm, sample_rate = read_audio(path)
+    return analyze_pcm(pcm, sample_rate, transcript)
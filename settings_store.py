@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+
+# Version du format de settings.json; chaque migration passe de n à n + 1
+SCHEMA_VERSION = 1
+# Délai de regroupement des écritures (s)
+SAVE_DELAY = 0.5
+
+DEFAULTS = {
+    "theme": "light",
+    "audio_dir": os.path.join(os.path.expanduser("~"), "Documents", "AudioRecordings"),
+    "app_mode": "comparison",
+    "selected_mic_id": None,
+    "visualizer_size": "small",
+    "visualizer_renderer": "canvas",
+    "recognition_backend": "google",
+    "recognition_language": "fr-FR",
+    "vosk_model_path": "",
+    "streaming_transcription": True,
+    "storage_sample_rate": 16000,
+    "storage_format": "wav",
+    "flac_archive": False,
+    "recognition_sample_rate": 16000,
+    "trim_silence": True,
+    "comparison_mode": "words",
+    "max_recording_seconds": 0,
+    "auto_stop_silence": 0.0,
+}
+
+# Valeurs acceptées des paramètres à choix fermé
+CHOICES = {
+    "theme": ("light", "dark", "auto"),
+    "app_mode": ("comparison", "recording"),
+    "visualizer_size": ("small", "medium", "large"),
+    "visualizer_renderer": ("canvas", "matplotlib"),
+    "recognition_backend": ("google", "vosk"),
+    "storage_format": ("wav", "flac", "opus"),
+    "comparison_mode": ("words", "phonetic"),
+}
+
+
+def _migrate_0(settings):
+    """Fichiers sans version: l'indice PortAudio du micro n'est pas stable d'un lancement à l'autre"""
+    settings.pop("selected_mic", None)
+
+
+MIGRATIONS = {
+    0: _migrate_0,
+}
+
+
+def upgrade(settings):
+    """Applique les migrations nécessaires et retourne les paramètres à jour"""
+    version = settings.get("version", 0)
+    while version < SCHEMA_VERSION:
+        MIGRATIONS[version](settings)
+        version += 1
+    settings["version"] = version
+    return settings
+
+
+def merge_defaults(settings, defaults=DEFAULTS):
+    """Complète les clés manquantes et remplace les valeurs invalides par leur défaut"""
+    merged = dict(defaults)
+    for key, value in settings.items():
+        default = defaults.get(key)
+        expected = (int, float) if isinstance(default, float) else type(default)
+        if (key in CHOICES and value not in CHOICES[key]) or \
+                (default is not None and not isinstance(value, expected)):
+            print(f"Paramètre {key} invalide ({value!r}), valeur par défaut utilisée")
+            continue
+        merged[key] = value
+    return merged
+
+
+def write_json_atomic(path, data):
+    """Écrit un fichier JSON via un fichier temporaire renommé: jamais de fichier tronqué"""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class SettingsStore:
+    """Paramètres de l'application en mémoire, enregistrés en arrière-plan
+
+    data est un dictionnaire ordinaire modifié par l'interface. save()
+    copie son contenu et programme l'écriture: un thread dédié attend
+    SAVE_DELAY secondes, pour regrouper les modifications rapprochées,
+    puis écrit atomiquement la dernière version. flush() attend la fin de
+    l'écriture en cours (fermeture de l'application).
+    """
+
+    def __init__(self, path, defaults=DEFAULTS, delay=SAVE_DELAY):
+        self.path = path
+        self.delay = delay
+        self.defaults = defaults
+        self._pending = None
+        self._condition = threading.Condition()
+        self._writing = False
+        self.data = self._load()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        """Lit le fichier, le migre et complète les valeurs par défaut"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+            if not isinstance(loaded, dict):
+                raise ValueError("le fichier ne contient pas un objet JSON")
+        except FileNotFoundError:
+            data = merge_defaults({"version": SCHEMA_VERSION}, self.defaults)
+            self._pending = dict(data)
+            return data
+        except (OSError, ValueError) as e:
+            print(f"Erreur lors du chargement des paramètres: {e}")
+            # Le fichier illisible est mis de côté plutôt qu'écrasé
+            try:
+                os.replace(self.path, self.path + ".invalid")
+            except OSError:
+                pass
+            return merge_defaults({"version": SCHEMA_VERSION}, self.defaults)
+        version = loaded.get("version", 0)
+        data = merge_defaults(upgrade(loaded), self.defaults)
+        if version != SCHEMA_VERSION:
+            self._pending = dict(data)
+        return data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def save(self):
+        """Programme l'écriture de l'état actuel (sans accès disque dans l'appelant)"""
+        with self._condition:
+            self._pending = dict(self.data)
+            self._condition.notify()
+
+    def flush(self, timeout=2.0):
+        """Écrit immédiatement les modifications en attente et attend la fin de l'écriture"""
+        with self._condition:
+            self.delay = 0
+            self._condition.notify()
+            return self._condition.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None)
+                # Les appels rapprochés repoussent l'écriture
+                while self.delay and self._condition.wait(self.delay):
+                    pass
+                snapshot, self._pending = self._pending, None
+                self._writing = True
+            try:
+                write_json_atomic(self.path, snapshot)
+            except OSError as e:
+                print(f"Erreur lors de la sauvegarde des paramètres: {e}")
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
@@ -0,0 +1,187 @@
+import os
+import queue
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from reader import RecordingReader
+
+ARCHIVE_DIRNAME = "archive"
+
+# Formats de stockage des enregistrements: extension et paramètres soundfile
+FORMATS = {
+    "wav": (".wav", None, None),
+    "flac": (".flac", "FLAC", "PCM_16"),
+    "opus": (".opus", "OGG", "OPUS"),
+}
+AUDIO_EXTENSIONS = (".wav", ".flac", ".opus", ".ogg")
+# Fréquences acceptées par l'encodeur Opus
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+def is_wav(path):
+    return path.lower().endswith(".wav")
+
+
+def read_audio(path):
+    """Lit un enregistrement (WAV, FLAC ou Opus) en PCM int16 mono; retourne (pcm, fréquence)
+
+    Pour un WAV, pcm est une vue en lecture seule sur le fichier projeté en
+    mémoire: rien n'est lu avant d'être utilisé.
+    """
+    reader = RecordingReader(path)
+    return reader.channel(0), reader.sample_rate
+
+
+def audio_info(path):
+    """Retourne (durée en s, fréquence) sans décoder le fichier"""
+    reader = RecordingReader(path)
+    return reader.duration, reader.sample_rate
+
+
+def iter_pcm_blocks(path, block_frames=65536):
+    """Parcourt le PCM int16 entrelacé d'un fichier; le premier élément décrit le format
+
+    Les blocs suivants sont des tableaux contigus (vues sur le fichier pour un WAV).
+    """
+    with RecordingReader(path) as reader:
+        yield f"{reader.channels}:2:{reader.sample_rate}:".encode()
+        for block in reader.blocks(block_frames):
+            yield block
+
+
+def converted_path(path, fmt):
+    """Chemin d'un enregistrement converti dans un autre format"""
+    return os.path.splitext(path)[0] + FORMATS[fmt][0]
+
+
+def write_audio(path, pcm, sample_rate, fmt):
+    """Écrit du PCM int16, mono ou (trames, canaux), dans le format demandé (écriture atomique)"""
+    if fmt == "wav":
+        part_path = path + ".part"
+        with wave.open(part_path, 'wb') as wf:
+            wf.setnchannels(pcm.shape[1] if pcm.ndim > 1 else 1)
+            wf.setsampwidth(2)
+            wf.setframerate(sample_rate)
+            wf.writeframes(pcm.astype('<i2').tobytes())
+        os.replace(part_path, path)
+        return path
+
+    import soundfile
+    _, container, subtype = FORMATS[fmt]
+    if fmt == "opus" and sample_rate not in OPUS_RATES:
+        from resampler import resample
+        target = min((rate for rate in OPUS_RATES if rate >= sample_rate), default=48000)
+        pcm, sample_rate = resample(pcm, sample_rate, target), target
+    part_path = path + ".part"
+    soundfile.write(part_path, pcm, sample_rate, format=container, subtype=subtype)
+    os.replace(part_path, path)
+    return path
+
+
+def convert(path, fmt, keep_source=False):
+    """Convertit un enregistrement dans un autre format; retourne le nouveau chemin"""
+    target = converted_path(path, fmt)
+    if target == path:
+        return path
+    if os.path.exists(target):
+        raise FileExistsError(f"{os.path.basename(target)} existe déjà")
+    # Tous les canaux sont conservés
+    with RecordingReader(path) as reader:
+        write_audio(target, reader.pcm, reader.sample_rate, fmt)
+    if not keep_source:
+        os.remove(path)
+    return target
+
+
+def archive_path(audio_path):
+    """Chemin de la copie d'archive FLAC d'un enregistrement"""
+    folder, filename = os.path.split(audio_path)
+    return os.path.join(folder, ARCHIVE_DIRNAME, os.path.splitext(filename)[0] + ".flac")
+
+
+def write_flac(path, pcm, sample_rate):
+    """Écrit des échantillons int16 dans un fichier FLAC (nécessite soundfile)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return write_audio(path, pcm, sample_rate, "flac")
+
+
+class BackgroundEncoder:
+    """Convertit les enregistrements dans un thread dédié
+
+    Les enregistrements sont toujours écrits en WAV au fil de la capture
+    (récupérables après un plantage) puis compressés ici une fois terminés.
+    on_done(source, cible, erreur) est appelé depuis le thread d'encodage.
+    Le WAV d'origine est conservé: d'autres tâches peuvent encore le lire.
+    retire() le supprime quand l'application n'en a plus besoin.
+    """
+
+    def __init__(self, on_done=None):
+        self.on_done = on_done
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, path, fmt):
+        """Programme la conversion d'un fichier"""
+        self._queue.put((self._convert, (path, fmt)))
+
+    def retire(self, source, target, cache=None):
+        """Programme la suppression du WAV d'origine d'un fichier converti
+
+        Les transcriptions en cache de la source sont d'abord reportées sur
+        le fichier converti, dont l'empreinte diffère après une compression
+        avec perte.
+        """
+        self._queue.put((self._retire, (source, target, cache)))
+
+    def _run(self):
+        while True:
+            task, args = self._queue.get()
+            task(*args)
+
+    def _convert(self, path, fmt):
+        try:
+            target, error = convert(path, fmt, keep_source=True), None
+        except Exception as e:
+            target, error = None, e
+        if self.on_done is not None:
+            self.on_done(path, target, error)
+
+    @staticmethod
+    def _retire(source, target, cache):
+        if cache is not None:
+            try:
+                cache.move(source, target)
+            except Exception as e:
+                print(f"Impossible de reporter le cache de {source}: {e}")
+        try:
+            os.remove(source)
+        except OSError as e:
+            print(f"Impossible de supprimer {source}: {e}")
+
+
+def migrate_directory(audio_dir, fmt, keep_source=False, workers=None, on_converted=None):
+    """Convertit tous les WAV d'un dossier; retourne (convertis, échecs)
+
+    on_converted(source, cible, erreur) est appelé pour chaque fichier.
+    """
+    sources = sorted(entry.path for entry in os.scandir(audio_dir)
+                     if entry.is_file() and is_wav(entry.name))
+    converted = failures = 0
+
+    def work(path):
+        try:
+            return path, convert(path, fmt, keep_source), None
+        except Exception as e:
+            return path, None, e
+
+    # libsndfile relâche le GIL pendant l'encodage: des threads suffisent
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        for source, target, error in executor.map(work, sources):
+            if error is None:
+                converted += 1
+            else:
+                failures += 1
+            if on_converted is not None:
+                on_converted(source, target, error)
+    return converted, failures
@@ -0,0 +1,129 @@
+import threading
+import numpy as np
+from recognition import AudioClip, RecognitionResult, UnintelligibleAudio, DONE, FAILED
+from vad import VoiceActivityDetector
+
+SEGMENT_TIMEOUT = 30
+
+
+class StreamingTranscriber:
+    """Transcrit les segments de parole au fil de l'enregistrement
+
+    poll() est appelé par le thread d'enregistrement: il lit les nouveaux
+    échantillons du moteur de capture, les découpe sur les silences avec le
+    détecteur d'activité vocale et soumet chaque segment de parole au
+    pipeline de reconnaissance. Après finish(), le
+    résultat assemblé est transmis à on_complete dès que le dernier segment
+    est reconnu, sans relire le fichier.
+    """
+
+    def __init__(self, capture, pipeline, audio_path, on_complete=None):
+        self.capture = capture
+        self.pipeline = pipeline
+        self.backend = pipeline.backend
+        self.audio_path = audio_path
+        self.on_complete = on_complete
+        self.sample_rate = capture.sample_rate
+        self.vad = VoiceActivityDetector(self.sample_rate)
+        self.result = None
+        self.error = None
+        self.done = False
+        self.remembered = False
+
+        self._position = 0           # prochain échantillon à lire dans la capture
+        self._buffer = np.empty(0, dtype=np.int16)
+        self._buffer_start = 0       # position absolue de _buffer[0]
+
+        self._lock = threading.Lock()
+        self._segments = []          # (décalage en s, résultat ou erreur)
+        self._jobs = []
+        self._pending = 0
+        self._finished = False
+
+    def poll(self):
+        """Analyse les échantillons capturés depuis le dernier appel"""
+        stop = self.capture.frames_written
+        if stop > self._position:
+            pcm = self.capture.read(self._position, stop)
+            self._position = stop
+            self._buffer = np.concatenate((self._buffer, pcm))
+            for start, end in self.vad.feed(pcm):
+                self._emit(start, end)
+            self._trim()
+
+    def _trim(self):
+        """Libère la partie du tampon qui ne peut plus appartenir à un segment"""
+        keep_from = self.vad.keep_from() - self._buffer_start
+        if keep_from > 0:
+            self._buffer = self._buffer[keep_from:]
+            self._buffer_start += keep_from
+
+    def _emit(self, start, stop):
+        """Soumet un segment (positions absolues) à la reconnaissance"""
+        first = start - self._buffer_start
+        clip = AudioClip(self._buffer[first:stop - self._buffer_start].copy(), self.sample_rate)
+        offset = start / self.sample_rate
+        with self._lock:
+            index = len(self._segments)
+            self._segments.append((offset, None))
+            self._pending += 1
+        job = self.pipeline.submit(clip, backend=self.backend, timeout=SEGMENT_TIMEOUT,
+                                   callback=lambda job: self._on_segment(index, job))
+        self._jobs.append(job)
+
+    def _on_segment(self, index, job):
+        """Enregistre le résultat d'un segment (thread du pipeline)"""
+        with self._lock:
+            offset, _ = self._segments[index]
+            if job.state == DONE:
+                self._segments[index] = (offset, job.result)
+            elif job.state == FAILED and isinstance(job.error, UnintelligibleAudio):
+                # Bruit sans parole: le segment est simplement ignoré
+                pass
+            else:
+                self.error = job.error or Exception(job.state)
+            self._pending -= 1
+            complete = self._finished and self._pending == 0
+        if complete:
+            self._complete()
+
+    def finish(self):
+        """Termine la prise: soumet le dernier segment puis attend les résultats"""
+        self.poll()
+        for start, end in self.vad.flush():
+            self._emit(start, end)
+        with self._lock:
+            self._finished = True
+            complete = self._pending == 0
+        if complete:
+            self._complete()
+
+    def cancel(self):
+        """Abandonne la transcription en cours"""
+        with self._lock:
+            self._finished = False
+        for job in self._jobs:
+            job.cancel()
+
+    def _complete(self):
+        """Assemble les segments reconnus en un seul résultat"""
+        if self.error is None:
+            words = []
+            transcripts = []
+            confidences = []
+            for offset, result in self._segments:
+                if result is None:
+                    continue
+                transcripts.append(result.transcript)
+                if result.confidence is not None:
+                    confidences.append(result.confidence)
+                words.extend(result.shifted(offset).words)
+            if transcripts:
+                confidence = float(np.mean(confidences)) if confidences else None
+                self.result = RecognitionResult(" ".join(transcripts), words, confidence,
+                                                self.backend.name)
+            else:
+                self.error = UnintelligibleAudio()
+        self.done = True
+        if self.on_complete is not None:
+            self.on_complete(self)
@@ -0,0 +1,75 @@
+import random
+import numpy as np
+import pytest
+import alignment
+from alignment import EQUAL, SUBSTITUTE, align, align_tokens, edit_distance
+from french import expand_word
+
+# Homophones ou quasi-homophones: une erreur de mot dans tous les cas
+HOMOPHONES = [("chanté", "chanter"), ("mère", "maire"), ("cet", "cette"), ("vert", "verre")]
+
+
+@pytest.mark.parametrize("expected, spoken", HOMOPHONES)
+def test_homophone_is_a_substitution(expected, spoken):
+    alignment = align(f"il a {expected} hier", f"il a {spoken} hier")
+    assert [op.op for op in alignment.ops] == [EQUAL, EQUAL, SUBSTITUTE, EQUAL]
+    assert alignment.wer == pytest.approx(0.25)
+
+
+def test_accents_are_ignored_by_scoring():
+    assert align("il a parlé", "il a parle").wer == 0.0
+
+
+@pytest.mark.parametrize("written, spoken", [
+    ("1h", "une heure"),
+    ("21h30", "vingt et une heures trente"),
+    ("13h01", "treize heures une"),
+    ("81", "quatre-vingt-un"),
+])
+def test_expanded_numbers(written, spoken):
+    assert " ".join(expand_word(written)) == spoken
+
+
+def levenshtein(a, b):
+    """Distance de référence, une ligne de la matrice complète à la fois"""
+    ids = {}
+    a = np.array([ids.setdefault(word, len(ids)) for word in a])
+    b = np.array([ids.setdefault(word, len(ids)) for word in b])
+    steps = np.arange(len(b) + 1)
+    row = steps.copy()
+    for i, word in enumerate(a, 1):
+        previous = row
+        row = np.empty_like(previous)
+        row[0] = i
+        row[1:] = np.minimum(previous[:-1] + (b != word), previous[1:] + 1)
+        row = np.minimum.accumulate(row - steps) + steps
+    return int(row[-1])
+
+
+def check_alignment(ref, hyp):
+    alignment = align_tokens(ref, hyp)
+    assert alignment.errors == levenshtein(ref, hyp)
+    assert [op.ref for op in alignment.ops if op.ref is not None] == ref
+    assert [op.hyp for op in alignment.ops if op.hyp is not None] == hyp
+    assert all((op.op == EQUAL) == (op.ref == op.hyp) for op in alignment.ops if op.op in (EQUAL, SUBSTITUTE))
+
+
+@pytest.mark.parametrize("size, vocabulary", [(8, 2), (60, 3), (300, 5), (800, 40), (3000, 4), (5000, 200)])
+def test_alignment_is_minimal(size, vocabulary):
+    rng = random.Random(size)
+    ref = [f"w{rng.randrange(vocabulary)}" for _ in range(size)]
+    hyp = [word if rng.random() > 0.2 else f"w{rng.randrange(vocabulary)}" for word in ref if rng.random() > 0.05]
+    check_alignment(ref, hyp)
+
+
+def test_unrelated_texts_are_aligned_exactly_with_little_memory(monkeypatch):
+    # Les fronts non gardés sont recalculés pendant la remontée
+    monkeypatch.setattr(alignment, "FRONT_MEMORY_LIMIT", 1000)
+    rng = random.Random(1)
+    ref = [f"w{rng.randrange(30)}" for _ in range(400)]
+    hyp = [f"w{rng.randrange(30)}" for _ in range(350)]
+    check_alignment(ref, hyp)
+
+
+def test_short_input_matches_edit_distance():
+    assert align_tokens(["a", "b", "c"], ["a", "x", "c", "d"]).errors == edit_distance("abc", "axcd")
@@ -0,0 +1,167 @@
+import os
+import re
+import shutil
+import threading
+import time
+import wave
+from collections import Counter
+from concurrent.futures import Future
+import numpy as np
+import main
+from main import SpeechComparisonApp
+from recognition import RecognitionResult
+from storage import BackgroundEncoder
+
+
+class StubRoot:
+    """Remplace la fenêtre Tk: after() mémorise les rappels sans les exécuter"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, callback):
+        self.scheduled.append(callback)
+        return len(self.scheduled)
+
+    def after_cancel(self, job):
+        pass
+
+
+class StubText:
+    def __init__(self):
+        self.text = ""
+
+    def insert(self, index, *args):
+        self.text += "".join(args[0::2])
+
+
+def make_app():
+    app = SpeechComparisonApp.__new__(SpeechComparisonApp)
+    app.root = StubRoot()
+    app.result_area = StubText()
+    app.render_job = None
+    app.acoustics_request = None
+    app.files_in_use = Counter()
+    app.converted_sources = {}
+    app.register_event_handlers()
+    return app
+
+
+def write_take(path, seconds=2.0, sample_rate=16000):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pcm = (np.sin(2 * np.pi * 220 * t) * 8000 * (t > 0.5)).astype(np.int16)
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm.tobytes())
+    return str(path)
+
+
+def run_events(app, done, timeout=5.0):
+    """Traite les événements comme la boucle Tk jusqu'à ce que done() soit vrai"""
+    deadline = time.monotonic() + timeout
+    while not done() and time.monotonic() < deadline:
+        app.process_events()
+        time.sleep(0.01)
+    app.process_events()
+
+
+def test_acoustic_analysis_reaches_the_results(tmp_path):
+    app = make_app()
+    app.analyze_acoustics(write_take(tmp_path / "take.wav"), "bonjour à tous")
+    run_events(app, lambda: "Analyse acoustique" in app.result_area.text)
+    assert "Débit" in app.result_area.text
+    assert not app.files_in_use
+
+
+def test_every_posted_event_has_a_handler():
+    app = make_app()
+    source = open(main.__file__, encoding="utf-8").read()
+    posted = set(re.findall(r'post_event\(\s*"(\w+)"', source))
+    assert posted <= set(app.event_handlers)
+
+
+class StubPipeline:
+    """Pipeline dont l'écriture en cache reste en cours jusqu'à ce que le test la termine"""
+
+    cache = None
+
+    def __init__(self):
+        self.writes = []
+
+    def remember(self, audio_path, result, backend=None):
+        future = Future()
+        self.writes.append(future)
+        return future
+
+
+class StubLibrary:
+    def rename(self, source, target):
+        pass
+
+
+def test_source_wav_is_deleted_once_its_readers_finish(tmp_path, monkeypatch):
+    wav = write_take(tmp_path / "take.wav")
+    flac = str(tmp_path / "take.flac")
+    app = make_app()
+    app.audio_file = wav
+    app.settings = {"app_mode": "comparison"}
+    app.recording_frame = None
+    app.playback = type("Playback", (), {"path": None})()
+    app.library = StubLibrary()
+    app.recognition = StubPipeline()
+    app.encoder = BackgroundEncoder()
+    app.live_transcriber = type("Live", (), {"done": True, "error": None, "remembered": False, "audio_path": wav,
+                                             "result": RecognitionResult("bonjour"), "backend": None})()
+
+    # Écriture en cache et analyse acoustique en cours au moment où l'encodage se termine
+    app.remember_live_transcription()
+    gate = threading.Event()
+    analyze = main.analyze_recording
+    monkeypatch.setattr(main, "analyze_recording", lambda path, text: gate.wait(5) and analyze(path, text))
+    app.analyze_acoustics(wav, "bonjour")
+    shutil.copy(wav, flac)
+    app.on_recording_encoded_event(wav, flac, None)
+    assert app.audio_file == flac
+
+    app.recognition.writes[0].set_result(None)
+    run_events(app, lambda: app.files_in_use[wav] == 1)
+    assert app.files_in_use[wav] == 1
+    time.sleep(0.2)
+    assert os.path.exists(wav)
+
+    gate.set()
+    run_events(app, lambda: not os.path.exists(wav))
+    assert not os.path.exists(wav)
+    assert os.path.exists(flac)
+    assert not app.files_in_use
+
+
+class StubDevices:
+    """Registre de microphones dont l'énumération n'est pas encore terminée"""
+
+    def __init__(self):
+        self.known = {}
+        self.error = None
+
+    def get(self, device_id):
+        return self.known.get(device_id)
+
+
+def test_microphone_choice_does_not_wait_for_the_scan(monkeypatch):
+    app = make_app()
+    app.settings = {"selected_mic_id": "usb"}
+    app.settings_frame = None
+    app.devices = StubDevices()
+    app.countdown_job = "compte à rebours"
+    app.record_device = app.get_selected_mic_index()
+    assert app.record_device is None
+
+    # L'énumération se termine pendant le compte à rebours
+    monkeypatch.setattr(main, "input_samplerate", lambda index: 48000)
+    app.devices.known["usb"] = type("Device", (), {"index": 3})()
+    app.post_event("devices_changed")
+    app.process_events()
+    assert app.record_device == 3
+    assert app.capture.sample_rate == 48000
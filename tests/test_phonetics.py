@@ -0,0 +1,34 @@
+import pytest
+from alignment import align
+from phonetics import g2p, phonetic_score, word_distance
+
+
+@pytest.mark.parametrize("a, b", [("chanté", "chanter"), ("mère", "maire"), ("cet", "cette"), ("vert", "verre")])
+def test_homophones_share_their_phonemes(a, b):
+    assert g2p(a) == g2p(b)
+    assert word_distance(a, b) == 0.0
+
+
+@pytest.mark.parametrize("a, b", [("parlé", "parle"), ("thé", "the")])
+def test_distinct_sounds_keep_distinct_phonemes(a, b):
+    assert g2p(a) != g2p(b)
+
+
+@pytest.mark.parametrize("word, phonemes", [
+    ("parlent", "p a ʁ l"),
+    ("chantent", "ʃ ɑ̃ t"),
+    ("jouent", "ʒ u"),
+    ("prennent", "p ʁ ɛ n"),
+    ("moment", "m ɔ m ɑ̃"),
+    ("lentement", "l ɑ̃ t ə m ɑ̃"),
+    ("vent", "v ɑ̃"),
+    ("souvent", "s u v ɑ̃"),
+])
+def test_verb_ending_ent_is_silent(word, phonemes):
+    assert g2p(word) == tuple(phonemes.split())
+
+
+def test_correct_words_cost_nothing():
+    score = phonetic_score(align("ils parlent souvent", "ils parlent vent"))
+    assert score.distances[:2] == [0.0, 0.0]
+    assert 0.0 < score.distances[2] < 1.0
@@ -0,0 +1,70 @@
+import threading
+import pytest
+from recognition import (CANCELLED, DONE, FAILED, LOADING, RECOGNIZING, TIMED_OUT, FakeBackend,
+                         RecognitionPipeline, UnintelligibleAudio)
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = RecognitionPipeline(FakeBackend("bonjour à tous"))
+    yield pipeline
+    pipeline.shutdown()
+
+
+def submit(pipeline, **options):
+    """Soumet une tâche et retourne (tâche, événement de fin, états notifiés, fins notifiées)"""
+    finished = threading.Event()
+    states, endings = [], []
+
+    def on_done(job):
+        endings.append(job.state)
+        finished.set()
+
+    job = pipeline.submit("prise.wav", callback=on_done, on_progress=lambda job: states.append(job.state),
+                          **options)
+    return job, finished, states, endings
+
+
+def test_submit_returns_the_transcript(pipeline):
+    job, finished, states, endings = submit(pipeline)
+    assert finished.wait(5)
+    assert job.state == DONE and job.done
+    assert job.result.transcript == "bonjour à tous"
+    assert [word.word for word in job.result.words] == ["bonjour", "à", "tous"]
+    assert job.result.words[1].start == pytest.approx(0.4)
+
+
+def test_progress_goes_through_loading_then_recognizing(pipeline):
+    job, finished, states, endings = submit(pipeline)
+    assert finished.wait(5)
+    assert states == [LOADING, RECOGNIZING]
+    assert endings == [DONE]
+
+
+def test_cancel_ignores_the_late_result():
+    pipeline = RecognitionPipeline(FakeBackend("bonjour", delay=0.3))
+    job, finished, states, endings = submit(pipeline)
+    job.cancel()
+    assert job.state == CANCELLED
+    # Le moteur répond après l'annulation
+    pipeline._executor.shutdown(wait=True)
+    assert job.state == CANCELLED and job.result is None
+    assert endings == [CANCELLED]
+
+
+def test_timeout_does_not_wait_for_the_backend():
+    pipeline = RecognitionPipeline(FakeBackend("bonjour", delay=1.0))
+    job, finished, states, endings = submit(pipeline, timeout=0.1)
+    assert finished.wait(0.8)
+    assert job.state == TIMED_OUT
+    pipeline._executor.shutdown(wait=True)
+    assert endings == [TIMED_OUT] and job.result is None
+
+
+def test_silence_is_reported_as_unintelligible():
+    pipeline = RecognitionPipeline(FakeBackend(""))
+    job, finished, states, endings = submit(pipeline)
+    assert finished.wait(5)
+    pipeline.shutdown()
+    assert job.state == FAILED
+    assert isinstance(job.error, UnintelligibleAudio)
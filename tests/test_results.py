@@ -0,0 +1,16 @@
+from alignment import align
+from main import SpeechComparisonApp
+from recognition import RecognizedWord
+
+
+def test_expanded_words_keep_their_recognized_time():
+    app = SpeechComparisonApp.__new__(SpeechComparisonApp)
+    alignment = align("Rendez-vous à 21h30 demain", "rendez-vous à 21h30 demain")
+    words = [RecognizedWord("rendez-vous", 0.0, 0.5, 1.0), RecognizedWord("à", 0.5, 0.6, 1.0),
+             RecognizedWord("21h30", 0.6, 1.5, 1.0), RecognizedWord("demain", 1.5, 2.0, 1.0)]
+    runs = [(word + " ", "correct") for word in alignment.ref_words]
+    spans = app.timed_word_spans(alignment, words, 0, runs)
+    # « 21h30 » est comparé comme « vingt et une heures trente »
+    assert len(alignment.hyp) == 8
+    assert [span[:2] for span in spans] == [(0.0, 0.5), (0.5, 0.6)] + [(0.6, 1.5)] * 5 + [(1.5, 2.0)]
+    assert spans[2][2] == len("Rendez-vous à ")
@@ -0,0 +1,92 @@
+import json
+import os
+import time
+import pytest
+import settings_store
+from settings_store import DEFAULTS, SCHEMA_VERSION, SettingsStore, merge_defaults, write_json_atomic
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_missing_file_gives_the_defaults(tmp_path):
+    path = str(tmp_path / "settings.json")
+    store = SettingsStore(path, delay=0)
+    assert store.data == dict(DEFAULTS, version=SCHEMA_VERSION)
+    assert store.flush()
+    assert read(path) == store.data
+
+
+def test_invalid_values_fall_back_to_their_default():
+    merged = merge_defaults({"theme": "rose", "storage_sample_rate": "16k", "auto_stop_silence": 2,
+                             "selected_mic_id": "usb-1", "app_mode": "recording"})
+    assert merged["theme"] == DEFAULTS["theme"]
+    assert merged["storage_sample_rate"] == DEFAULTS["storage_sample_rate"]
+    # Un entier est accepté pour un réel, et None n'impose aucun type
+    assert merged["auto_stop_silence"] == 2
+    assert merged["selected_mic_id"] == "usb-1"
+    assert merged["app_mode"] == "recording"
+
+
+def test_old_file_is_migrated_and_rewritten(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"theme": "dark", "selected_mic": 3}), encoding="utf-8")
+    store = SettingsStore(str(path), delay=0)
+    assert store["theme"] == "dark"
+    assert "selected_mic" not in store.data
+    assert store.flush()
+    assert read(path)["version"] == SCHEMA_VERSION
+
+
+@pytest.mark.parametrize("content", ["{\"theme\": ", "[1, 2]"])
+def test_corrupt_file_is_set_aside(tmp_path, content):
+    path = tmp_path / "settings.json"
+    path.write_text(content, encoding="utf-8")
+    store = SettingsStore(str(path), delay=0)
+    assert store["theme"] == DEFAULTS["theme"]
+    assert not path.exists()
+    assert (tmp_path / "settings.json.invalid").read_text(encoding="utf-8") == content
+
+
+def test_close_saves_are_written_once(tmp_path, monkeypatch):
+    writes = []
+
+    def write(path, data):
+        writes.append(data)
+        write_json_atomic(path, data)
+
+    monkeypatch.setattr(settings_store, "write_json_atomic", write)
+    path = str(tmp_path / "settings.json")
+    store = SettingsStore(path, delay=0.3)
+    assert store.flush()
+    writes.clear()
+    store.delay = 0.3
+    for theme in ("dark", "auto", "light", "dark"):
+        store["theme"] = theme
+        store.save()
+        time.sleep(0.05)
+    assert writes == []
+    deadline = time.monotonic() + 5
+    while not writes and time.monotonic() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.4)
+    assert len(writes) == 1
+    assert read(path)["theme"] == "dark"
+
+
+def test_write_replaces_the_file_atomically(tmp_path, monkeypatch):
+    path = str(tmp_path / "settings.json")
+    write_json_atomic(path, {"theme": "dark"})
+    assert read(path) == {"theme": "dark"}
+    assert os.listdir(tmp_path) == ["settings.json"]
+
+    # Une écriture interrompue laisse le fichier précédent intact
+    def fail(fd):
+        raise OSError("disque plein")
+
+    monkeypatch.setattr(settings_store.os, "fsync", fail)
+    with pytest.raises(OSError):
+        write_json_atomic(path, {"theme": "light"})
+    assert read(path) == {"theme": "dark"}
@@ -0,0 +1,20 @@
+import os
+from transcription_cache import CACHE_FILENAME, TranscriptionCache, move_legacy_cache
+
+
+def test_legacy_cache_leaves_the_recordings_folder(tmp_path):
+    audio_dir = tmp_path / "enregistrements"
+    audio_dir.mkdir()
+    legacy = TranscriptionCache(str(audio_dir / CACHE_FILENAME))
+    legacy._db.execute("INSERT INTO files (path, audio_hash, mtime, size) VALUES ('a.wav', 'x', 0, 0)")
+    legacy._db.commit()
+    legacy.close()
+
+    path = str(tmp_path / "application" / CACHE_FILENAME)
+    move_legacy_cache(str(audio_dir), path)
+    assert os.listdir(audio_dir) == []
+    cache = TranscriptionCache(path)
+    assert cache._db.execute("SELECT audio_hash FROM files").fetchall() == [("x",)]
+    cache.close()
+    # Les fichiers du journal restent à côté du cache
+    assert os.listdir(audio_dir) == []
@@ -0,0 +1,21 @@
+import json
+import tkinter as tk
+import pytest
+import main
+from main import SpeechComparisonApp, stress_views
+
+
+def test_view_switches_keep_memory_flat(tmp_path, monkeypatch):
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("aucun affichage disponible")
+    # Paramètres et enregistrements dans un dossier temporaire
+    (tmp_path / "settings.json").write_text(json.dumps({"audio_dir": str(tmp_path / "audio")}),
+                                            encoding="utf-8")
+    monkeypatch.setattr(main, "__file__", str(tmp_path / "main.py"))
+    app = SpeechComparisonApp(root)
+    try:
+        assert stress_views(root, app, 1000) == 0
+    finally:
+        app.settings_store.flush()
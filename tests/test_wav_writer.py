@@ -0,0 +1,29 @@
+import threading
+import numpy as np
+from wav_writer import StreamingWavWriter
+
+
+class FailingFlush:
+    def process(self, block):
+        return block
+
+    def flush(self):
+        raise RuntimeError("flush")
+
+
+def test_error_after_end_of_stream_does_not_hang(tmp_path):
+    writer = StreamingWavWriter(str(tmp_path / "take.wav"), 16000, resampler=FailingFlush()).start()
+    writer.push(np.zeros(160, dtype=np.int16))
+    errors = []
+
+    def close():
+        try:
+            writer.close()
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=close, daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert [str(e) for e in errors] == ["flush"]
@@ -0,0 +1,123 @@
+import numpy as np
+from vad import frame_features
+
+# Pas des trames d'activité utilisées pour l'alignement (s)
+FEATURE_HOP_SECONDS = 0.02
+# Pénalité des pas non diagonaux dans un mot: favorise une répartition régulière
+# (une pause peut s'allonger librement)
+STEP_PENALTY = 1.0
+# Niveau attendu entre deux mots (une pause est possible mais pas obligatoire)
+GAP_LEVEL = 0.2
+# Taille maximale de la matrice d'alignement; au-delà, le pas est agrandi
+MAX_CELLS = 20000000
+
+
+def activity_features(pcm, sample_rate, hop=FEATURE_HOP_SECONDS):
+    """Activité vocale par trame entre 0 (bruit de fond) et 1 (parole forte)
+
+    Log-énergie normalisée entre les percentiles 10 et 90 du signal, lissée
+    sur trois trames.
+    """
+    frame = max(1, int(sample_rate * hop))
+    rms, _ = frame_features(pcm, frame)
+    if len(rms) == 0:
+        return np.empty(0, dtype=np.float32)
+    energy = np.log(rms + 1.0)
+    low, high = np.percentile(energy, 10), np.percentile(energy, 90)
+    if high - low < 1e-3:
+        return np.ones(len(energy), dtype=np.float32)
+    activity = np.clip((energy - low) / (high - low), 0.0, 1.0)
+    if len(activity) >= 3:
+        activity = np.convolve(activity, np.ones(3) / 3.0, mode='same')
+    return activity.astype(np.float32)
+
+
+def word_template(words, speech_frames):
+    """Profil d'activité attendu pour une suite de mots
+
+    Chaque mot occupe un nombre d'états proportionnel à son nombre de
+    lettres, de sorte que le modèle dure à peu près autant que la parole
+    observée; un état de pause sépare les mots et des états de silence
+    encadrent la phrase. Retourne (profil, [(premier état, fin), ...]).
+    """
+    letters = [max(1, sum(c.isalnum() for c in word)) for word in words]
+    per_letter = max(1.0, speech_frames / float(sum(letters)))
+    values = [0.0]
+    ranges = []
+    for i, count in enumerate(letters):
+        if i:
+            values.append(GAP_LEVEL)
+        first = len(values)
+        values.extend([1.0] * max(1, int(round(count * per_letter))))
+        ranges.append((first, len(values)))
+    values.append(0.0)
+    return np.array(values, dtype=np.float32), ranges
+
+
+def dtw_path(template, observed, penalty=STEP_PENALTY):
+    """Alignement DTW monotone; retourne l'état associé à chaque trame observée
+
+    Chaque ligne est calculée d'un bloc: la dépendance horizontale
+    D[i, j-1] se résout par un minimum cumulé sur les coûts cumulés. Rester
+    sur un état de parole (valeur 1) est pénalisé, pas sur un état de pause.
+    """
+    n, m = len(template), len(observed)
+    horizontal = np.zeros((n, m), dtype=bool)
+    diagonal = np.zeros((n, m), dtype=bool)
+    stay = np.where(template >= 1.0, penalty, 0.0)
+
+    cost = np.abs(observed - template[0]).astype(np.float64)
+    previous = np.cumsum(cost + stay[0])
+    horizontal[0, 1:] = True
+    for i in range(1, n):
+        cost = np.abs(observed - template[i]).astype(np.float64)
+        from_diagonal = np.full(m, np.inf)
+        from_diagonal[1:] = previous[:-1]
+        vertical = previous + penalty
+        diagonal[i] = from_diagonal <= vertical
+        arrive = cost + np.minimum(from_diagonal, vertical)
+        running = np.cumsum(cost + stay[i])
+        best = np.minimum.accumulate(arrive - running) + running
+        horizontal[i] = best < arrive
+        previous = best
+
+    states = np.empty(m, dtype=np.int64)
+    i, j = n - 1, m - 1
+    states[j] = i
+    while j > 0 or i > 0:
+        if j > 0 and horizontal[i, j]:
+            j -= 1
+        elif i > 0 and j > 0 and diagonal[i, j]:
+            i -= 1
+            j -= 1
+        elif i > 0:
+            i -= 1
+            continue
+        else:
+            j -= 1
+        states[j] = i
+    return states
+
+
+def align_words(words, activity, hop=FEATURE_HOP_SECONDS):
+    """Estime (début, fin) en secondes de chaque mot à partir de l'activité vocale"""
+    if not words or len(activity) == 0:
+        return [(None, None) for _ in words]
+    speech_frames = int(np.count_nonzero(activity > 0.5)) or len(activity)
+    template, ranges = word_template(words, speech_frames)
+
+    # Fichiers longs: trames regroupées pour borner la taille de la matrice
+    group = int(np.ceil(len(template) * len(activity) / float(MAX_CELLS)))
+    if group > 1:
+        count = len(activity) // group
+        activity = activity[:count * group].reshape(count, group).mean(axis=1)
+        template, ranges = word_template(words, max(1, speech_frames // group))
+        hop *= group
+
+    states = dtw_path(template, activity)
+    times = []
+    for first, last in ranges:
+        start = int(np.searchsorted(states, first))
+        end = max(start + 1, int(np.searchsorted(states, last)))
+        times.append((round(start * hop, 3), round(end * hop, 3)))
+    return times
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import numpy as np
+from recognition import RecognitionResult
+from storage import iter_pcm_blocks
+
+CACHE_FILENAME = ".voicecomp_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+# Taille maximale des caractéristiques audio conservées (activité vocale...)
+DEFAULT_MAX_FEATURE_BYTES = 20 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    key TEXT PRIMARY KEY,
+    audio_hash TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    language TEXT NOT NULL,
+    result TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transcripts_audio ON transcripts (audio_hash);
+CREATE INDEX IF NOT EXISTS transcripts_last_used ON transcripts (last_used);
+CREATE TABLE IF NOT EXISTS features (
+    key TEXT PRIMARY KEY,
+    audio_hash TEXT NOT NULL,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS features_audio ON features (audio_hash);
+CREATE INDEX IF NOT EXISTS features_last_used ON features (last_used);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    audio_hash TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+
+def pcm_hash(audio_path, block_frames=65536):
+    """Empreinte SHA-256 des échantillons PCM d'un fichier (en-tête et conteneur exclus)
+
+    Un WAV converti en FLAC sans perte garde la même empreinte, et donc ses
+    transcriptions en cache.
+    """
+    digest = hashlib.sha256()
+    for block in iter_pcm_blocks(audio_path, block_frames):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def move_legacy_cache(audio_dir, path):
+    """Déplace vers path le cache qu'une version précédente rangeait dans le dossier d'enregistrements
+
+    Une base dans ce dossier en modifiait la date à chaque écriture (fichiers
+    du journal), ce qui obligeait l'index des enregistrements à le parcourir.
+    """
+    legacy_path = os.path.join(audio_dir, CACHE_FILENAME)
+    if os.path.exists(path) or not os.path.exists(legacy_path):
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(legacy_path + suffix):
+            shutil.move(legacy_path + suffix, path + suffix)
+
+
+class TranscriptionCache:
+    """Cache persistant des transcriptions, adressé par le contenu audio
+
+    La clé combine l'empreinte du PCM, le moteur avec la préparation de
+    l'audio (recognition.cache_key_id: fréquence, silence retiré) et la
+    langue: un même enregistrement n'est jamais reconnu deux fois, même
+    renommé ou déplacé dans un autre dossier. Les empreintes des fichiers sont mémorisées par (chemin, mtime, taille) et
+    les entrées les moins récemment utilisées sont évincées au-delà de
+    max_entries ou max_bytes.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        # Journal WAL: les processus du traitement par lots lisent le cache
+        # pendant que l'un d'eux y écrit
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def audio_hash(self, audio_path):
+        """Retourne l'empreinte d'un fichier, recalculée seulement s'il a changé"""
+        path = os.path.abspath(audio_path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._db.execute("SELECT audio_hash, mtime, size FROM files WHERE path = ?",
+                                   (path,)).fetchone()
+        if row and row[1] == stat.st_mtime and row[2] == stat.st_size:
+            return row[0]
+
+        digest = pcm_hash(path)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                             (path, digest, stat.st_mtime, stat.st_size))
+            self._db.commit()
+        return digest
+
+    @staticmethod
+    def _key(audio_hash, backend_id, language):
+        return f"{audio_hash}:{backend_id}:{language}"
+
+    def get(self, audio_path, backend_id, language):
+        """Retourne le RecognitionResult en cache, ou None"""
+        key = self._key(self.audio_hash(audio_path), backend_id, language)
+        with self._lock:
+            row = self._db.execute("SELECT result FROM transcripts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE transcripts SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return RecognitionResult.from_dict(json.loads(row[0]))
+
+    def put(self, audio_path, backend_id, language, result):
+        """Mémorise la transcription d'un fichier"""
+        audio_hash = self.audio_hash(audio_path)
+        data = json.dumps(result.to_dict(), ensure_ascii=False)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (self._key(audio_hash, backend_id, language), audio_hash,
+                              backend_id, language, data, len(data), time.time()))
+            self._evict()
+            self._db.commit()
+
+    def get_features(self, audio_path, kind):
+        """Retourne un tableau float32 de caractéristiques calculé pour ce fichier, ou None"""
+        key = f"{self.audio_hash(audio_path)}:{kind}"
+        with self._lock:
+            row = self._db.execute("SELECT data FROM features WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE features SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def put_features(self, audio_path, kind, values):
+        """Mémorise des caractéristiques (tableau 1D) calculées pour un fichier"""
+        audio_hash = self.audio_hash(audio_path)
+        data = np.ascontiguousarray(values, dtype=np.float32).tobytes()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO features VALUES (?, ?, ?, ?, ?)",
+                             (f"{audio_hash}:{kind}", audio_hash, data, len(data), time.time()))
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM features").fetchone()[0]
+            if total > DEFAULT_MAX_FEATURE_BYTES:
+                stale = []
+                for key, size in self._db.execute("SELECT key, size FROM features ORDER BY last_used"):
+                    if total <= DEFAULT_MAX_FEATURE_BYTES:
+                        break
+                    stale.append((key,))
+                    total -= size
+                self._db.executemany("DELETE FROM features WHERE key = ?", stale)
+            self._db.commit()
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà des limites"""
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT key, size FROM transcripts ORDER BY last_used").fetchall()
+        stale = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            stale.append((key,))
+            count -= 1
+            total -= size
+        self._db.executemany("DELETE FROM transcripts WHERE key = ?", stale)
+
+    def move(self, source_path, target_path):
+        """Reporte les entrées d'un fichier sur sa version convertie, puis oublie la source
+
+        Une conversion sans perte (FLAC) garde l'empreinte; une compression
+        avec perte (Opus) la change, les entrées sont alors copiées.
+        """
+        source_hash = self.audio_hash(source_path)
+        target_hash = self.audio_hash(target_path)
+        if source_hash != target_hash:
+            with self._lock:
+                for table, columns in (("transcripts", "backend, language, result, size, last_used"),
+                                       ("features", "data, size, last_used")):
+                    self._db.execute(f"INSERT OR IGNORE INTO {table} SELECT ? || substr(key, ?), ?, {columns}"
+                                     f" FROM {table} WHERE audio_hash = ?",
+                                     (target_hash, len(source_hash) + 1, target_hash, source_hash))
+                self._db.commit()
+        self.invalidate_path(source_path)
+
+    def invalidate_path(self, audio_path):
+        """Oublie un fichier supprimé et ses transcriptions si aucun autre fichier ne les partage"""
+        path = os.path.abspath(audio_path)
+        with self._lock:
+            row = self._db.execute("SELECT audio_hash FROM files WHERE path = ?", (path,)).fetchone()
+            self._db.execute("DELETE FROM files WHERE path = ?", (path,))
+            if row is not None:
+                shared = self._db.execute("SELECT 1 FROM files WHERE audio_hash = ? LIMIT 1",
+                                          (row[0],)).fetchone()
+                if shared is None:
+                    self._db.execute("DELETE FROM transcripts WHERE audio_hash = ?", (row[0],))
+                    self._db.execute("DELETE FROM features WHERE audio_hash = ?", (row[0],))
+            self._db.commit()
@@ -0,0 +1,182 @@
+import numpy as np
+
+# Analyse par trames de 10 ms
+FRAME_SECONDS = 0.01
+MIN_SPEECH_RMS = 300          # seuil absolu en unités int16 (~ -40 dBFS)
+NOISE_FACTOR = 3.0            # la parole dépasse le bruit de fond de ce facteur
+# Les fricatives sourdes (s, f, ch) sont faibles mais riches en passages par zéro
+FRICATIVE_FACTOR = 1.5
+FRICATIVE_ZCR = 0.25
+MIN_SILENCE_SECONDS = 0.5     # pause qui sépare deux segments
+MIN_SPEECH_SECONDS = 0.1      # les impulsions plus courtes sont ignorées
+PADDING_SECONDS = 0.2         # marge conservée autour de la parole
+MAX_SEGMENT_SECONDS = 15.0
+# Trames converties en flottants à la fois (borne la mémoire sur les longs fichiers)
+FEATURE_BATCH_FRAMES = 65536
+
+
+def frame_features(pcm, frame):
+    """Retourne le RMS et le taux de passage par zéro de chaque trame complète"""
+    count = len(pcm) // frame
+    rms = np.empty(count, dtype=np.float32)
+    zcr = np.empty(count, dtype=np.float32)
+    for first in range(0, count, FEATURE_BATCH_FRAMES):
+        last = min(count, first + FEATURE_BATCH_FRAMES)
+        frames = pcm[first * frame:last * frame].reshape(last - first, frame).astype(np.float32)
+        rms[first:last] = np.sqrt(np.mean(np.square(frames), axis=1))
+        signs = np.signbit(frames)
+        zcr[first:last] = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame - 1 or 1)
+    return rms, zcr
+
+
+def _speech_frames(rms, zcr, noise):
+    """Décision parole/silence par trame pour un niveau de bruit donné"""
+    loud = rms > np.maximum(MIN_SPEECH_RMS, noise * NOISE_FACTOR)
+    fricative = (rms > np.maximum(MIN_SPEECH_RMS / 2.0, noise * FRICATIVE_FACTOR)) & (zcr > FRICATIVE_ZCR)
+    return loud | fricative
+
+
+def _is_speech(level, crossings, noise):
+    """Version scalaire de _speech_frames pour l'analyse en flux"""
+    if level > max(MIN_SPEECH_RMS, noise * NOISE_FACTOR):
+        return True
+    return crossings > FRICATIVE_ZCR and level > max(MIN_SPEECH_RMS / 2.0, noise * FRICATIVE_FACTOR)
+
+
+def _runs(mask):
+    """Retourne les plages [début, fin) des valeurs vraies d'un masque booléen"""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def speech_mask(pcm, sample_rate):
+    """Retourne le RMS et la décision parole/silence de chaque trame de FRAME_SECONDS"""
+    frame = max(1, int(sample_rate * FRAME_SECONDS))
+    rms, zcr = frame_features(pcm, frame)
+    if len(rms) == 0:
+        return rms, np.zeros(0, dtype=bool)
+    noise = float(np.percentile(rms, 10))
+    return rms, _speech_frames(rms, zcr, noise)
+
+
+def detect_speech(pcm, sample_rate):
+    """Retourne les segments de parole d'un signal int16 en secondes [(début, fin), ...]
+
+    Entièrement vectorisé: décision par trame sur le RMS et le taux de
+    passage par zéro relativement au bruit de fond estimé, puis fusion des
+    pauses courtes, suppression des impulsions isolées et ajout d'une marge.
+    """
+    rms, speech = speech_mask(pcm, sample_rate)
+    if len(rms) == 0:
+        return []
+    starts, ends = _runs(speech)
+    if len(starts) == 0:
+        return []
+
+    # Fusion des segments séparés par une pause trop courte
+    gaps = starts[1:] - ends[:-1]
+    first = np.flatnonzero(np.concatenate(([True], gaps >= int(MIN_SILENCE_SECONDS / FRAME_SECONDS))))
+    last = np.concatenate((first[1:] - 1, [len(starts) - 1]))
+    starts, ends = starts[first], ends[last]
+
+    long_enough = (ends - starts) >= max(1, int(MIN_SPEECH_SECONDS / FRAME_SECONDS))
+    starts, ends = starts[long_enough], ends[long_enough]
+
+    duration = len(pcm) / sample_rate
+    return [(max(0.0, s * FRAME_SECONDS - PADDING_SECONDS), min(duration, e * FRAME_SECONDS + PADDING_SECONDS))
+            for s, e in zip(starts.tolist(), ends.tolist())]
+
+
+def trim_silence(pcm, sample_rate):
+    """Retire le silence de début et de fin; retourne (signal, décalage en s)
+
+    Le signal est retourné tel quel si aucune parole n'est détectée, pour ne
+    jamais écarter un enregistrement trop faible pour le détecteur.
+    """
+    segments = detect_speech(pcm, sample_rate)
+    if not segments:
+        return pcm, 0.0
+    start = int(segments[0][0] * sample_rate)
+    stop = int(np.ceil(segments[-1][1] * sample_rate))
+    return pcm[start:stop], start / sample_rate
+
+
+class VoiceActivityDetector:
+    """Détecteur d'activité vocale pour un flux int16
+
+    feed() analyse les nouveaux échantillons et retourne les segments de
+    parole terminés sous forme de positions absolues (début, fin) en
+    échantillons; flush() termine le segment en cours. Le bruit de fond est
+    suivi pendant les silences. trailing_silence donne la durée du silence
+    depuis la dernière trame de parole, pour l'arrêt automatique.
+    """
+
+    def __init__(self, sample_rate, min_silence=MIN_SILENCE_SECONDS, max_segment=MAX_SEGMENT_SECONDS,
+                 padding=PADDING_SECONDS):
+        self.sample_rate = sample_rate
+        self.frame = max(1, int(sample_rate * FRAME_SECONDS))
+        self.min_silence = max(1, int(min_silence / FRAME_SECONDS))
+        self.max_segment = int(max_segment * sample_rate)
+        self.padding = int(padding * sample_rate)
+        self.noise = float(MIN_SPEECH_RMS) / NOISE_FACTOR
+        self.speech_seen = False
+        self._residual = np.empty(0, dtype=np.int16)
+        self._position = 0           # position absolue de la prochaine trame
+        self._segment_start = None
+        self._last_cut = 0
+        self._silence = 0            # trames de silence depuis la dernière parole
+
+    @property
+    def in_speech(self):
+        return self._segment_start is not None
+
+    @property
+    def trailing_silence(self):
+        """Durée du silence depuis la dernière trame de parole (s)"""
+        return self._silence * FRAME_SECONDS
+
+    def feed(self, pcm):
+        """Analyse un bloc et retourne les segments terminés"""
+        if len(self._residual):
+            pcm = np.concatenate((self._residual, pcm))
+        rms, zcr = frame_features(pcm, self.frame)
+        self._residual = pcm[len(rms) * self.frame:]
+
+        segments = []
+        for level, crossings in zip(rms.tolist(), zcr.tolist()):
+            frame_start = self._position
+            frame_end = frame_start + self.frame
+            self._position = frame_end
+            speech = _is_speech(level, crossings, self.noise)
+            if self._segment_start is None:
+                self.noise = 0.95 * self.noise + 0.05 * level
+                if speech:
+                    self._segment_start = max(self._last_cut, frame_start - self.padding)
+                    self.speech_seen = True
+                    self._silence = 0
+                else:
+                    self._silence += 1
+                continue
+
+            self._silence = 0 if speech else self._silence + 1
+            if self._silence >= self.min_silence or frame_end - self._segment_start >= self.max_segment:
+                segments.append((self._segment_start, frame_end))
+                self._segment_start = frame_end if speech else None
+                self._last_cut = frame_end
+        return segments
+
+    def keep_from(self):
+        """Première position absolue encore utile pour découper un segment"""
+        if self._segment_start is not None:
+            return self._segment_start
+        return max(self._last_cut, self._position - self.padding)
+
+    def flush(self):
+        """Termine le flux et retourne le dernier segment éventuel"""
+        end = self._position + len(self._residual)
+        segments = []
+        if self._segment_start is not None:
+            segments.append((self._segment_start, end))
+            self._segment_start = None
+        return segments
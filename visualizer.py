@@ -0,0 +1,143 @@
+import tkinter as tk
+import numpy as np
+from capture import ENVELOPE_HOP_SECONDS
+
+METER_FPS = 30
+METER_COLUMNS = 250
+
+RENDERERS = ("canvas", "matplotlib")
+
+
+def envelope_columns(values, points, columns):
+    """Ramène une enveloppe de `points` pas à `columns` colonnes (maximum par colonne)
+
+    Les valeurs manquantes au début de la prise sont complétées par des zéros
+    pour que l'enveloppe défile depuis la droite.
+    """
+    group = max(1, points // columns)
+    total = group * columns
+    values = values[-total:]
+    if len(values) < total:
+        values = np.concatenate((np.zeros(total - len(values), dtype=np.float32), values))
+    return values.reshape(columns, group).max(axis=1)
+
+
+class LevelMeter:
+    """Base des indicateurs de niveau: cadence de rafraîchissement et cycle de vie"""
+
+    def __init__(self, source, seconds=5, columns=METER_COLUMNS):
+        self.source = source
+        self.columns = columns
+        self.points = max(columns, int(seconds / ENVELOPE_HOP_SECONDS))
+        self._job = None
+
+    def start(self):
+        """Démarre le rafraîchissement périodique"""
+        if self._job is None:
+            self._tick()
+
+    def stop(self):
+        """Arrête le rafraîchissement en conservant la dernière image"""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    def destroy(self):
+        """Arrête l'indicateur et détruit son widget"""
+        self.stop()
+        self.widget.destroy()
+
+    def _tick(self):
+        if not self.widget.winfo_exists():
+            self._job = None
+            return
+        rms, peak = self.source(self.points)
+        self.render(envelope_columns(rms, self.points, self.columns),
+                    envelope_columns(peak, self.points, self.columns))
+        self._job = self.widget.after(int(1000 / METER_FPS), self._tick)
+
+    def render(self, rms, peak):
+        raise NotImplementedError
+
+
+class CanvasLevelMeter(LevelMeter):
+    """Indicateur de niveau léger dessiné avec deux polygones sur un Canvas Tk"""
+
+    def __init__(self, master, source, height=100, seconds=5, bg="white",
+                 peak_color="#9ecbff", rms_color="#1f77b4"):
+        super().__init__(source, seconds)
+        self.widget = tk.Canvas(master, height=height, bg=bg, highlightthickness=0)
+        self._peak_item = self.widget.create_polygon(0, 0, 0, 0, fill=peak_color, outline="")
+        self._rms_item = self.widget.create_polygon(0, 0, 0, 0, fill=rms_color, outline="")
+
+    def _polygon(self, values, width, height):
+        """Construit les coordonnées d'une enveloppe symétrique autour du centre"""
+        mid = height / 2
+        x = np.linspace(0, width, self.columns)
+        top = mid - np.clip(values, 0, 1) * mid
+        bottom = 2 * mid - top
+        xs = np.concatenate((x, x[::-1]))
+        ys = np.concatenate((top, bottom[::-1]))
+        return np.column_stack((xs, ys)).ravel().tolist()
+
+    def render(self, rms, peak):
+        width = self.widget.winfo_width()
+        height = self.widget.winfo_height()
+        if width <= 1 or height <= 1:
+            return
+        self.widget.coords(self._peak_item, *self._polygon(peak, width, height))
+        self.widget.coords(self._rms_item, *self._polygon(rms, width, height))
+
+
+class BlitLevelMeter(LevelMeter):
+    """Indicateur de niveau matplotlib ne redessinant que ses courbes (blitting)"""
+
+    def __init__(self, master, source, height=100, seconds=5, bg="white",
+                 peak_color="#9ecbff", rms_color="#1f77b4"):
+        super().__init__(source, seconds)
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.fig = Figure(figsize=(6, height / 100), dpi=100, facecolor=bg)
+        self.ax = self.fig.add_subplot(1, 1, 1)
+        self.ax.set_facecolor(bg)
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.widget = self.canvas.get_tk_widget()
+
+        x = np.arange(self.columns)
+        zeros = np.zeros(self.columns)
+        self._lines = []
+        for color, width in ((peak_color, 1), (peak_color, 1), (rms_color, 2), (rms_color, 2)):
+            line, = self.ax.plot(x, zeros, color=color, lw=width, animated=True)
+            self._lines.append(line)
+
+        self.ax.set_ylim(-1, 1)
+        self.ax.set_xlim(0, self.columns - 1)
+        self.ax.set_title('Niveau audio')
+        self.ax.set_yticks([])
+        self.ax.set_xticks([])
+        self.fig.tight_layout()
+
+        self._background = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        """Mémorise le fond statique après chaque redessin complet (redimensionnement)"""
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+
+    def render(self, rms, peak):
+        if self._background is None:
+            return
+        for line, values in zip(self._lines, (peak, -peak, rms, -rms)):
+            line.set_ydata(values)
+        self.canvas.restore_region(self._background)
+        for line in self._lines:
+            self.ax.draw_artist(line)
+        self.canvas.blit(self.ax.bbox)
+
+
+def create_level_meter(master, renderer, source, height=100, **colors):
+    """Crée l'indicateur de niveau correspondant au rendu choisi dans les paramètres"""
+    if renderer == "matplotlib":
+        return BlitLevelMeter(master, source, height=height, **colors)
+    return CanvasLevelMeter(master, source, height=height, **colors)
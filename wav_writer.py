@@ -0,0 +1,161 @@
+import os
+import queue
+import struct
+import threading
+import time
+
+PARTIAL_SUFFIX = ".part"
+HEADER_SIZE = 44
+
+
+def build_wav_header(sample_rate, channels, data_size, sample_width=2):
+    """Construit un en-tête WAV PCM canonique de 44 octets"""
+    block_align = channels * sample_width
+    return struct.pack('<4sI4s4sIHHIIHH4sI',
+                       b'RIFF', 36 + data_size, b'WAVE',
+                       b'fmt ', 16, 1, channels, sample_rate,
+                       sample_rate * block_align, block_align, sample_width * 8,
+                       b'data', data_size)
+
+
+def _patch_sizes(f, data_size):
+    """Met à jour les tailles RIFF et data d'un fichier ouvert"""
+    position = f.tell()
+    f.seek(4)
+    f.write(struct.pack('<I', 36 + data_size))
+    f.seek(40)
+    f.write(struct.pack('<I', data_size))
+    f.seek(position)
+
+
+class StreamingWavWriter:
+    """Écrit un fichier WAV 16 bits au fil de l'enregistrement
+
+    Le callback audio dépose les blocs int16 dans une file; un thread dédié
+    les écrit dans un fichier partiel (.part) dont l'en-tête est corrigé
+    périodiquement. À la fermeture, l'en-tête final est écrit et le fichier
+    est renommé, ce qui prend un temps constant quelle que soit la durée.
+    Avec un resampler, les blocs sont convertis à sample_rate par le thread
+    d'écriture, hors du callback audio.
+    """
+
+    def __init__(self, filepath, sample_rate, channels=1, header_interval=1.0, resampler=None):
+        self.filepath = filepath
+        self.part_path = filepath + PARTIAL_SUFFIX
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.header_interval = header_interval
+        self.resampler = resampler
+        self.data_size = 0
+        self.error = None
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        """Crée le fichier partiel et démarre le thread d'écriture"""
+        self._file = open(self.part_path, 'wb')
+        self._file.write(build_wav_header(self.sample_rate, self.channels, 0))
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def push(self, pcm):
+        """Ajoute un bloc int16 à écrire (appelable depuis le callback audio)"""
+        self._queue.put(pcm)
+
+    def _run(self):
+        """Boucle du thread d'écriture"""
+        last_patch = time.monotonic()
+        finished = False
+        try:
+            while True:
+                block = self._queue.get()
+                if block is None:
+                    finished = True
+                    if self.resampler is not None:
+                        self._write(self.resampler.flush())
+                    break
+                if self.resampler is not None:
+                    block = self.resampler.process(block)
+                self._write(block)
+                now = time.monotonic()
+                if now - last_patch >= self.header_interval:
+                    _patch_sizes(self._file, self.data_size)
+                    self._file.flush()
+                    last_patch = now
+        except Exception as e:
+            self.error = e
+            # Vider la file pour ne pas bloquer le producteur, sauf si la fin
+            # a déjà été reçue (erreur pendant l'écriture finale)
+            while not finished and self._queue.get() is not None:
+                pass
+        finally:
+            try:
+                _patch_sizes(self._file, self.data_size)
+            finally:
+                self._file.close()
+
+    def _write(self, block):
+        data = block.tobytes()
+        self._file.write(data)
+        self.data_size += len(data)
+
+    def close(self):
+        """Termine l'écriture et renomme le fichier; retourne son chemin"""
+        self._queue.put(None)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+        os.replace(self.part_path, self.filepath)
+        return self.filepath
+
+    def discard(self):
+        """Arrête l'écriture et supprime le fichier partiel"""
+        self._queue.put(None)
+        self._thread.join()
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+
+def recover_partial_file(part_path):
+    """Répare l'en-tête d'un fichier partiel et le renomme en .wav"""
+    size = os.path.getsize(part_path)
+    if size <= HEADER_SIZE:
+        os.remove(part_path)
+        return None
+
+    with open(part_path, 'r+b') as f:
+        header = f.read(HEADER_SIZE)
+        if header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            return None
+        block_align = struct.unpack('<H', header[32:34])[0] or 2
+        data_size = size - HEADER_SIZE
+        data_size -= data_size % block_align
+        f.truncate(HEADER_SIZE + data_size)
+        _patch_sizes(f, data_size)
+
+    target = part_path[:-len(PARTIAL_SUFFIX)]
+    base_name, ext = os.path.splitext(target)
+    counter = 1
+    while os.path.exists(target):
+        target = f"{base_name}_recupere_{counter}{ext}"
+        counter += 1
+    os.replace(part_path, target)
+    return target
+
+
+def recover_partial_recordings(audio_dir):
+    """Récupère les enregistrements interrompus d'un dossier"""
+    recovered = []
+    if not os.path.isdir(audio_dir):
+        return recovered
+    for entry in os.scandir(audio_dir):
+        if entry.is_file() and entry.name.endswith('.wav' + PARTIAL_SUFFIX):
+            try:
+                path = recover_partial_file(entry.path)
+            except OSError as e:
+                print(f"Impossible de récupérer {entry.name}: {e}")
+                continue
+            if path:
+                recovered.append(path)
+    return recovered